@@ -28,6 +28,13 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+# `alembic -x url=...` migrates another database than alembic.ini names,
+# e.g. the db-replica compose service
+url_override = context.get_x_argument(as_dictionary=True).get("url")
+if url_override:
+    config.set_main_option("sqlalchemy.url", url_override.replace("%", "%%"))
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -0,0 +1,70 @@
+"""Add tasks full text search
+
+Revision ID: 0e4d1bf212e8
+Revises: e0ce63ef0d97
+Create Date: 2026-10-18 13:20:54.118302
+
+"""
+
+import os
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0e4d1bf212e8"
+down_revision: Union[str, Sequence[str], None] = "e0ce63ef0d97"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _search_config() -> str:
+    # must match TASK_MGR_SEARCH_CONFIG used by the app for queries,
+    # "russian" also stems latin words with the english stemmer
+    config = os.getenv("TASK_MGR_SEARCH_CONFIG") or "russian"
+    if not re.fullmatch(r"[a-z_]+", config):
+        raise ValueError(f"Invalid text search configuration: {config}")
+    return config
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    config = _search_config()
+    # adding a stored generated column rewrites the table once
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                f"setweight(to_tsvector('{config}', name), 'A') || "
+                f"setweight(to_tsvector('{config}', text), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_search_vector",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("tasks", "search_vector")
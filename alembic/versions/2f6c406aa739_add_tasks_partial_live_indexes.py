@@ -0,0 +1,88 @@
+"""Add tasks partial live indexes
+
+Revision ID: 2f6c406aa739
+Revises: 0e4d1bf212e8
+Create Date: 2026-10-18 16:41:07.502913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6c406aa739"
+down_revision: Union[str, Sequence[str], None] = "0e4d1bf212e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("deleted_at IS NULL")
+
+# (old full index, new partial index, columns, access method)
+REPLACED = (
+    (
+        "ix_tasks_created_at_id",
+        "ix_tasks_live_created_at_id",
+        ["created_at", "id"],
+        None,
+    ),
+    (
+        "ix_tasks_status_created_at_id",
+        "ix_tasks_live_status_created_at_id",
+        ["status", "created_at", "id"],
+        None,
+    ),
+    (
+        "ix_tasks_search_vector",
+        "ix_tasks_live_search_vector",
+        ["search_vector"],
+        "gin",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # partial indexes are built before the full ones are dropped,
+    # so reads never lose their index in between
+    with op.get_context().autocommit_block():
+        for old_name, new_name, columns, using in REPLACED:
+            op.create_index(
+                new_name,
+                "tasks",
+                columns,
+                unique=False,
+                postgresql_using=using,
+                postgresql_where=LIVE,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(old_name, table_name="tasks", postgresql_concurrently=True)
+        # tombstones only, for the purge job
+        op.create_index(
+            "ix_tasks_deleted_at",
+            "tasks",
+            ["deleted_at"],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_deleted_at", table_name="tasks", postgresql_concurrently=True
+        )
+        for old_name, new_name, columns, using in REPLACED:
+            op.create_index(
+                old_name,
+                "tasks",
+                columns,
+                unique=False,
+                postgresql_using=using,
+                postgresql_concurrently=True,
+            )
+            op.drop_index(new_name, table_name="tasks", postgresql_concurrently=True)
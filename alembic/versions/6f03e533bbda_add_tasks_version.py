@@ -0,0 +1,34 @@
+"""Add tasks version
+
+Revision ID: 6f03e533bbda
+Revises: a2ac70bc327f
+Create Date: 2026-10-18 22:47:03.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6f03e533bbda"
+down_revision: Union[str, Sequence[str], None] = "a2ac70bc327f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a constant default is stored in the catalog, existing rows are not
+    # rewritten and all of them start at version 1
+    op.add_column(
+        "tasks",
+        sa.Column("version", sa.BigInteger(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("tasks", "version")
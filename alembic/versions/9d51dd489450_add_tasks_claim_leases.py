@@ -0,0 +1,60 @@
+"""Add tasks claim leases
+
+Revision ID: 9d51dd489450
+Revises: 2f6c406aa739
+Create Date: 2026-10-18 18:05:32.671840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d51dd489450"
+down_revision: Union[str, Sequence[str], None] = "2f6c406aa739"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nullable columns without defaults are a catalog only change
+    op.add_column("tasks", sa.Column("claimed_by", sa.String(), nullable=True))
+    op.add_column("tasks", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_claimable_created_at_id",
+            "tasks",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_where=sa.text("status = 'created' AND deleted_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_processing_lease_expires_at",
+            "tasks",
+            ["lease_expires_at"],
+            unique=False,
+            postgresql_where=sa.text("status = 'processing'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_processing_lease_expires_at",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_claimable_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("tasks", "lease_expires_at")
+    op.drop_column("tasks", "claimed_by")
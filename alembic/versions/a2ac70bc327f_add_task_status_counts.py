@@ -0,0 +1,108 @@
+"""Add task status counts
+
+Revision ID: a2ac70bc327f
+Revises: f4024c67192a
+Create Date: 2026-10-18 21:14:48.220593
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2ac70bc327f"
+down_revision: Union[str, Sequence[str], None] = "f4024c67192a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# must stay below 32768, rows per status the deltas are spread over
+SHARDS = 16
+
+# deltas of one statement per status, added to a random shard in status
+# order so that two writers never lock the same rows in opposite order
+APPLY_DELTA = """
+    INSERT INTO task_status_counts (status, shard, count)
+    SELECT status, target_shard, sum(delta) FROM ({rows}) AS changed
+    GROUP BY status
+    HAVING sum(delta) <> 0
+    ORDER BY status
+    ON CONFLICT (status, shard)
+    DO UPDATE SET count = task_status_counts.count + EXCLUDED.count;
+""".strip()
+NEW_ROWS = "SELECT status, 1 AS delta FROM new_rows WHERE deleted_at IS NULL"
+OLD_ROWS = "SELECT status, -1 AS delta FROM old_rows WHERE deleted_at IS NULL"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_status_counts",
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("status", "shard"),
+    )
+    # statement level, so a batch or an import costs one counter update;
+    # soft deletes are updates that leave the live set, purges never count
+    op.execute(
+        f"""
+        CREATE FUNCTION tasks_count_changes() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            target_shard smallint := floor(random() * {SHARDS});
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {APPLY_DELTA.format(rows=NEW_ROWS)}
+            ELSIF TG_OP = 'UPDATE' THEN
+                {APPLY_DELTA.format(rows=f"{NEW_ROWS} UNION ALL {OLD_ROWS}")}
+            ELSE
+                {APPLY_DELTA.format(rows=OLD_ROWS)}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_count_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count_changes()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_count_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count_changes()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_count_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count_changes()
+        """
+    )
+    # creating the triggers locked out writers until the migration commits,
+    # so the initial counts can not miss a change
+    op.execute(
+        """
+        INSERT INTO task_status_counts (status, shard, count)
+        SELECT status, 0, count(*) FROM tasks
+        WHERE deleted_at IS NULL
+        GROUP BY status
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_count_delete ON tasks")
+    op.execute("DROP TRIGGER tasks_count_update ON tasks")
+    op.execute("DROP TRIGGER tasks_count_insert ON tasks")
+    op.execute("DROP FUNCTION tasks_count_changes()")
+    op.drop_table("task_status_counts")
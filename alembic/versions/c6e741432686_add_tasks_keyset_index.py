@@ -0,0 +1,42 @@
+"""Add tasks keyset index
+
+Revision ID: c6e741432686
+Revises: 92f541263972
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e741432686"
+down_revision: Union[str, Sequence[str], None] = "92f541263972"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can not run inside a transaction, but keeps the table
+    # writable while the index is built
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_created_at_id",
+            "tasks",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
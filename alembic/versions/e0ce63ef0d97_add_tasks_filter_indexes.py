@@ -0,0 +1,63 @@
+"""Add tasks filter indexes
+
+Revision ID: e0ce63ef0d97
+Revises: c6e741432686
+Create Date: 2026-10-18 11:02:17.640935
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e0ce63ef0d97"
+down_revision: Union[str, Sequence[str], None] = "c6e741432686"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_status_created_at_id",
+            "tasks",
+            ["status", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_updated_at_id",
+            "tasks",
+            ["updated_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        # primary key already has its own unique index
+        op.drop_index(
+            op.f("ix_tasks_id"), table_name="tasks", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_tasks_id"),
+            "tasks",
+            ["id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_updated_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_status_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,77 @@
+"""Add tasks change notifications
+
+Revision ID: f4024c67192a
+Revises: 9d51dd489450
+Create Date: 2026-10-18 19:32:15.904271
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f4024c67192a"
+down_revision: Union[str, Sequence[str], None] = "9d51dd489450"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # statement level triggers see every changed row in one transition
+    # table; a bulk statement (batch insert, import) sends a single reset
+    # instead of flooding the notification queue. Notifications are only
+    # delivered on commit, and purging tombstones (DELETE) sends nothing
+    op.execute(
+        """
+        CREATE FUNCTION tasks_notify_changes() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF (SELECT count(*) FROM changed) > 1000 THEN
+                PERFORM pg_notify(
+                    'tasks_changes', json_build_object('event', 'reset', 'id', NULL)::text
+                );
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                'tasks_changes',
+                json_build_object(
+                    'event', CASE
+                        WHEN TG_OP = 'INSERT' THEN 'created'
+                        WHEN changed.deleted_at IS NOT NULL THEN 'deleted'
+                        ELSE 'updated'
+                    END,
+                    'id', changed.id,
+                    'status', changed.status,
+                    'updated_at', changed.updated_at
+                )::text
+            )
+            FROM changed;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_notify_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_notify_update AFTER UPDATE ON tasks
+        REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify_changes()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_notify_update ON tasks")
+    op.execute("DROP TRIGGER tasks_notify_insert ON tasks")
+    op.execute("DROP FUNCTION tasks_notify_changes()")
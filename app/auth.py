@@ -0,0 +1,72 @@
+import hmac
+import logging
+from typing import Iterable, Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+DEFAULT_EXEMPT_PATHS = frozenset(
+    {"/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json", "/metrics"}
+)
+
+
+class BearerAuthMiddleware:
+    """
+    Pure ASGI bearer token check.
+    Unlike @app.middleware("http") it does not wrap the request in a task
+    and does not re-stream the response body, the success path only
+    compares the token in constant time and calls the app
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str,
+        exempt_paths: Iterable[str] = DEFAULT_EXEMPT_PATHS,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.app = app
+        self._token = token.encode()
+        self._exempt_paths = frozenset(exempt_paths)
+        self._logger = logger or logging.getLogger(__name__)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self._exempt_paths:
+            return await self.app(scope, receive, send)
+
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value
+                break
+
+        if auth_header is None:
+            self._reject_log(scope, "Authorization header missing")
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Authorization header missing"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+            return await response(scope, receive, send)
+
+        parts = auth_header.split()
+        if (
+            len(parts) != 2
+            or parts[0].lower() != b"bearer"
+            or not hmac.compare_digest(parts[1], self._token)
+        ):
+            self._reject_log(scope, "Invalid authentication credentials")
+            response = JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid authentication credentials"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+    def _reject_log(self, scope: Scope, reason: str):
+        client = scope.get("client")
+        host = client[0] if client else "unknown"
+        self._logger.warning(f"{reason} from {host} to {scope['path']}")
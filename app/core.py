@@ -1,26 +1,110 @@
-from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
 from uuid import UUID
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Body, Request
-from fastapi.responses import JSONResponse
-
+from fastapi import (
+    FastAPI,
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Body,
+    Request,
+    Query,
+    Response,
+    Header,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import ValidationError
+
+from app.auth import BearerAuthMiddleware
+from app.etag import etag_matches, if_match_version, page_etag, task_etag
+from app.events import stream_changes
+from app.export import MEDIA_TYPES, ExportFormat, encode_tasks
+from app.importer import ImportFormat, TaskImporter, iter_records
+from app.request_log import RequestLogMiddleware
+from app.responses import ModelJSONResponse
 from config.cfg import Configuration
 from logger.simple import configure_logger
-from models.requests import TaskUpdateRequest, TaskCreateRequest
+from metrics.instruments import Metrics, MetricsMiddleware
+from models.dto import (
+    Page,
+    TaskDTO,
+    BatchCreateResultDTO,
+    BatchItemResultDTO,
+    BatchUpdateResultDTO,
+    BatchDeleteResultDTO,
+    ChangesPageDTO,
+    ClaimResultDTO,
+    ImportReportDTO,
+    TaskStatsDTO,
+)
+from models.requests import (
+    TaskUpdateRequest,
+    TaskCreateRequest,
+    TaskListQuery,
+    TaskBatchCreateRequest,
+    TaskBatchUpdateRequest,
+    TaskBatchDeleteRequest,
+)
 from repos.factory import RepositoryFactory
 from repos.gateway import DatabaseGateway
+from repos.idempotency import StoredResponse
+from repos.counters import counter_reconciler
+from repos.leases import lease_reaper
+from repos.purge import expired_key_purger, tombstone_purger
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def client_key(request: Request) -> str:
+    """Who the read-your-writes window is tracked for"""
+    client_id = request.headers.get("X-Client-ID")
+    if client_id:
+        return client_id[:128]
+    return request.client.host if request.client else "unknown"
+
+
+def replay_response(
+    stored: StoredResponse, fingerprint: str, metrics: Metrics
+) -> Response:
+    """The stored response of an Idempotency-Key, 422 for another request"""
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    metrics.idempotent_replays.inc()
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
 
 
 class App:
     """Класс-обертка для FastAPI приложения и агрегации нужных сущностей"""
 
     def __init__(self, configuration: Configuration):
-        self._logger = configure_logger("uvicorn-app")
+        self._logger = configure_logger(
+            "uvicorn-app",
+            log_format=configuration.log_format,
+            sample_rates=configuration.log_sample_rates,
+            rate_limit=configuration.log_rate_limit,
+            queue_size=configuration.log_queue_size,
+        )
+        self._config = configuration
         self._bearer = configuration.task_mgr_bearer
         self.gateway = DatabaseGateway(configuration)
         self._app = self._create_fastapi_app()
         self._setup_routes()
         self._setup_auth_middleware()
+        self._setup_metrics_middleware()
+        self._setup_request_logging()
 
     @property
     def app(self) -> FastAPI:
@@ -32,7 +116,12 @@ class App:
         @asynccontextmanager
         async def lifespan(app: FastAPI):
             await self.gateway.initialize()
+            jobs = self._start_background_jobs()
             yield
+            for job in jobs:
+                job.cancel()
+                with suppress(asyncio.CancelledError):
+                    await job
             await self.gateway.close()
 
         return FastAPI(
@@ -42,97 +131,477 @@ class App:
             lifespan=lifespan,
         )
 
+    def _start_background_jobs(self) -> list[asyncio.Task]:
+        """Maintenance loops living as long as the app"""
+        if not self._config.background_jobs:
+            return []
+        purger = tombstone_purger(
+            self.gateway,
+            retention=self._config.purge_retention,
+            batch_size=self._config.purge_batch_size,
+            interval=self._config.purge_interval,
+            pause=self._config.purge_pause,
+            logger=self._logger,
+        )
+        reaper = lease_reaper(
+            self.gateway,
+            interval=self._config.lease_reap_interval,
+            batch_size=self._config.purge_batch_size,
+            pause=self._config.purge_pause,
+            logger=self._logger,
+        )
+        reconciler = counter_reconciler(
+            self.gateway,
+            interval=self._config.stats_reconcile_interval,
+            logger=self._logger,
+        )
+        jobs = [purger, reaper, reconciler]
+        if self._config.idempotency_backend == "table":
+            jobs.append(
+                expired_key_purger(
+                    self.gateway,
+                    batch_size=self._config.purge_batch_size,
+                    interval=self._config.purge_interval,
+                    pause=self._config.purge_pause,
+                    logger=self._logger,
+                )
+            )
+        return [asyncio.create_task(job.run()) for job in jobs]
+
     def _setup_auth_middleware(self):
         """Setup authentication middleware"""
+        self.app.add_middleware(
+            BearerAuthMiddleware, token=self._bearer, logger=self._logger
+        )
 
-        @self.app.middleware("http")
-        async def auth_middleware(request: Request, call_next):
-            if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
-                return await call_next(request)
-            auth_header = request.headers.get("Authorization")
-            if not auth_header:
-                self._logger.warning(
-                    f"Missing Authorization header from {request.client.host}"
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Authorization header missing"},
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+    def _setup_metrics_middleware(self):
+        """Request counts and latency, outside of auth to count rejections too"""
+        self.app.add_middleware(MetricsMiddleware, metrics=self.gateway.metrics)
 
-            try:
-                parts = auth_header.split()
-                if len(parts) != 2:
-                    print(len(parts))
-                    print(parts)
-                    print(auth_header)
-                    raise ValueError("Invalid header format")
+    def _setup_request_logging(self):
+        """Access log with request ids, only for the non-blocking json mode"""
+        # added last so it is the outermost layer and sees rejected requests too
+        if self._config.log_format == "json":
+            self.app.add_middleware(RequestLogMiddleware, logger=self._logger)
 
-                scheme, token = parts
-                if scheme.lower() != "bearer":
-                    raise ValueError("Invalid authentication scheme")
+    def _setup_routes(self):
+        """setup all endpoints routes"""
+        router = APIRouter()
 
-                if token != self._bearer:
-                    raise ValueError("Invalid token")
+        @router.get("/tasks/", tags=["Tasks"], response_model=Page[TaskDTO])
+        async def get_all_tasks(
+            limit: Optional[int] = Query(None, ge=1),
+            cursor: Optional[str] = Query(None),
+            filters: TaskListQuery = Depends(),
+            if_none_match: Optional[str] = Header(None),
+            factory=self.get_repository_factory(self.gateway, read_only=True),
+        ):
+            """
+            Get a page of tasks
 
-            except ValueError as e:
-                self._logger.warning(
-                    f"Invalid auth attempt from {request.client.host}: {e}"
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Invalid authentication credentials"},
-                    headers={"WWW-Authenticate": "Bearer"},
+            - **limit**: Page size, capped by the server-side maximum
+            - **cursor**: `next_cursor` from the previous page
+            - **filters**: Status, created_at/updated_at ranges and sort order
+            - **If-None-Match**: ETag of a previous page, 304 if unchanged
+            """
+            page_size = min(
+                limit or self._config.page_size_default, self._config.page_size_max
+            )
+            if if_none_match:
+                versions = await factory.tasks.get_page_versions(
+                    limit=page_size, cursor=cursor, filters=filters
                 )
+                etag = page_etag(versions[:page_size], len(versions) > page_size)
+                if etag_matches(if_none_match, etag):
+                    return Response(
+                        status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": etag},
+                    )
 
-            self._logger.info(
-                f"Authenticated request from {request.client.host} to {request.url.path}"
+            page = await factory.tasks.get_all(
+                limit=page_size, cursor=cursor, filters=filters
             )
-            response = await call_next(request)
-            return response
+            etag = page_etag(
+                [(task.id, task.updated_at) for task in page.items],
+                page.next_cursor is not None,
+            )
+            return ModelJSONResponse(page, headers={"ETag": etag})
+
+        @router.get("/tasks/search", tags=["Tasks"], response_model=Page[TaskDTO])
+        async def search_tasks(
+            q: str = Query(..., min_length=1, max_length=256),
+            limit: Optional[int] = Query(None, ge=1),
+            cursor: Optional[str] = Query(None),
+            factory=self.get_repository_factory(self.gateway, read_only=True),
+        ):
+            """
+            Full-text search over task name and text, best matches first
 
-    def _setup_routes(self):
-        """setup all endpoints routes"""
-        router = APIRouter()
+            - **q**: Search words, quoted phrases, `or` and `-word` are supported
+            - **limit**: Page size, capped by the server-side maximum
+            - **cursor**: `next_cursor` from the previous page
+            """
+            page_size = min(
+                limit or self._config.page_size_default, self._config.page_size_max
+            )
+            page = await factory.tasks.search(
+                q,
+                limit=page_size,
+                cursor=cursor,
+                search_config=self._config.search_config,
+            )
+            return ModelJSONResponse(page)
 
-        @router.get("/tasks/", tags=["Tasks"])
-        async def get_all_tasks(factory=self.get_repository_factory(self.gateway)):
-            tasks = await factory.tasks.get_all()
-            return tasks
+        @router.get("/tasks/export", tags=["Tasks"])
+        async def export_tasks(
+            request: Request,
+            format: ExportFormat = Query("ndjson"),
+            filters: TaskListQuery = Depends(),
+        ):
+            """
+            Stream all tasks as NDJSON or CSV from a single snapshot
 
-        @router.get("/tasks/{task_id}", tags=["Tasks"])
+            - **format**: `ndjson` or `csv`
+            - **filters**: Same filters and sort order as the task list
+            """
+            return StreamingResponse(
+                self._stream_export(format, filters, client_key(request)),
+                media_type=MEDIA_TYPES[format],
+            )
+
+        @router.get("/tasks/changes", tags=["Tasks"], response_model=ChangesPageDTO)
+        async def get_task_changes(
+            since: Optional[str] = Query(None),
+            limit: Optional[int] = Query(None, ge=1),
+            factory=self.get_repository_factory(self.gateway),
+        ):
+            """
+            Tasks created, changed or deleted after a sync token
+
+            - **since**: `next_token` of the previous sync, omit for a full sync
+            - **limit**: Page size, capped by the server-side maximum
+
+            Deleted tasks come as `deleted: true` tombstones. Repeat with
+            `next_token` while `has_more`; the same change may come twice.
+            410 means the token is too old, sync again without it
+            """
+            # read from the primary, replica lag could hide settled changes
+            page = await factory.tasks.get_changes(
+                min(
+                    limit or self._config.page_size_default, self._config.page_size_max
+                ),
+                since=since,
+                settle=self._config.sync_settle,
+                retention=self._config.purge_retention,
+            )
+            return ModelJSONResponse(page)
+
+        @router.get("/tasks/stats", tags=["Tasks"], response_model=TaskStatsDTO)
+        async def get_task_stats(
+            factory=self.get_repository_factory(self.gateway, read_only=True),
+        ):
+            """
+            Count of tasks per status, without deleted ones
+
+            Served from counters kept by the database, so it costs the same
+            whatever the number of tasks
+            """
+            return ModelJSONResponse(await factory.tasks.get_status_counts())
+
+        @router.get("/tasks/stream", tags=["Tasks"])
+        async def stream_task_changes():
+            """
+            Server-Sent Events of task changes: `created`, `updated` and
+            `deleted` with the task id, status and updated_at.
+
+            Changes of one task coalesce while the client is behind; a client
+            too far behind gets `overflow` and the stream ends, `reset` means
+            changes may have been missed. Either way, reload from GET /tasks/
+            """
+            feed = self.gateway.changes
+            if feed is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Change stream is disabled",
+                )
+            if feed.subscribers >= self._config.stream_max_clients:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many change stream clients",
+                )
+            return StreamingResponse(
+                stream_changes(feed, self._config.stream_keepalive),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        @router.get(
+            "/tasks/{task_id}", tags=["Tasks"], response_model=Optional[TaskDTO]
+        )
         async def get_task(
-            task_id: UUID, factory=self.get_repository_factory(self.gateway)
+            task_id: UUID,
+            if_none_match: Optional[str] = Header(None),
+            factory=self.get_repository_factory(self.gateway, read_only=True),
         ):
-            task = await factory.tasks.get_by_id(task_id)
-            return task
+            """
+            Get task by ID
 
-        @router.post("/tasks/", tags=["Tasks"], status_code=status.HTTP_201_CREATED)
+            - **task_id**: UUID of the task
+            - **If-None-Match**: ETag of a previous response, 304 if unchanged
+            """
+            if if_none_match:
+                version = await factory.tasks.get_version(task_id)
+                if version is not None:
+                    etag = task_etag(version)
+                    if etag_matches(if_none_match, etag):
+                        return Response(
+                            status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": etag},
+                        )
+
+            task = await factory.tasks.get_by_id(task_id)
+            if task is None:
+                return ModelJSONResponse(None)
+            return ModelJSONResponse(task, headers={"ETag": task_etag(task.version)})
+
+        @router.post(
+            "/tasks/",
+            tags=["Tasks"],
+            status_code=status.HTTP_201_CREATED,
+            response_model=TaskDTO,
+        )
         async def create_task(
             task_data: TaskCreateRequest = Body(...),
+            idempotency_key: Optional[str] = Header(None),
             factory=self.get_repository_factory(self.gateway),
         ):
             """
             Create a new task
 
             - **task_data**: Data for the new task
+            - **Idempotency-Key**: retries with the same key get the response
+              of the first request instead of creating another task
             """
+            keys = factory.idempotency if idempotency_key else None
+            if keys is not None:
+                if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Idempotency-Key is longer than "
+                        f"{IDEMPOTENCY_KEY_MAX_LENGTH} characters",
+                    )
+                fingerprint = hashlib.sha256(
+                    task_data.model_dump_json().encode()
+                ).hexdigest()
+                stored = await keys.begin(idempotency_key, fingerprint)
+                if stored is not None:
+                    return replay_response(stored, fingerprint, self.gateway.metrics)
+
             try:
-                new_task = await factory.tasks.create(task_data.model_dump())
-                return new_task
-            except HTTPException as e:
-                raise e
+                try:
+                    new_task = await factory.tasks.create(task_data.model_dump())
+                    response = ModelJSONResponse(
+                        new_task, status_code=status.HTTP_201_CREATED
+                    )
+                    if keys is not None:
+                        await keys.complete(
+                            idempotency_key,
+                            StoredResponse(
+                                response.status_code, response.body, fingerprint
+                            ),
+                        )
+                    return response
+                except HTTPException as e:
+                    raise e
+                except Exception as e:
+                    self._logger.error(f"Error creating task: {e}")
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail="Internal server error",
+                    )
+            except BaseException:
+                # a duplicate waiting for this request creates the task itself
+                if keys is not None:
+                    await keys.abandon(idempotency_key)
+                raise
+
+        @router.post(
+            "/tasks/batch",
+            tags=["Tasks"],
+            status_code=status.HTTP_201_CREATED,
+            response_model=BatchCreateResultDTO,
+        )
+        async def create_tasks_batch(
+            batch: TaskBatchCreateRequest = Body(...),
+            factory=self.get_repository_factory(self.gateway),
+        ):
+            """
+            Create many tasks with a single INSERT in one transaction
+
+            - **items**: Task payloads, same rules as for a single task
+            - **mode**: `atomic` rejects the batch if any item is invalid,
+              `best_effort` creates valid items and answers 207 if some failed
+            """
+            self._check_batch_size(len(batch.items))
+
+            valid, failed = [], []
+            for index, item in enumerate(batch.items):
+                try:
+                    valid.append((index, TaskCreateRequest.model_validate(item)))
+                except ValidationError as e:
+                    failed.append(
+                        BatchItemResultDTO(
+                            index=index,
+                            ok=False,
+                            errors=e.errors(include_url=False, include_context=False),
+                        )
+                    )
+
+            if failed and (batch.mode == "atomic" or not valid):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=[result.model_dump() for result in failed],
+                )
+
+            try:
+                created = await factory.tasks.create_many(
+                    [task_data.model_dump() for _, task_data in valid]
+                )
+            except Exception as e:
+                self._logger.error(f"Error creating tasks batch: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Internal server error",
+                )
+
+            results = failed + [
+                BatchItemResultDTO(index=index, ok=True, task=task)
+                for (index, _), task in zip(valid, created)
+            ]
+            results.sort(key=lambda result: result.index)
+            return ModelJSONResponse(
+                BatchCreateResultDTO(
+                    created=len(created), failed=len(failed), results=results
+                ),
+                status_code=(
+                    status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED
+                ),
+            )
+
+        @router.patch(
+            "/tasks/batch", tags=["Tasks"], response_model=BatchUpdateResultDTO
+        )
+        async def update_tasks_batch(
+            batch: TaskBatchUpdateRequest = Body(...),
+            factory=self.get_repository_factory(self.gateway),
+        ):
+            """
+            Update many tasks with a single statement
+
+            - **items**: Patches with task `id` and the fields to change
+            """
+            self._check_batch_size(len(batch.items))
+            patches = [item.model_dump(exclude_none=True) for item in batch.items]
+            try:
+                updated = await factory.tasks.update_many(patches)
+            except Exception as e:
+                self._logger.error(f"Error updating tasks batch: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Internal server error",
+                )
+
+            updated_ids = {task.id for task in updated}
+            return ModelJSONResponse(
+                BatchUpdateResultDTO(
+                    updated=updated,
+                    missing=[
+                        item.id for item in batch.items if item.id not in updated_ids
+                    ],
+                )
+            )
+
+        @router.post(
+            "/tasks/batch-delete", tags=["Tasks"], response_model=BatchDeleteResultDTO
+        )
+        async def delete_tasks_batch(
+            batch: TaskBatchDeleteRequest = Body(...),
+            factory=self.get_repository_factory(self.gateway),
+        ):
+            """
+            Delete many tasks with a single statement
+
+            - **ids**: IDs of the tasks to delete
+            """
+            self._check_batch_size(len(batch.ids))
+            try:
+                deleted = set(await factory.tasks.delete_many(batch.ids))
+            except Exception as e:
+                self._logger.error(f"Error deleting tasks batch: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Internal server error",
+                )
+
+            requested = list(dict.fromkeys(batch.ids))
+            return BatchDeleteResultDTO(
+                deleted=[task_id for task_id in requested if task_id in deleted],
+                missing=[task_id for task_id in requested if task_id not in deleted],
+            )
+
+        @router.post("/tasks/claim", tags=["Tasks"], response_model=ClaimResultDTO)
+        async def claim_tasks(
+            request: Request,
+            limit: int = Query(1, ge=1),
+            worker: Optional[str] = Query(None, min_length=1, max_length=128),
+            factory=self.get_repository_factory(self.gateway),
+        ):
+            """
+            Atomically claim the oldest created tasks for processing
+
+            - **limit**: Tasks to claim, capped by the server-side maximum
+            - **worker**: Worker ID, defaults to X-Client-ID or the client address
+
+            Claimed tasks are moved to `processing` until `lease_expires_at`,
+            unless finished by then they return to `created`
+            """
+            try:
+                result = await factory.tasks.claim(
+                    min(limit, self._config.claim_limit_max),
+                    worker or client_key(request),
+                    self._config.claim_lease,
+                )
             except Exception as e:
-                self._logger.error(f"Error creating task: {e}")
+                self._logger.error(f"Error claiming tasks: {e}")
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Internal server error",
                 )
+            return ModelJSONResponse(result)
+
+        @router.post("/tasks/import", tags=["Tasks"])
+        async def import_tasks(
+            request: Request, format: ImportFormat = Query("ndjson")
+        ) -> ImportReportDTO:
+            """
+            Bulk load tasks from a streamed NDJSON or CSV request body with COPY
+
+            - **format**: `ndjson` (one object per line) or `csv` with a header,
+              records follow TaskCreateRequest rules plus an optional `id`
+            """
+            importer = TaskImporter(self.gateway, self._config.import_chunk_size)
+            report = await importer.run(iter_records(request.stream(), format))
+            self._logger.info(
+                f"Imported {report.imported} tasks, rejected {report.rejected}, "
+                f"{report.rows_per_second:.0f} rows/sec"
+            )
+            return report
 
-        @router.put("/tasks/{task_id}", tags=["Tasks"])
+        @router.put("/tasks/{task_id}", tags=["Tasks"], response_model=TaskDTO)
         async def update_task(
             task_id: UUID,
             update_request: TaskUpdateRequest = Body(...),
+            if_match: Optional[str] = Header(None),
             factory=self.get_repository_factory(self.gateway),
         ):
             """
@@ -140,7 +609,18 @@ class App:
 
             - **task_id**: UUID of the task to update
             - **update_request**: Fields to update (all fields are optional)
+            - **If-Match**: ETag of the task, the update is only applied if
+              nobody changed the task since, 412 otherwise
             """
+            expected_version = None
+            if if_match:
+                try:
+                    expected_version = if_match_version(if_match)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_412_PRECONDITION_FAILED,
+                        detail="If-Match does not match the task ETag",
+                    )
             try:
                 update_data = update_request.model_dump(
                     exclude_unset=True, exclude_none=True
@@ -152,8 +632,12 @@ class App:
                         detail="No fields provided for update",
                     )
 
-                updated_task = await factory.tasks.update(task_id, update_data)
-                return updated_task
+                updated_task = await factory.tasks.update(
+                    task_id, update_data, expected_version
+                )
+                return ModelJSONResponse(
+                    updated_task, headers={"ETag": task_etag(updated_task.version)}
+                )
 
             except HTTPException as e:
                 raise e
@@ -192,13 +676,67 @@ class App:
                     detail="Internal server error",
                 )
 
+        @router.get("/metrics", tags=["Service"], response_class=PlainTextResponse)
+        async def get_metrics():
+            """Prometheus text format, not protected by the bearer token"""
+            return PlainTextResponse(
+                self.gateway.metrics.render(), media_type=CONTENT_TYPE_LATEST
+            )
+
+        @router.get("/admin/slow-queries", tags=["Service"])
+        async def get_slow_queries(limit: Optional[int] = Query(None, ge=1)):
+            """Slowest statement fingerprints with redacted parameters and plans"""
+            slow_queries = self.gateway.slow_queries
+            if slow_queries is None:
+                return {"enabled": False}
+            return {
+                "enabled": True,
+                "threshold_ms": slow_queries.threshold * 1000,
+                "queries": slow_queries.top(limit),
+            }
+
+        @router.get("/cache/stats", tags=["Service"])
+        async def get_cache_stats():
+            """Hit, miss and eviction counters of the task cache"""
+            cache = self.gateway.cache
+            if cache is None:
+                return {"enabled": False}
+            return {"enabled": True, **cache.stats()}
+
         self.app.include_router(router)
 
+    async def _stream_export(
+        self, fmt: ExportFormat, filters: TaskListQuery, client: str
+    ):
+        # session has to outlive the endpoint, so it is opened by the stream
+        async with self.gateway.session(
+            read_only=True, client=client, snapshot=True
+        ) as session:
+            factory = self.gateway.get_repository_factory(session)
+            tasks = factory.tasks.stream_all(self._config.export_fetch_size, filters)
+            try:
+                async for chunk in encode_tasks(tasks, fmt):
+                    yield chunk
+            except Exception as e:
+                self._logger.error(f"Error exporting tasks: {e}")
+                raise
+
+    def _check_batch_size(self, size: int):
+        if size > self._config.batch_size_max:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Batch size exceeds maximum of {self._config.batch_size_max}",
+            )
+
     @staticmethod
-    def get_repository_factory(gateway: DatabaseGateway) -> RepositoryFactory:
-        async def _get_factory() -> RepositoryFactory:
-            async with gateway.session() as session:
-                factory = RepositoryFactory(session)
+    def get_repository_factory(
+        gateway: DatabaseGateway, read_only: bool = False
+    ) -> RepositoryFactory:
+        async def _get_factory(request: Request) -> RepositoryFactory:
+            async with gateway.session(
+                read_only=read_only, client=client_key(request)
+            ) as session:
+                factory = gateway.get_repository_factory(session)
                 yield factory
 
         return Depends(_get_factory)
@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+
+def _quote(digest) -> str:
+    return f'"{digest.hexdigest()}"'
+
+
+def task_etag(version: int) -> str:
+    """Strong ETag of a single task, its version, changes with every write"""
+    return f'"v{version}"'
+
+
+def if_match_version(if_match: str) -> Optional[int]:
+    """
+    Version an If-Match header asks for, None for "*" (any version).
+    ValueError for anything that can never match a task ETag - weak
+    tags, several tags or foreign ones - which means 412
+    """
+    tag = if_match.strip()
+    if tag == "*":
+        return None
+    if len(tag) > 3 and tag.startswith('"v') and tag.endswith('"'):
+        return int(tag[2:-1])
+    raise ValueError(f"Not a task ETag: {if_match}")
+
+
+def page_etag(
+    versions: Iterable[tuple[UUID, Optional[datetime]]], has_more: bool
+) -> str:
+    """Strong ETag of a list page built from (id, updated_at) of its rows"""
+    digest = hashlib.blake2b(digest_size=16)
+    for task_id, updated_at in versions:
+        stamp = updated_at.isoformat() if updated_at else ""
+        digest.update(f"{task_id}:{stamp};".encode())
+    digest.update(b"more" if has_more else b"last")
+    return _quote(digest)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check, weak comparison as RFC 9110 requires for it"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
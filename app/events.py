@@ -0,0 +1,43 @@
+import asyncio
+import json
+from typing import AsyncIterator
+
+from repos.changes import ChangeFeed
+
+# clients reconnect after this many milliseconds
+RETRY_MS = 3000
+
+
+def encode_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def stream_changes(feed: ChangeFeed, keepalive: float) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events of task changes. A comment is sent when nothing
+    happened for keepalive seconds so that proxies keep the connection open.
+    The stream ends after an overflow event when the client fell behind
+    """
+    with feed.subscribe() as subscription:
+        if subscription is None:
+            yield encode_event("overflow", {"reason": "too many subscribers"})
+            return
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            try:
+                events = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if subscription.overflowed:
+                yield encode_event("overflow", {"reason": "client too slow"})
+                return
+            # everything that piled up goes out in one write, events are
+            # shared between subscribers and must not be changed
+            yield b"".join(
+                encode_event(
+                    event["event"],
+                    {key: value for key, value in event.items() if key != "event"},
+                )
+                for event in events
+            )
@@ -0,0 +1,38 @@
+import csv
+import io
+from typing import AsyncIterator, Literal
+
+from models.dto import TaskDTO
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_FIELDS = ("id", "name", "text", "status")
+
+
+async def encode_tasks(
+    tasks: AsyncIterator[TaskDTO], fmt: ExportFormat, chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    Encode tasks one by one, yielding chunks of about chunk_size bytes
+    so that the socket is not written once per row
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(CSV_FIELDS)
+
+    async for task in tasks:
+        if fmt == "csv":
+            writer.writerow([task.id, task.name, task.text, task.status])
+        else:
+            buffer.write(task.model_dump_json())
+            buffer.write("\n")
+
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,153 @@
+import csv
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal, Optional
+
+import asyncpg
+from pydantic import ValidationError
+
+from models.dto import ImportErrorDTO, ImportReportDTO
+from models.requests import TaskCreateRequest
+from repos.gateway import DatabaseGateway
+
+ImportFormat = Literal["ndjson", "csv"]
+
+COPY_COLUMNS = ("id", "name", "text", "status", "created_at", "updated_at")
+
+# errors caused by the rows themselves, a chunk failing with one of these
+# is split to find them; anything else fails the chunk as a whole
+ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering all of it"""
+    tail = b""
+    async for chunk in chunks:
+        tail += chunk
+        *lines, tail = tail.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if tail:
+        yield tail.rstrip(b"\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], fmt: ImportFormat
+) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Parse NDJSON or CSV (with header) incrementally.
+    Yields (line number, dict) or (line number, exception) for unparsable input
+    """
+    header = None
+    record, record_line = "", 0
+    line_no = 0
+    async for raw_line in iter_lines(chunks):
+        line_no += 1
+        try:
+            line = raw_line.decode()
+        except UnicodeDecodeError as e:
+            record, record_line = "", 0
+            yield line_no, e
+            continue
+
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as e:
+                yield line_no, e
+            continue
+
+        # csv record may span several lines inside quotes,
+        # it is complete once the quotes are balanced
+        record = f"{record}\n{line}" if record else line
+        record_line = record_line or line_no
+        if record.count('"') % 2:
+            continue
+        values, record, line_at = next(csv.reader([record])), "", record_line
+        record_line = 0
+        if header is None:
+            header = values
+        elif values:
+            yield line_at, dict(zip(header, values))
+
+    if record:
+        yield record_line, ValueError("Unterminated quoted CSV field")
+
+
+def to_copy_row(record: Any, now: datetime) -> tuple:
+    """Validate a parsed record with TaskCreateRequest rules, id is optional"""
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+    task = TaskCreateRequest.model_validate(record)
+    task_id = uuid.UUID(str(record["id"])) if record.get("id") else uuid.uuid4()
+    return task_id, task.name, task.text, task.status, now, now
+
+
+class TaskImporter:
+    """Validates records in chunks and loads them with COPY"""
+
+    def __init__(
+        self, gateway: DatabaseGateway, chunk_size: int, max_reported_errors: int = 100
+    ):
+        self._gateway = gateway
+        self._chunk_size = chunk_size
+        self._max_reported_errors = max_reported_errors
+
+    async def run(self, records: AsyncIterator[tuple[int, Any]]) -> ImportReportDTO:
+        started = time.perf_counter()
+        report = ImportReportDTO()
+        # (line number, row to copy)
+        chunk: list[tuple[int, tuple]] = []
+        now = datetime.utcnow()
+
+        async for line_no, record in records:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                chunk.append((line_no, to_copy_row(record, now)))
+            except (ValidationError, ValueError, TypeError) as e:
+                self._reject(report, line_no, e)
+                continue
+
+            if len(chunk) >= self._chunk_size:
+                await self._flush(report, chunk)
+                chunk, now = [], datetime.utcnow()
+
+        if chunk:
+            await self._flush(report, chunk)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        if report.elapsed_seconds > 0:
+            report.rows_per_second = report.imported / report.elapsed_seconds
+        return report
+
+    async def _flush(self, report: ImportReportDTO, chunk: list[tuple[int, tuple]]):
+        try:
+            report.imported += await self._gateway.copy_records(
+                "tasks", COPY_COLUMNS, [row for _, row in chunk]
+            )
+        except ROW_ERRORS as e:
+            # COPY is all-or-nothing, halves are retried until the failing
+            # rows are alone - a few extra COPYs per bad row
+            if len(chunk) == 1:
+                self._reject(report, chunk[0][0], e)
+                return
+            middle = len(chunk) // 2
+            await self._flush(report, chunk[:middle])
+            await self._flush(report, chunk[middle:])
+        except Exception as e:
+            report.rejected += len(chunk) - 1
+            self._reject(
+                report,
+                chunk[0][0],
+                f"Chunk of lines {chunk[0][0]}-{chunk[-1][0]} failed: {e}",
+            )
+
+    def _reject(self, report: ImportReportDTO, line: int, error: Any):
+        report.rejected += 1
+        if len(report.errors) < self._max_reported_errors:
+            report.errors.append(ImportErrorDTO(line=line, error=str(error)))
@@ -0,0 +1,16 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    Serializes pydantic models, or lists of them, straight to JSON bytes in
+    pydantic-core. Returning it from an endpoint skips the second validation
+    against response_model and jsonable_encoder, response_model then only
+    documents the schema
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
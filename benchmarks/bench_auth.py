@@ -0,0 +1,129 @@
+"""
+Requests/sec of the bearer auth layer: the old @app.middleware("http")
+implementation against BearerAuthMiddleware.
+
+Requests are driven straight through the ASGI interface, so the numbers
+show the framework + middleware cost without a server or a socket.
+
+    python -m benchmarks.bench_auth --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from app.auth import BearerAuthMiddleware
+
+TOKEN = "benchmark-token"
+
+logger = logging.getLogger("bench-auth")
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tasks/")
+    async def get_all_tasks():
+        return {"items": [], "next_cursor": None}
+
+    return app
+
+
+def legacy_app() -> FastAPI:
+    """Auth as it was implemented before, with BaseHTTPMiddleware"""
+    app = create_app()
+
+    @app.middleware("http")
+    async def auth_middleware(request: Request, call_next):
+        if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
+            return await call_next(request)
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Authorization header missing"},
+            )
+        try:
+            scheme, token = auth_header.split()
+            if scheme.lower() != "bearer" or token != TOKEN:
+                raise ValueError("Invalid token")
+        except ValueError:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Invalid authentication credentials"},
+            )
+        logger.info(
+            f"Authenticated request from {request.client.host} to {request.url.path}"
+        )
+        return await call_next(request)
+
+    return app
+
+
+def asgi_app() -> FastAPI:
+    app = create_app()
+    app.add_middleware(BearerAuthMiddleware, token=TOKEN, logger=logger)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    """Send requests through the ASGI app, returns requests per second"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/tasks/",
+        "raw_path": b"/tasks/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", f"Bearer {TOKEN}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int, rounds: int):
+    apps = {"BaseHTTPMiddleware": legacy_app(), "BearerAuthMiddleware": asgi_app()}
+    for app in apps.values():
+        await drive(app, min(requests, 1000))  # warm up route and middleware stack
+
+    results = {name: 0.0 for name in apps}
+    for _ in range(rounds):
+        for name, app in apps.items():
+            results[name] = max(results[name], await drive(app, requests))
+
+    for name, rps in results.items():
+        print(f"{name:<22} {rps:>10.0f} req/s")
+    gain = results["BearerAuthMiddleware"] / results["BaseHTTPMiddleware"] - 1
+    print(f"{'gain':<22} {gain:>10.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,106 @@
+"""
+CPU time per row of reading tasks into TaskDTOs: ORM objects with
+TaskDTO.model_validate (as before) against Core rows of TASK_COLUMNS
+with the trusted TaskDTO.trusted path of TasksRepository.
+
+An in-memory SQLite table stands in for Postgres, so the numbers include
+row fetching and ORM hydration but no network.
+
+    python -m benchmarks.bench_read_path --rows 10000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from models.dto import TaskDTO
+from models.orm import TaskORM
+from repos.tasks import TASK_COLUMNS, TasksRepository
+
+
+def make_engine(count: int):
+    engine = create_engine("sqlite://")
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        # search_vector is Postgres only and deferred, it is never selected here
+        conn.execute(
+            text(
+                "CREATE TABLE tasks (id CHAR(32) PRIMARY KEY, name VARCHAR, "
+                "text VARCHAR, status VARCHAR, created_at DATETIME, "
+                "updated_at DATETIME, deleted_at DATETIME, version INTEGER, "
+                "claimed_by VARCHAR, lease_expires_at DATETIME)"
+            )
+        )
+        conn.execute(
+            TaskORM.__table__.insert(),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "name": f"Task {i}",
+                    "text": "Текст задачи",
+                    "status": "created",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(count)
+            ],
+        )
+    return engine
+
+
+def orm_path(session: Session) -> list[TaskDTO]:
+    orm_objects = session.execute(select(TaskORM)).scalars().all()
+    return [TaskDTO.model_validate(orm_obj) for orm_obj in orm_objects]
+
+
+def core_path(repository: TasksRepository):
+    def read(session: Session) -> list[TaskDTO]:
+        rows = session.execute(select(*TASK_COLUMNS)).all()
+        return [repository._to_dto(row) for row in rows]
+
+    return read
+
+
+def fetch_only(session: Session) -> list:
+    return session.execute(select(*TASK_COLUMNS)).all()
+
+
+def measure(engine, read, count: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        with Session(engine) as session:
+            started = time.process_time()
+            tasks = read(session)
+            best = min(best, (time.process_time() - started) / count)
+        assert len(tasks) == count
+    return best
+
+
+def main(count: int, rounds: int):
+    engine = make_engine(count)
+    results = {
+        "fetch rows only": fetch_only,
+        "ORM + model_validate": orm_path,
+        "Core + model_validate": core_path(TasksRepository(None, validate_reads=True)),
+        "Core + TaskDTO.trusted": core_path(TasksRepository(None)),
+    }
+    for name, read in results.items():
+        results[name] = measure(engine, read, count, rounds)
+        print(f"{name:<24} {results[name] * 1e6:>7.2f} us/row")
+    fetch = results.pop("fetch rows only")
+    speedup = (results["ORM + model_validate"] - fetch) / (
+        results["Core + TaskDTO.trusted"] - fetch
+    )
+    print(f"{'speedup over fetching':<24} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.rounds)
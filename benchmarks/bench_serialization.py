@@ -0,0 +1,108 @@
+"""
+CPU time of GET /tasks/ with a 10k row page: returning the Page model and
+letting FastAPI encode it (as before) against ModelJSONResponse.
+
+The page is built in memory so only the framework and serialization
+cost is measured, requests are driven straight through ASGI.
+
+    python -m benchmarks.bench_serialization --rows 10000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi import FastAPI
+
+from app.responses import ModelJSONResponse
+from models.dto import Page, TaskDTO
+
+
+def make_page(rows: int) -> Page[TaskDTO]:
+    return Page[TaskDTO](
+        items=[
+            TaskDTO(
+                id=uuid.uuid4(),
+                name=f"Task {i}",
+                text="Текст задачи для проверки сериализации",
+                status="created",
+            )
+            for i in range(rows)
+        ],
+        next_cursor="eyJrIjoiY3JlYXRlZF9hdCJ9",
+    )
+
+
+def legacy_app(page: Page[TaskDTO]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tasks/")
+    async def get_all_tasks():
+        return page
+
+    return app
+
+
+def fast_app(page: Page[TaskDTO]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tasks/", response_model=Page[TaskDTO])
+    async def get_all_tasks():
+        return ModelJSONResponse(page)
+
+    return app
+
+
+async def drive(app: FastAPI, requests: int) -> tuple[float, int]:
+    """CPU seconds per request and the body size"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/tasks/",
+        "raw_path": b"/tasks/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    started = time.process_time()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.process_time() - started) / requests, size // requests
+
+
+async def main(rows: int, requests: int):
+    page = make_page(rows)
+    apps = {"FastAPI encoding": legacy_app(page), "ModelJSONResponse": fast_app(page)}
+    results = {}
+    for name, app in apps.items():
+        await drive(app, 1)
+        results[name] = await drive(app, requests)
+
+    for name, (cpu, size) in results.items():
+        print(f"{name:<18} {cpu * 1000:>9.2f} ms CPU/request  {size} bytes")
+    speedup = results["FastAPI encoding"][0] / results["ModelJSONResponse"][0]
+    print(f"{'speedup':<18} {speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
@@ -1,4 +1,53 @@
+import logging
+import re
 from os import getenv
+from typing import Optional
+
+from config.engine import EngineProfile, build_engine_profile
+
+
+def _int_env(name: str, default: int) -> int:
+    value = getenv(name)
+    return int(value) if value else default
+
+
+def _float_env(name: str, default: float) -> float:
+    value = getenv(name)
+    return float(value) if value else default
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    value = getenv(name)
+    return value.lower() in ("1", "true", "yes", "on") if value else default
+
+
+# explicitly set variables override single fields of the chosen profile
+_ENGINE_ENV = {
+    "echo": ("TASK_MGR_DB_ECHO", _bool_env),
+    "pool_size": ("TASK_MGR_DB_POOL_SIZE", _int_env),
+    "max_overflow": ("TASK_MGR_DB_MAX_OVERFLOW", _int_env),
+    "pool_timeout": ("TASK_MGR_DB_POOL_TIMEOUT", _float_env),
+    "pool_recycle": ("TASK_MGR_DB_POOL_RECYCLE", _int_env),
+    "pool_pre_ping": ("TASK_MGR_DB_POOL_PRE_PING", _bool_env),
+    "statement_cache_size": ("TASK_MGR_DB_STATEMENT_CACHE_SIZE", _int_env),
+    "statement_timeout_ms": ("TASK_MGR_DB_STATEMENT_TIMEOUT_MS", _int_env),
+    "pgbouncer": ("TASK_MGR_DB_PGBOUNCER", _bool_env),
+}
+
+
+def _engine_overrides() -> dict:
+    return {
+        field: parse(name, None)
+        for field, (name, parse) in _ENGINE_ENV.items()
+        if getenv(name)
+    }
+
+
+def _asyncpg_url(url: str) -> str:
+    for scheme in ("postgresql://", "postgres://"):
+        if url.startswith(scheme):
+            return "postgresql+asyncpg://" + url[len(scheme) :]
+    return url
 
 
 class Configuration:
@@ -11,11 +60,170 @@ class Configuration:
         self._task_mgr_bearer = getenv("TASK_MGR_BEARER")
         self.__port = getenv("TASK_MGR_PORT")
         self.__host = getenv("TASK_MGR_HOST")
+        self._page_size_default = _int_env("TASK_MGR_PAGE_SIZE_DEFAULT", 50)
+        self._page_size_max = _int_env("TASK_MGR_PAGE_SIZE_MAX", 500)
+        self._batch_size_max = _int_env("TASK_MGR_BATCH_SIZE_MAX", 1000)
+        self._cache_enabled = _bool_env("TASK_MGR_CACHE_ENABLED", False)
+        self._cache_max_entries = _int_env("TASK_MGR_CACHE_MAX_ENTRIES", 10000)
+        self._cache_max_bytes = _int_env("TASK_MGR_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self._cache_ttl = _float_env("TASK_MGR_CACHE_TTL", 30.0)
+        self._export_fetch_size = _int_env("TASK_MGR_EXPORT_FETCH_SIZE", 1000)
+        self._import_chunk_size = _int_env("TASK_MGR_IMPORT_CHUNK_SIZE", 5000)
+        self._search_config = getenv("TASK_MGR_SEARCH_CONFIG") or "russian"
+        self._log_format = getenv("TASK_MGR_LOG_FORMAT") or "text"
+        # fraction of records kept per level, errors are always kept
+        self._log_sample_rates = {
+            logging.DEBUG: _float_env("TASK_MGR_LOG_SAMPLE_DEBUG", 1.0),
+            logging.INFO: _float_env("TASK_MGR_LOG_SAMPLE_INFO", 1.0),
+            logging.WARNING: _float_env("TASK_MGR_LOG_SAMPLE_WARNING", 1.0),
+        }
+        self._log_rate_limit = _float_env("TASK_MGR_LOG_RATE_LIMIT", 10.0)
+        self._log_queue_size = _int_env("TASK_MGR_LOG_QUEUE_SIZE", 10000)
+        self._replica_urls = [
+            _asyncpg_url(url.strip())
+            for url in (getenv("TASK_MGR_DB_REPLICA_URLS") or "").split(",")
+            if url.strip()
+        ]
+        self._replica_strategy = getenv("TASK_MGR_DB_REPLICA_STRATEGY") or "round_robin"
+        self._replica_health_interval = _float_env(
+            "TASK_MGR_DB_REPLICA_HEALTH_INTERVAL", 5.0
+        )
+        self._read_your_writes_window = _float_env(
+            "TASK_MGR_DB_READ_YOUR_WRITES_WINDOW", 2.0
+        )
+        self._slow_query_ms = _float_env("TASK_MGR_SLOW_QUERY_MS", 500.0)
+        self._slow_query_explain = _bool_env("TASK_MGR_SLOW_QUERY_EXPLAIN", False)
+        self._slow_query_top_n = _int_env("TASK_MGR_SLOW_QUERY_TOP_N", 20)
+        # debug mode: run TaskDTO validators on rows read from the database
+        self._validate_reads = _bool_env("TASK_MGR_VALIDATE_READS", False)
+        self._background_jobs = _bool_env("TASK_MGR_BACKGROUND_JOBS", True)
+        self._purge_retention = _float_env("TASK_MGR_PURGE_RETENTION", 7 * 86400.0)
+        self._purge_batch_size = _int_env("TASK_MGR_PURGE_BATCH_SIZE", 500)
+        self._purge_interval = _float_env("TASK_MGR_PURGE_INTERVAL", 300.0)
+        self._purge_pause = _float_env("TASK_MGR_PURGE_PAUSE", 0.1)
+        self._claim_lease = _float_env("TASK_MGR_CLAIM_LEASE", 300.0)
+        self._claim_limit_max = _int_env("TASK_MGR_CLAIM_LIMIT_MAX", 100)
+        self._lease_reap_interval = _float_env("TASK_MGR_LEASE_REAP_INTERVAL", 15.0)
+        self._stream_max_clients = _int_env("TASK_MGR_STREAM_MAX_CLIENTS", 1000)
+        self._stream_buffer = _int_env("TASK_MGR_STREAM_BUFFER", 1000)
+        self._stream_keepalive = _float_env("TASK_MGR_STREAM_KEEPALIVE", 15.0)
+        self._stats_reconcile_interval = _float_env(
+            "TASK_MGR_STATS_RECONCILE_INTERVAL", 3600.0
+        )
+        # where POST /tasks/ responses by Idempotency-Key are kept: memory
+        # (per process), table (shared by all workers) or off
+        self._idempotency_backend = getenv("TASK_MGR_IDEMPOTENCY_BACKEND") or "memory"
+        self._idempotency_ttl = _float_env("TASK_MGR_IDEMPOTENCY_TTL", 86400.0)
+        self._idempotency_max_keys = _int_env("TASK_MGR_IDEMPOTENCY_MAX_KEYS", 10000)
+        self._idempotency_wait = _float_env("TASK_MGR_IDEMPOTENCY_WAIT", 30.0)
+        # LISTEN needs a session of its own, not a PgBouncer transaction
+        self._stream_listen_url = getenv("TASK_MGR_STREAM_LISTEN_URL") or None
+        self._engine_profile = build_engine_profile(
+            getenv("TASK_MGR_DB_PROFILE") or "prod", _engine_overrides()
+        )
+        # a change commits up to one statement timeout after its updated_at
+        # was taken, GET /tasks/changes must not move past it before that
+        self._sync_settle = _float_env(
+            "TASK_MGR_SYNC_SETTLE",
+            max(5.0, self._engine_profile.statement_timeout_ms / 1000),
+        )
 
         for name, val in self.__dict__.items():
             if val == "":
                 raise ValueError(f"Missing config for {name[1:]}")
 
+        # every request but the exempt paths is checked against it
+        if not self._task_mgr_bearer:
+            raise ValueError("TASK_MGR_BEARER must be set")
+        if not 0 < self._page_size_default <= self._page_size_max:
+            raise ValueError(
+                "TASK_MGR_PAGE_SIZE_DEFAULT must be positive and not exceed "
+                "TASK_MGR_PAGE_SIZE_MAX"
+            )
+        # one multi-row INSERT has to fit into 32767 bind parameters
+        if not 0 < self._batch_size_max <= 4000:
+            raise ValueError("TASK_MGR_BATCH_SIZE_MAX must be between 1 and 4000")
+        if (
+            self._cache_enabled
+            and min(self._cache_max_entries, self._cache_max_bytes, self._cache_ttl)
+            <= 0
+        ):
+            raise ValueError("TASK_MGR_CACHE_* limits must be positive")
+        if self._export_fetch_size <= 0:
+            raise ValueError("TASK_MGR_EXPORT_FETCH_SIZE must be positive")
+        if self._import_chunk_size <= 0:
+            raise ValueError("TASK_MGR_IMPORT_CHUNK_SIZE must be positive")
+        if not re.fullmatch(r"[a-z_]+", self._search_config):
+            raise ValueError("TASK_MGR_SEARCH_CONFIG must be a text search config name")
+        if self._log_format not in ("text", "json"):
+            raise ValueError("TASK_MGR_LOG_FORMAT must be text or json")
+        if not all(0 <= rate <= 1 for rate in self._log_sample_rates.values()):
+            raise ValueError("TASK_MGR_LOG_SAMPLE_* must be between 0 and 1")
+        if self._log_rate_limit < 0 or self._log_queue_size <= 0:
+            raise ValueError("TASK_MGR_LOG_* limits must be positive")
+        if self._slow_query_ms < 0 or self._slow_query_top_n <= 0:
+            raise ValueError(
+                "TASK_MGR_SLOW_QUERY_MS must not be negative and "
+                "TASK_MGR_SLOW_QUERY_TOP_N must be positive"
+            )
+        if self._replica_strategy not in ("round_robin", "least_busy"):
+            raise ValueError(
+                "TASK_MGR_DB_REPLICA_STRATEGY must be round_robin or least_busy"
+            )
+        if self._replica_health_interval <= 0 or self._read_your_writes_window < 0:
+            raise ValueError(
+                "TASK_MGR_DB_REPLICA_HEALTH_INTERVAL must be positive and "
+                "TASK_MGR_DB_READ_YOUR_WRITES_WINDOW not negative"
+            )
+        if (
+            self._purge_retention < 0
+            or self._purge_batch_size <= 0
+            or self._purge_interval <= 0
+            or self._purge_pause < 0
+        ):
+            raise ValueError(
+                "TASK_MGR_PURGE_BATCH_SIZE and TASK_MGR_PURGE_INTERVAL must be "
+                "positive, TASK_MGR_PURGE_RETENTION and TASK_MGR_PURGE_PAUSE "
+                "not negative"
+            )
+        if (
+            self._claim_lease <= 0
+            or self._claim_limit_max <= 0
+            or self._lease_reap_interval <= 0
+        ):
+            raise ValueError(
+                "TASK_MGR_CLAIM_LEASE, TASK_MGR_CLAIM_LIMIT_MAX and "
+                "TASK_MGR_LEASE_REAP_INTERVAL must be positive"
+            )
+        if (
+            self._stream_max_clients < 0
+            or self._stream_buffer <= 0
+            or self._stream_keepalive <= 0
+        ):
+            raise ValueError(
+                "TASK_MGR_STREAM_MAX_CLIENTS must not be negative, "
+                "TASK_MGR_STREAM_BUFFER and TASK_MGR_STREAM_KEEPALIVE positive"
+            )
+        if self._sync_settle < self._engine_profile.statement_timeout_ms / 1000:
+            raise ValueError(
+                "TASK_MGR_SYNC_SETTLE must not be shorter than the statement "
+                "timeout, changes committing later would be skipped by syncs"
+            )
+        if self._sync_settle < 0:
+            raise ValueError("TASK_MGR_SYNC_SETTLE must not be negative")
+        if self._stats_reconcile_interval <= 0:
+            raise ValueError("TASK_MGR_STATS_RECONCILE_INTERVAL must be positive")
+        if self._idempotency_backend not in ("memory", "table", "off"):
+            raise ValueError(
+                "TASK_MGR_IDEMPOTENCY_BACKEND must be memory, table or off"
+            )
+        if (
+            self._idempotency_ttl <= 0
+            or self._idempotency_max_keys <= 0
+            or self._idempotency_wait <= 0
+        ):
+            raise ValueError("TASK_MGR_IDEMPOTENCY_* limits must be positive")
+
     @property
     def db_login(self):
         return self.__task_mgr_db_login
@@ -47,3 +255,167 @@ class Configuration:
     @property
     def port(self):
         return self.__port
+
+    @property
+    def page_size_default(self) -> int:
+        return self._page_size_default
+
+    @property
+    def page_size_max(self) -> int:
+        return self._page_size_max
+
+    @property
+    def batch_size_max(self) -> int:
+        return self._batch_size_max
+
+    @property
+    def cache_enabled(self) -> bool:
+        return self._cache_enabled
+
+    @property
+    def cache_max_entries(self) -> int:
+        return self._cache_max_entries
+
+    @property
+    def cache_max_bytes(self) -> int:
+        return self._cache_max_bytes
+
+    @property
+    def cache_ttl(self) -> float:
+        return self._cache_ttl
+
+    @property
+    def export_fetch_size(self) -> int:
+        return self._export_fetch_size
+
+    @property
+    def import_chunk_size(self) -> int:
+        return self._import_chunk_size
+
+    @property
+    def search_config(self) -> str:
+        return self._search_config
+
+    @property
+    def log_format(self) -> str:
+        return self._log_format
+
+    @property
+    def log_sample_rates(self) -> dict[int, float]:
+        return self._log_sample_rates
+
+    @property
+    def log_rate_limit(self) -> float:
+        return self._log_rate_limit
+
+    @property
+    def log_queue_size(self) -> int:
+        return self._log_queue_size
+
+    @property
+    def engine_profile(self) -> EngineProfile:
+        return self._engine_profile
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return self._replica_urls
+
+    @property
+    def replica_strategy(self) -> str:
+        return self._replica_strategy
+
+    @property
+    def replica_health_interval(self) -> float:
+        return self._replica_health_interval
+
+    @property
+    def read_your_writes_window(self) -> float:
+        return self._read_your_writes_window
+
+    @property
+    def slow_query_ms(self) -> float:
+        return self._slow_query_ms
+
+    @property
+    def slow_query_explain(self) -> bool:
+        return self._slow_query_explain
+
+    @property
+    def slow_query_top_n(self) -> int:
+        return self._slow_query_top_n
+
+    @property
+    def validate_reads(self) -> bool:
+        return self._validate_reads
+
+    @property
+    def background_jobs(self) -> bool:
+        return self._background_jobs
+
+    @property
+    def purge_retention(self) -> float:
+        return self._purge_retention
+
+    @property
+    def purge_batch_size(self) -> int:
+        return self._purge_batch_size
+
+    @property
+    def purge_interval(self) -> float:
+        return self._purge_interval
+
+    @property
+    def purge_pause(self) -> float:
+        return self._purge_pause
+
+    @property
+    def claim_lease(self) -> float:
+        return self._claim_lease
+
+    @property
+    def claim_limit_max(self) -> int:
+        return self._claim_limit_max
+
+    @property
+    def lease_reap_interval(self) -> float:
+        return self._lease_reap_interval
+
+    @property
+    def stream_max_clients(self) -> int:
+        return self._stream_max_clients
+
+    @property
+    def stream_buffer(self) -> int:
+        return self._stream_buffer
+
+    @property
+    def stream_keepalive(self) -> float:
+        return self._stream_keepalive
+
+    @property
+    def stream_listen_url(self) -> Optional[str]:
+        return self._stream_listen_url
+
+    @property
+    def sync_settle(self) -> float:
+        return self._sync_settle
+
+    @property
+    def stats_reconcile_interval(self) -> float:
+        return self._stats_reconcile_interval
+
+    @property
+    def idempotency_backend(self) -> str:
+        return self._idempotency_backend
+
+    @property
+    def idempotency_ttl(self) -> float:
+        return self._idempotency_ttl
+
+    @property
+    def idempotency_max_keys(self) -> int:
+        return self._idempotency_max_keys
+
+    @property
+    def idempotency_wait(self) -> float:
+        return self._idempotency_wait
@@ -0,0 +1,106 @@
+import uuid
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+ProfileName = Literal["dev", "prod", "benchmark"]
+
+
+class EngineProfile(BaseModel):
+    """
+    Engine and pool parameters for create_async_engine.
+
+    pool_size + max_overflow is the connection limit of one worker process,
+    multiply it by the number of workers when sizing the server or PgBouncer
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    echo: bool = False
+    pool_size: int = Field(10, ge=1, le=500)
+    max_overflow: int = Field(10, ge=0, le=500)
+    pool_timeout: float = Field(10.0, gt=0)
+    # seconds, -1 keeps connections forever
+    pool_recycle: int = Field(1800, ge=-1)
+    pool_pre_ping: bool = True
+    statement_cache_size: int = Field(500, ge=0)
+    # milliseconds, 0 leaves the server default
+    statement_timeout_ms: int = Field(30000, ge=0)
+    # transaction pooling: prepared statements do not survive between
+    # transactions since the server connection may change
+    pgbouncer: bool = False
+
+    @model_validator(mode="after")
+    def _check_pgbouncer(self):
+        if self.pgbouncer and self.statement_cache_size:
+            raise ValueError(
+                "statement_cache_size must be 0 with PgBouncer transaction pooling"
+            )
+        return self
+
+    @property
+    def max_connections(self) -> int:
+        return self.pool_size + self.max_overflow
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for create_async_engine with the asyncpg driver"""
+        # the first is the cache of asyncpg itself, the second one of the
+        # SQLAlchemy adapter, both keep prepared statements per connection
+        connect_args: dict[str, Any] = {
+            "statement_cache_size": self.statement_cache_size,
+            "prepared_statement_cache_size": self.statement_cache_size,
+        }
+        if self.pgbouncer:
+            # names must not collide when PgBouncer hands over a server
+            # connection that still has statements prepared by another client
+            connect_args["prepared_statement_name_func"] = (
+                lambda: f"__asyncpg_{uuid.uuid4()}__"
+            )
+        elif self.statement_timeout_ms:
+            # PgBouncer rejects unknown startup parameters, behind it the
+            # timeout has to be set on the database role instead
+            connect_args["server_settings"] = {
+                "statement_timeout": str(self.statement_timeout_ms)
+            }
+        return {
+            "echo": self.echo,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "connect_args": connect_args,
+        }
+
+
+ENGINE_PROFILES: dict[str, EngineProfile] = {
+    "dev": EngineProfile(
+        echo=True,
+        pool_size=5,
+        max_overflow=5,
+        pool_timeout=30.0,
+        statement_timeout_ms=0,
+    ),
+    "prod": EngineProfile(),
+    "benchmark": EngineProfile(
+        pool_size=20,
+        max_overflow=0,
+        pool_timeout=30.0,
+        pool_recycle=-1,
+        pool_pre_ping=False,
+        statement_timeout_ms=0,
+    ),
+}
+
+
+def build_engine_profile(name: str, overrides: dict[str, Any]) -> EngineProfile:
+    """Named profile with explicitly set values on top, validated as a whole"""
+    if name not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown engine profile {name}, use one of {list(ENGINE_PROFILES)}"
+        )
+    values = ENGINE_PROFILES[name].model_dump()
+    if overrides.get("pgbouncer"):
+        values["statement_cache_size"] = 0
+    values.update(overrides)
+    return EngineProfile.model_validate(values)
@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from app.importer import TaskImporter, iter_records
+from config.cfg import Configuration
+from repos.gateway import DatabaseGateway
+
+READ_SIZE = 1024 * 1024
+
+
+async def read_file(path: Path):
+    with path.open("rb") as file:
+        while chunk := file.read(READ_SIZE):
+            yield chunk
+
+
+async def run(path: Path, fmt: str, chunk_size: int | None):
+    configuration = Configuration()
+    gateway = DatabaseGateway(configuration)
+    importer = TaskImporter(gateway, chunk_size or configuration.import_chunk_size)
+    try:
+        report = await importer.run(iter_records(read_file(path), fmt))
+    finally:
+        await gateway.close()
+    print(report.model_dump_json(indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load tasks with COPY")
+    parser.add_argument("path", type=Path, help="NDJSON or CSV file")
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        help="input format, guessed from the file extension by default",
+    )
+    parser.add_argument("--chunk-size", type=int, help="rows per COPY")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+    asyncio.run(run(args.path, fmt, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
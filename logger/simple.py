@@ -1,7 +1,24 @@
 import logging
+from typing import Mapping, Optional
 
+from logger.structured import configure_structured_logger
+
+
+def configure_logger(
+    name,
+    log_format: str = "text",
+    sample_rates: Optional[Mapping[int, float]] = None,
+    rate_limit: Optional[float] = None,
+    queue_size: int = 10000,
+) -> logging.Logger:
+    if log_format == "json":
+        return configure_structured_logger(
+            name,
+            sample_rates=sample_rates,
+            rate_limit=rate_limit,
+            queue_size=queue_size,
+        )
 
-def configure_logger(name) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
@@ -0,0 +1,195 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Mapping, Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# attributes every LogRecord has, anything else came from `extra=`
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "request_id", "suppressed"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, fields passed with `extra=` are kept as is"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Copies the request id from the context into the record,
+    has to run on the caller side since the listener thread has no context
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records per level, unlisted levels are always kept"""
+
+    def __init__(
+        self,
+        rates: Mapping[int, float],
+        rand: Callable[[], float] = random.random,
+    ):
+        super().__init__()
+        self._rates = dict(rates)
+        self._rand = rand
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self._rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or self._rand() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (logger, file, line) for records from
+    min_level up, the next record let through carries the number of dropped
+    ones. Lower levels are left to sampling: one call site may log every
+    request (the access log) and must not be cut to a few per second
+    """
+
+    def __init__(
+        self,
+        per_second: float,
+        burst: Optional[float] = None,
+        min_level: int = logging.WARNING,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self._rate = per_second
+        self._burst = burst or per_second
+        self._min_level = min_level
+        self._clock = clock
+        self._buckets: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self._min_level:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = self._clock()
+        with self._lock:
+            # [tokens, last refill, suppressed since last emitted]
+            bucket = self._buckets.setdefault(key, [self._burst, now, 0])
+            bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # like QueueHandler.prepare, but the traceback stays a separate field
+        # and the JSON formatting itself is left to the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class FlushingQueueListener(QueueListener):
+    """Remembers whether it runs, so stopping it twice is harmless"""
+
+    running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        """Flush what is queued, a no-op on an already stopped listener"""
+        if self.running:
+            self.running = False
+            super().stop()
+
+
+def configure_structured_logger(
+    name: str,
+    level: int = logging.INFO,
+    sample_rates: Optional[Mapping[int, float]] = None,
+    rate_limit: Optional[float] = None,
+    queue_size: int = 10000,
+    stream=None,
+) -> logging.Logger:
+    """
+    JSON logger whose records are formatted and written by a background
+    thread, filtering happens before the record is queued
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if any(isinstance(h, DroppingQueueHandler) for h in logger.handlers):
+        return logger
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter(rate_limit))
+    queue_handler.addFilter(RequestContextFilter())
+
+    listener = FlushingQueueListener(queue_handler.queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    queue_handler.listener = listener
+
+    logger.addHandler(queue_handler)
+    # records must not also reach synchronous handlers of the root logger
+    logger.propagate = False
+    return logger
@@ -0,0 +1,261 @@
+"""
+Metrics of the app: HTTP requests, DB queries, connection pools and
+repository calls. Every gateway owns a Metrics with a registry of its own,
+rendered by /metrics, so apps and tests never share counters
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from metrics.slow_queries import SlowQueryLog
+
+# ASGI scope of the request being handled, the router fills in the route
+_scope_var: ContextVar[Optional[Scope]] = ContextVar("metrics_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """Route template of the current request, the path if nothing matched"""
+    scope = _scope_var.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return route.path if route is not None else scope.get("path")
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long a checkout waited"""
+
+    # histogram child of the engine, set by Metrics.instrument_engine
+    wait_seconds = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_seconds is not None:
+                self.wait_seconds.observe(time.perf_counter() - started)
+
+
+class _PoolCollector:
+    """Pool gauges read from the pools themselves on scrape"""
+
+    GAUGES = (
+        ("taskmgr_db_pool_checked_out", "Connections in use", "checkedout"),
+        (
+            "taskmgr_db_pool_overflow",
+            "Connections open above pool_size, negative while the pool is not full",
+            "overflow",
+        ),
+        ("taskmgr_db_pool_size", "Configured pool_size", "size"),
+    )
+
+    def __init__(self):
+        # engine label -> pool
+        self.pools: dict[str, TimedQueuePool] = {}
+
+    def collect(self):
+        for name, documentation, read in self.GAUGES:
+            family = GaugeMetricFamily(name, documentation, labels=["engine"])
+            for label, pool in self.pools.items():
+                family.add_metric([label], getattr(pool, read)())
+            yield family
+
+
+class Metrics:
+    """Every metric of one app, in a registry of its own"""
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        registry = self.registry
+        self.http_requests = Counter(
+            "taskmgr_http_requests",
+            "HTTP requests",
+            ("method", "route", "status"),
+            registry=registry,
+        )
+        self.http_latency = Histogram(
+            "taskmgr_http_request_duration_seconds",
+            "HTTP request latency",
+            ("method", "route"),
+            registry=registry,
+        )
+        self.http_in_flight = Gauge(
+            "taskmgr_http_requests_in_flight",
+            "HTTP requests being handled",
+            registry=registry,
+        )
+        self.db_queries = Counter(
+            "taskmgr_db_queries",
+            "SQL statements executed",
+            ("engine", "operation"),
+            registry=registry,
+        )
+        self.db_query_latency = Histogram(
+            "taskmgr_db_query_duration_seconds",
+            "SQL statement execution time",
+            ("engine", "operation"),
+            registry=registry,
+        )
+        self.db_errors = Counter(
+            "taskmgr_db_errors", "Failed SQL statements", ("engine",), registry=registry
+        )
+        self.pool_wait = Histogram(
+            "taskmgr_db_pool_wait_seconds",
+            "Time spent waiting for a pooled connection",
+            ("engine",),
+            buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+            registry=registry,
+        )
+        self.repository_latency = Histogram(
+            "taskmgr_repository_call_duration_seconds",
+            "TasksRepository method time, including the queries it runs",
+            ("method",),
+            registry=registry,
+        )
+        self.stream_subscribers = Gauge(
+            "taskmgr_stream_subscribers",
+            "Clients connected to the change stream",
+            registry=registry,
+        )
+        self.stream_events = Counter(
+            "taskmgr_stream_events",
+            "Task changes received from the database",
+            registry=registry,
+        )
+        self.stream_dropped = Counter(
+            "taskmgr_stream_dropped_subscribers",
+            "Change stream clients disconnected for falling behind",
+            registry=registry,
+        )
+        self.idempotent_replays = Counter(
+            "taskmgr_idempotent_replays",
+            "Stored responses sent again for a repeated Idempotency-Key",
+            registry=registry,
+        )
+        self._pools = _PoolCollector()
+        registry.register(self._pools)
+
+    def render(self) -> bytes:
+        """Prometheus text format of every metric"""
+        return generate_latest(self.registry)
+
+    def instrument_engine(
+        self,
+        engine: AsyncEngine,
+        label: str,
+        slow_queries: Optional[SlowQueryLog] = None,
+    ):
+        """Count and time statements of the engine, expose its pool"""
+        sync_engine = engine.sync_engine
+        if isinstance(sync_engine.pool, TimedQueuePool):
+            sync_engine.pool.wait_seconds = self.pool_wait.labels(label)
+            self._pools.pools[label] = sync_engine.pool
+        errors = self.db_errors.labels(label)
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info["query_started"] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info.pop("query_started", 0.0)
+            operation = statement.lstrip()[:6].upper()
+            if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+                operation = "OTHER"
+            self.db_queries.labels(label, operation).inc()
+            self.db_query_latency.labels(label, operation).observe(elapsed)
+            if slow_queries is not None and elapsed >= slow_queries.threshold:
+                slow_queries.record(
+                    statement,
+                    parameters,
+                    elapsed,
+                    current_route(),
+                    engine=engine,
+                    executemany=executemany,
+                )
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(context):
+            errors.inc()
+
+    def forget_engine(self, label: str):
+        self._pools.pools.pop(label, None)
+
+
+def timed(method):
+    """
+    Record the duration of an async repository method in the Metrics of
+    the repository, nothing is recorded for one built without
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if self._metrics is None:
+            return await method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self._metrics.repository_latency.labels(name).observe(
+                time.perf_counter() - started
+            )
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    Per-route request counts and latency, labelled with the route template
+    so that ids in paths do not create new series
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.http_in_flight.inc()
+        token = _scope_var.set(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _scope_var.reset(token)
+            metrics.http_in_flight.dec()
+            # the router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            metrics.http_latency.labels(scope["method"], template).observe(elapsed)
+            metrics.http_requests.labels(
+                scope["method"], template, str(status_code)
+            ).inc()
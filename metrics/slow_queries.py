@@ -0,0 +1,170 @@
+"""
+Slow statement detection: statements slower than a threshold are logged
+with a fingerprint, redacted parameters and the route they came from,
+and aggregated per fingerprint so the worst ones can be listed
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+_SPACE = re.compile(r"\s+")
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and placeholders removed and lists collapsed"""
+    text = _STRING.sub("?", statement)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?+)", text)
+    text = _ROWS.sub(r"\1, ...", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def fingerprint_id(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def _redact_value(value: Any) -> Any:
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(parameters: Any, executemany: bool = False) -> Any:
+    """Types and sizes only, values never leave the process"""
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+class SlowQueryLog:
+    """
+    Keeps per fingerprint stats of slow statements, optionally with the
+    plan from a plain EXPLAIN run in the background on another connection
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        top_n: int = 20,
+        explain: bool = False,
+        max_fingerprints: int = 1000,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.threshold = threshold
+        self._top_n = top_n
+        self._explain = explain
+        self._max_fingerprints = max_fingerprints
+        self._logger = logger or logging.getLogger(__name__)
+        self._stats: dict[str, dict] = {}
+        self._explaining: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        route: Optional[str],
+        engine: Optional[AsyncEngine] = None,
+        executemany: bool = False,
+    ):
+        text = fingerprint(statement)
+        key = fingerprint_id(text)
+        redacted = redact(parameters, executemany)
+        self._logger.warning(
+            f"Slow query {key} took {duration * 1000:.1f} ms on {route}",
+            extra={
+                "fingerprint": key,
+                "statement": text,
+                "parameters": redacted,
+                "duration_ms": round(duration * 1000, 3),
+                "route": route,
+            },
+        )
+
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self._max_fingerprints:
+                # forget the fingerprint that is least interesting
+                del self._stats[
+                    min(self._stats, key=lambda k: self._stats[k]["max_ms"])
+                ]
+            stats = self._stats[key] = {
+                "fingerprint": key,
+                "statement": text,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_route": None,
+                "last_parameters": None,
+                "plan": None,
+            }
+        duration_ms = duration * 1000
+        stats["calls"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["last_route"] = route
+        stats["last_parameters"] = redacted
+
+        if (
+            self._explain
+            and engine is not None
+            and not executemany
+            and stats["plan"] is None
+            and key not in self._explaining
+            and text.split(" ", 1)[0].upper() in _EXPLAINABLE
+        ):
+            self._explaining.add(key)
+            task = asyncio.get_running_loop().create_task(
+                self._capture_plan(engine, key, statement, parameters)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _capture_plan(
+        self, engine: AsyncEngine, key: str, statement: str, parameters: Any
+    ):
+        # without ANALYZE the statement is only planned, never executed
+        try:
+            if isinstance(parameters, list):
+                # a list would be taken for several parameter sets
+                parameters = tuple(parameters)
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+        except Exception as e:
+            self._logger.warning(f"EXPLAIN for slow query {key} failed: {e}")
+            plan = f"EXPLAIN failed: {e}"
+        finally:
+            self._explaining.discard(key)
+        if key in self._stats:
+            self._stats[key]["plan"] = plan
+
+    def top(self, n: Optional[int] = None) -> list[dict]:
+        """Slowest fingerprints first"""
+        ranked = sorted(self._stats.values(), key=lambda s: s["max_ms"], reverse=True)
+        return [
+            {**stats, "mean_ms": stats["total_ms"] / stats["calls"]}
+            for stats in ranked[: n or self._top_n]
+        ]
@@ -1,9 +1,11 @@
 import datetime
 import uuid
-from typing import Literal, Optional
+from typing import Any, Generic, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, Field, field_validator
 
+T = TypeVar("T")
+
 
 class TaskDTO(BaseModel):
     """
@@ -14,13 +16,17 @@ class TaskDTO(BaseModel):
         name: Название задачи (1-1000 символов, не пустое)
         text: Текст задачи (1-1000 символов, не пустое)
         status: Статус задачи: created, processing или done
+        version: Номер версии, растет с каждым изменением (ETag, If-Match)
+        updated_at: Время последнего изменения, не сериализуется
     """
 
     id: uuid.UUID
     name: str = Field(..., min_length=1, max_length=1000, pattern=r"^.*\S.*$")
     text: str = Field(..., min_length=1, max_length=1000, pattern=r"^.*\S.*$")
     status: Literal["created", "processing", "done"]
+    version: int = 1
     # created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime] = Field(None, exclude=True)
 
     class Config:
         from_attributes = True
@@ -30,3 +36,196 @@ class TaskDTO(BaseModel):
         if not v or v.isspace():
             raise ValueError("Text cannot be empty or whitespace only")
         return v.strip()
+
+    @classmethod
+    def trusted(cls, id, name, text, status, updated_at=None, version=1) -> "TaskDTO":
+        """
+        Сборка без валидации для строк из БД, уже проверенных при записи.
+        Все поля передаются всегда, поэтому набор заданных полей
+        известен заранее и model_construct не собирает его заново
+        """
+        return cls.model_construct(
+            set(_TASK_FIELDS),
+            id=id,
+            name=name,
+            text=text,
+            status=status,
+            version=version,
+            updated_at=updated_at,
+        )
+
+
+_TASK_FIELDS = tuple(TaskDTO.model_fields)
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Страница списка с курсором на следующую страницу.
+
+    Attributes:
+        items: Элементы текущей страницы
+        next_cursor: Непрозрачный курсор следующей страницы, None на последней
+    """
+
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+class BatchItemResultDTO(BaseModel):
+    """
+    Результат обработки одного элемента пакетного запроса.
+
+    Attributes:
+        index: Позиция элемента в запросе
+        ok: Успешно ли обработан элемент
+        task: Созданная задача, если элемент обработан
+        errors: Ошибки валидации, если элемент отклонен
+    """
+
+    index: int
+    ok: bool
+    task: Optional[TaskDTO] = None
+    errors: Optional[list[dict[str, Any]]] = None
+
+
+class BatchCreateResultDTO(BaseModel):
+    """
+    Итог пакетного создания задач.
+
+    Attributes:
+        created: Количество созданных задач
+        failed: Количество отклоненных элементов
+        results: Результаты по каждому элементу в порядке запроса
+    """
+
+    created: int
+    failed: int
+    results: list[BatchItemResultDTO]
+
+
+class BatchUpdateResultDTO(BaseModel):
+    """
+    Итог пакетного обновления задач.
+
+    Attributes:
+        updated: Обновленные задачи
+        missing: ID задач, которые не найдены
+    """
+
+    updated: list[TaskDTO]
+    missing: list[uuid.UUID]
+
+
+class BatchDeleteResultDTO(BaseModel):
+    """
+    Итог пакетного удаления задач.
+
+    Attributes:
+        deleted: ID удаленных задач
+        missing: ID задач, которые не найдены
+    """
+
+    deleted: list[uuid.UUID]
+    missing: list[uuid.UUID]
+
+
+class TaskChangeDTO(BaseModel):
+    """
+    Изменение задачи для синхронизации клиента.
+
+    Attributes:
+        id: UUID задачи
+        updated_at: Время изменения
+        version: Версия задачи после изменения
+        deleted: Задача удалена, поля задачи тогда не заполнены
+        name: Название задачи, None для удаленной
+        text: Текст задачи, None для удаленной
+        status: Статус задачи, None для удаленной
+    """
+
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    version: int
+    deleted: bool = False
+    name: Optional[str] = None
+    text: Optional[str] = None
+    status: Optional[Literal["created", "processing", "done"]] = None
+
+
+class ChangesPageDTO(BaseModel):
+    """
+    Страница изменений задач после токена синхронизации.
+
+    Attributes:
+        items: Изменения в порядке updated_at
+        next_token: Токен для следующего запроса, сохраняется клиентом
+        has_more: Есть ли еще изменения, их стоит запросить сразу
+    """
+
+    items: list[TaskChangeDTO]
+    next_token: str
+    has_more: bool
+
+
+class TaskStatsDTO(BaseModel):
+    """
+    Количество задач по статусам, без удаленных.
+
+    Attributes:
+        created: Задачи в статусе created
+        processing: Задачи в статусе processing
+        done: Задачи в статусе done
+        total: Все задачи
+    """
+
+    created: int = 0
+    processing: int = 0
+    done: int = 0
+    total: int = 0
+
+
+class ClaimResultDTO(BaseModel):
+    """
+    Задачи, захваченные обработчиком из очереди.
+
+    Attributes:
+        worker: Идентификатор обработчика, за которым закреплены задачи
+        lease_expires_at: Срок аренды, после него задачи вернутся в created
+        items: Захваченные задачи, самые старые первыми
+    """
+
+    worker: str
+    lease_expires_at: datetime.datetime
+    items: list[TaskDTO]
+
+
+class ImportErrorDTO(BaseModel):
+    """
+    Отклоненная строка импорта.
+
+    Attributes:
+        line: Номер строки во входных данных
+        error: Причина отказа
+    """
+
+    line: int
+    error: str
+
+
+class ImportReportDTO(BaseModel):
+    """
+    Итог массового импорта задач.
+
+    Attributes:
+        imported: Количество загруженных задач
+        rejected: Количество отклоненных строк
+        elapsed_seconds: Длительность импорта
+        rows_per_second: Скорость загрузки
+        errors: Первые отклоненные строки с причинами
+    """
+
+    imported: int = 0
+    rejected: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: list[ImportErrorDTO] = []
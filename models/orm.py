@@ -1,18 +1,128 @@
+import os
+import re
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Uuid, DateTime
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    LargeBinary,
+    SmallInteger,
+    String,
+    Uuid,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import declarative_base, deferred
 
 Base = declarative_base()
 
 
+def _search_config() -> str:
+    # the migration built the column from the same setting, metadata that
+    # disagrees with the database makes autogenerate report a change
+    config = os.getenv("TASK_MGR_SEARCH_CONFIG") or "russian"
+    if not re.fullmatch(r"[a-z_]+", config):
+        raise ValueError(f"Invalid text search configuration: {config}")
+    return config
+
+
+def search_vector_sql(config: str) -> str:
+    return (
+        f"setweight(to_tsvector('{config}', name), 'A') || "
+        f"setweight(to_tsvector('{config}', text), 'B')"
+    )
+
+
 class TaskORM(Base):
     __tablename__ = "tasks"
-    id = Column(Uuid, primary_key=True, index=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
     text = Column(String, nullable=False)
     status = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     deleted_at = Column(DateTime, default=None, nullable=True)
+    # bumped by every write, compared by conditional updates
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
+    # set while a worker holds the task in processing
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    # generated by the database, the text search configuration comes from
+    # TASK_MGR_SEARCH_CONFIG ("russian" by default) like in the migration
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(search_vector_sql(_search_config()), persisted=True))
+    )
+
+    # reads only ever see live rows, so their indexes skip tombstones;
+    # updated_at keeps covering tombstones for consumers of deletions
+    __table_args__ = (
+        Index(
+            "ix_tasks_live_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_tasks_live_status_created_at_id",
+            "status",
+            "created_at",
+            "id",
+            postgresql_where=deleted_at.is_(None),
+        ),
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_tasks_live_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=deleted_at.is_(None),
+        ),
+        # the work queue: claimable tasks oldest first, and expired leases
+        Index(
+            "ix_tasks_claimable_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=(status == "created") & deleted_at.is_(None),
+        ),
+        Index(
+            "ix_tasks_processing_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=status == "processing",
+        ),
+        Index(
+            "ix_tasks_deleted_at",
+            "deleted_at",
+            postgresql_where=deleted_at.isnot(None),
+        ),
+    )
+
+
+class TaskStatusCountORM(Base):
+    """
+    Live tasks per status, kept by triggers on tasks. Every status has
+    several shard rows that writers add their deltas to, so concurrent
+    transactions rarely wait on the same row; a count is the sum of them
+    """
+
+    __tablename__ = "task_status_counts"
+    status = Column(String, primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+class IdempotencyKeyORM(Base):
+    """
+    Responses of POST /tasks/ by Idempotency-Key, for the table backend.
+    A row without a body belongs to a request that has not committed yet
+    """
+
+    __tablename__ = "idempotency_keys"
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(SmallInteger, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
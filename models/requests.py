@@ -1,4 +1,6 @@
-from typing import Literal, Optional
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -39,3 +41,65 @@ class TaskUpdateRequest(BaseModel):
         return super().model_dump(
             exclude_unset=exclude_unset, exclude_none=exclude_none, **kwargs
         )
+
+
+class TaskListQuery(BaseModel):
+    """Query parameters to filter and sort the task list.
+
+    Ranges are half-open: *_from is inclusive, *_to is exclusive.
+    """
+
+    status: Optional[Literal["created", "processing", "done"]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    sort_by: Literal["created_at", "updated_at"] = "created_at"
+    order: Literal["asc", "desc"] = "asc"
+
+    @field_validator("created_from", "created_to", "updated_from", "updated_to")
+    def to_naive_utc(cls, v):
+        # timestamps are stored as naive UTC
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class TaskBatchCreateRequest(BaseModel):
+    """Model to request creation of many tasks in one statement.
+
+    Items are validated one by one against TaskCreateRequest so that every
+    failure can be reported against its index.
+    atomic: nothing is inserted if any item is invalid.
+    best_effort: valid items are inserted, invalid ones are reported.
+    """
+
+    items: list[dict[str, Any]] = Field(..., min_length=1)
+    mode: Literal["atomic", "best_effort"] = "atomic"
+
+
+class TaskBatchUpdateItem(TaskUpdateRequest):
+    """Patch for a single task inside a batch update"""
+
+    id: uuid.UUID
+
+
+class TaskBatchUpdateRequest(BaseModel):
+    """Model to request update of many tasks by ID"""
+
+    items: list[TaskBatchUpdateItem] = Field(..., min_length=1)
+
+    @field_validator("items")
+    def validate_items(cls, v):
+        ids = [item.id for item in v]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Task IDs must be unique within a batch")
+        if any(not item.model_dump(exclude={"id"}, exclude_none=True) for item in v):
+            raise ValueError("Every item must provide at least one field to update")
+        return v
+
+
+class TaskBatchDeleteRequest(BaseModel):
+    """Model to request deletion of many tasks by ID"""
+
+    ids: list[uuid.UUID] = Field(..., min_length=1)
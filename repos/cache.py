@@ -0,0 +1,224 @@
+import sys
+import time
+import uuid
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Optional, Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.dto import ChangesPageDTO, ClaimResultDTO, Page, TaskDTO, TaskStatsDTO
+from repos.interface import ITasksRepository
+
+
+class ICacheBackend(Protocol):
+    """
+    Storage behind CachedTasksRepository. Methods are async so that a shared
+    backend (e.g. redis) can be plugged in without touching the repository
+    """
+
+    async def get(self, key: Hashable) -> Optional[Any]: ...
+
+    async def set(self, key: Hashable, value: Any) -> None: ...
+
+    async def delete(self, key: Hashable) -> None: ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a pydantic model in bytes"""
+    fields = getattr(value, "__dict__", {})
+    return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in fields.values())
+
+
+class LRUCacheBackend:
+    """In-process LRU bounded by entry count and estimated size, with TTL"""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self._entries: OrderedDict = OrderedDict()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self._max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (self._clock() + self._ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    async def delete(self, key: Hashable) -> None:
+        self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+class CachedTasksRepository(ITasksRepository):
+    """
+    Read-through cache for get_by_id in front of another tasks repository,
+    filled by primary sessions only.
+
+    Writes drop affected entries immediately and once more after the
+    session commits, so a concurrent reader that fetched the old
+    row before the commit can not keep it cached. Anything that slips
+    through is bounded by the backend TTL.
+    """
+
+    def __init__(
+        self,
+        repository: ITasksRepository,
+        cache: ICacheBackend,
+        session: Optional[AsyncSession] = None,
+    ):
+        self._repository = repository
+        self._cache = cache
+        self._session = session
+
+    async def get_by_id(self, task_id: uuid.UUID) -> TaskDTO | None:
+        task = await self._cache.get(task_id)
+        if task is None:
+            task = await self._repository.get_by_id(task_id)
+            # a lagging replica could cache a task older than a client's
+            # own write, entries only ever come from the primary
+            if task is not None and not self._on_replica():
+                await self._cache.set(task_id, task)
+        return task
+
+    async def get_version(self, task_id: uuid.UUID) -> int | None:
+        task = await self._cache.get(task_id)
+        if task is not None:
+            return task.version
+        return await self._repository.get_version(task_id)
+
+    async def get_all(self, *args, **kwargs) -> Page[TaskDTO]:
+        return await self._repository.get_all(*args, **kwargs)
+
+    async def get_page_versions(self, *args, **kwargs) -> list[tuple]:
+        return await self._repository.get_page_versions(*args, **kwargs)
+
+    async def search(self, *args, **kwargs) -> Page[TaskDTO]:
+        return await self._repository.search(*args, **kwargs)
+
+    async def get_changes(self, *args, **kwargs) -> ChangesPageDTO:
+        return await self._repository.get_changes(*args, **kwargs)
+
+    async def get_status_counts(self) -> TaskStatsDTO:
+        return await self._repository.get_status_counts()
+
+    async def reconcile_status_counts(self) -> Optional[dict[str, int]]:
+        return await self._repository.reconcile_status_counts()
+
+    def stream_all(self, *args, **kwargs) -> AsyncIterator[TaskDTO]:
+        return self._repository.stream_all(*args, **kwargs)
+
+    async def create(self, task_data: dict) -> TaskDTO:
+        task = await self._repository.create(task_data)
+        await self._invalidate([task.id])
+        return task
+
+    async def create_many(self, tasks_data: list[Dict]) -> list[TaskDTO]:
+        tasks = await self._repository.create_many(tasks_data)
+        await self._invalidate([task.id for task in tasks])
+        return tasks
+
+    async def update(
+        self,
+        task_id: uuid.UUID,
+        update_data: Dict,
+        expected_version: Optional[int] = None,
+    ) -> TaskDTO:
+        # the swap is always decided by the database, never by the cache
+        await self._invalidate([task_id])
+        return await self._repository.update(task_id, update_data, expected_version)
+
+    async def update_many(self, patches: list[Dict]) -> list[TaskDTO]:
+        await self._invalidate([patch["id"] for patch in patches])
+        return await self._repository.update_many(patches)
+
+    async def delete(self, task_id: uuid.UUID) -> bool:
+        await self._invalidate([task_id])
+        return await self._repository.delete(task_id)
+
+    async def delete_many(self, task_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+        await self._invalidate(task_ids)
+        return await self._repository.delete_many(task_ids)
+
+    async def claim(self, limit: int, worker: str, lease: float) -> ClaimResultDTO:
+        # the claimed IDs are only known once the statement ran
+        result = await self._repository.claim(limit, worker, lease)
+        await self._invalidate([task.id for task in result.items])
+        return result
+
+    async def release_expired_leases(self, limit: int) -> list[uuid.UUID]:
+        task_ids = await self._repository.release_expired_leases(limit)
+        await self._invalidate(task_ids)
+        return task_ids
+
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        # tombstones were invalidated when they were deleted
+        return await self._repository.purge_deleted(deleted_before, limit)
+
+    def _on_replica(self) -> bool:
+        return self._session is not None and self._session.info.get("replica", False)
+
+    async def _invalidate(self, task_ids: list[uuid.UUID]):
+        for task_id in task_ids:
+            await self._cache.delete(task_id)
+
+        if self._session is not None:
+
+            async def after_commit():
+                for task_id in task_ids:
+                    await self._cache.delete(task_id)
+
+            self._session.info.setdefault("after_commit", []).append(after_commit)
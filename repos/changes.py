@@ -0,0 +1,135 @@
+"""
+Task change feed: one LISTEN connection per process receives the
+notifications sent by the tasks triggers and fans them out to every
+subscriber of GET /tasks/stream
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, Optional
+
+from metrics.instruments import Metrics
+
+# must match the channel used by the trigger in the migration
+CHANNEL = "tasks_changes"
+
+
+class Subscription:
+    """
+    Pending events of one client. Events of the same task replace each
+    other, so a slow client only ever gets the latest state of a task;
+    a client with more changed tasks pending than max_pending is overflowed
+    and has to resync from GET /tasks/
+    """
+
+    def __init__(self, max_pending: int):
+        self._max_pending = max_pending
+        self._pending: OrderedDict[str, dict] = OrderedDict()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+
+    def push(self, event: dict):
+        key = event["id"]
+        if key in self._pending:
+            # coalesce, the newer event moves to the end
+            del self._pending[key]
+        elif len(self._pending) >= self._max_pending:
+            self.overflowed = True
+            self._pending.clear()
+        if not self.overflowed:
+            self._pending[key] = event
+        self._ready.set()
+
+    async def get(self) -> list[dict]:
+        """Wait for events and take all of them, empty once overflowed"""
+        await self._ready.wait()
+        self._ready.clear()
+        events = list(self._pending.values())
+        self._pending.clear()
+        return events
+
+
+class ChangeFeed:
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        max_subscribers: int = 1000,
+        logger: Optional[logging.Logger] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self._max_pending = max_pending
+        self._max_subscribers = max_subscribers
+        self._logger = logger or logging.getLogger(__name__)
+        self._subscribers: set[Subscription] = set()
+        self._metrics = metrics or Metrics()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Optional[Subscription]]:
+        """None when max_subscribers are already connected"""
+        if len(self._subscribers) >= self._max_subscribers:
+            yield None
+            return
+        subscription = Subscription(self._max_pending)
+        self._subscribers.add(subscription)
+        self._metrics.stream_subscribers.inc()
+        try:
+            yield subscription
+        finally:
+            # an overflowed subscription is already gone
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                self._metrics.stream_subscribers.dec()
+
+    def publish(self, event: dict):
+        self._metrics.stream_events.inc()
+        for subscription in list(self._subscribers):
+            subscription.push(event)
+            if subscription.overflowed:
+                # it stops receiving anything, the stream tells the client
+                self._subscribers.discard(subscription)
+                self._metrics.stream_subscribers.dec()
+                self._metrics.stream_dropped.inc()
+
+    def reset(self):
+        """Events may have been missed, every subscriber has to resync"""
+        self.publish({"id": None, "event": "reset"})
+
+    def _on_notification(self, connection, pid, channel, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            self._logger.warning(f"Malformed task change notification: {payload}")
+            return
+        self.publish(event)
+
+    async def listen(self, connect: Callable[[], Awaitable], retry: float = 1.0):
+        """
+        Keep a LISTEN connection open for as long as the task runs,
+        reconnecting with a pause when it is lost
+        """
+        while True:
+            connection = None
+            try:
+                connection = await connect()
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                self._logger.info(f"Listening for task changes on {CHANNEL}")
+                await lost.wait()
+                self._logger.warning("Task change listener connection lost")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception as e:
+                self._logger.warning(f"Task change listener failed: {e}")
+            # notifications sent while disconnected are gone
+            self.reset()
+            await asyncio.sleep(retry)
@@ -0,0 +1,27 @@
+import logging
+from typing import Optional
+
+from repos.jobs import PeriodicBatchJob
+
+
+def counter_reconciler(
+    gateway, interval: float, logger: Optional[logging.Logger] = None
+) -> PeriodicBatchJob:
+    """
+    Periodically repairs drift of the per-status counters, e.g. after
+    rows were changed with the triggers disabled or by a restore
+    """
+
+    async def reconcile(factory, limit: None) -> Optional[dict[str, int]]:
+        return await factory.tasks.reconcile_status_counts()
+
+    return PeriodicBatchJob(
+        gateway,
+        reconcile,
+        interval,
+        wait_first=True,
+        done="Corrected task status counters by {}",
+        failed="Reconciling task status counters failed",
+        level=logging.WARNING,
+        logger=logger,
+    )
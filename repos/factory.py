@@ -1,13 +1,31 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from metrics.instruments import Metrics
+from repos.cache import CachedTasksRepository, ICacheBackend
+from repos.idempotency import IIdempotencyStore
 from repos.interface import ITasksRepository
 from repos.tasks import TasksRepository
 
 
 class RepositoryFactory:
-    def __init__(self, session: AsyncSession):
-        self.__tasks = TasksRepository(session)
+    def __init__(
+        self,
+        session: AsyncSession,
+        cache: ICacheBackend | None = None,
+        validate_reads: bool = False,
+        idempotency: IIdempotencyStore | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self.__idempotency = idempotency
+        self.__tasks = TasksRepository(session, validate_reads, metrics)
+        if cache is not None:
+            self.__tasks = CachedTasksRepository(self.__tasks, cache, session)
 
     @property
     def tasks(self) -> ITasksRepository:
         return self.__tasks
+
+    @property
+    def idempotency(self) -> IIdempotencyStore | None:
+        """None when Idempotency-Key is turned off"""
+        return self.__idempotency
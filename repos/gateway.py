@@ -1,7 +1,43 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from contextlib import asynccontextmanager
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import Optional, Sequence
+
+import asyncpg
 
 from config.cfg import Configuration
+from metrics.instruments import Metrics, TimedQueuePool
+from metrics.slow_queries import SlowQueryLog
+from repos.cache import LRUCacheBackend
+from repos.changes import ChangeFeed
+from repos.factory import RepositoryFactory
+from repos.idempotency import (
+    CommitBoundStore,
+    IIdempotencyStore,
+    MemoryIdempotencyStore,
+    TableIdempotencyStore,
+)
+from repos.replicas import ReadYourWritesTracker, ReplicaRouter
+from repos.tasks import READ_SNAPSHOT
+
+
+class WriteTrackingSession(Session):
+    """Notes in info["wrote"] whether a statement of the session changed rows"""
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _note_writes(state: ORMExecuteState):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
 
 
 class DatabaseGateway:
@@ -12,46 +48,244 @@ class DatabaseGateway:
         self._engine = None
         self._session_factory = None
         self._is_initialized = False
+        self._replicas: Optional[ReplicaRouter] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._writes = ReadYourWritesTracker(config.read_your_writes_window)
+        self._metrics = Metrics()
+        self._slow_queries = (
+            SlowQueryLog(
+                threshold=config.slow_query_ms / 1000,
+                top_n=config.slow_query_top_n,
+                explain=config.slow_query_explain,
+                logger=logging.getLogger("uvicorn-app.slow_queries"),
+            )
+            if config.slow_query_ms > 0
+            else None
+        )
+        self._changes = (
+            ChangeFeed(
+                max_pending=config.stream_buffer,
+                max_subscribers=config.stream_max_clients,
+                logger=logging.getLogger("uvicorn-app.changes"),
+                metrics=self._metrics,
+            )
+            if config.stream_max_clients > 0
+            else None
+        )
+        self._listen_task: Optional[asyncio.Task] = None
+        self._cache = (
+            LRUCacheBackend(
+                max_entries=config.cache_max_entries,
+                max_bytes=config.cache_max_bytes,
+                ttl=config.cache_ttl,
+            )
+            if config.cache_enabled
+            else None
+        )
+        self._idempotency = (
+            MemoryIdempotencyStore(
+                max_keys=config.idempotency_max_keys,
+                ttl=config.idempotency_ttl,
+                wait=config.idempotency_wait,
+            )
+            if config.idempotency_backend == "memory"
+            else None
+        )
+
+    @property
+    def metrics(self) -> Metrics:
+        return self._metrics
+
+    @property
+    def slow_queries(self) -> SlowQueryLog | None:
+        return self._slow_queries
+
+    @property
+    def cache(self) -> LRUCacheBackend | None:
+        return self._cache
+
+    @property
+    def changes(self) -> ChangeFeed | None:
+        return self._changes
+
+    def get_repository_factory(self, session: AsyncSession) -> RepositoryFactory:
+        return RepositoryFactory(
+            session,
+            cache=self._cache,
+            validate_reads=self._config.validate_reads,
+            idempotency=self._idempotency_store(session),
+            metrics=self._metrics,
+        )
+
+    def _idempotency_store(self, session: AsyncSession) -> IIdempotencyStore | None:
+        if self._config.idempotency_backend == "table":
+            return TableIdempotencyStore(session, self._config.idempotency_ttl)
+        if self._idempotency is not None:
+            return CommitBoundStore(self._idempotency, session)
+        return None
 
     async def initialize(self):
         """init on app start"""
         if self._is_initialized:
             return
 
-        self._engine = create_async_engine(
+        profile = self._config.engine_profile
+        self._engine = self._create_engine(
             f"postgresql+asyncpg://{self._config.db_login}:{self._config.db_password}@"
             f"{self._config.db_host}:{self._config.db_port}/{self._config.db_name}",
-            echo=True,
-            pool_size=20,
-            max_overflow=20,
+            "primary",
         )
 
         self._session_factory = async_sessionmaker(
-            self._engine, class_=AsyncSession, expire_on_commit=False
+            self._engine,
+            class_=AsyncSession,
+            sync_session_class=WriteTrackingSession,
+            expire_on_commit=False,
         )
 
+        if self._config.replica_urls:
+            self._replicas = ReplicaRouter(
+                [
+                    self._create_engine(url, f"replica-{index}")
+                    for index, url in enumerate(self._config.replica_urls)
+                ],
+                strategy=self._config.replica_strategy,
+            )
+            self._health_task = asyncio.create_task(
+                self._replicas.run_health_checks(self._config.replica_health_interval)
+            )
+
+        if self._changes:
+            # one connection outside of the pool per process, for LISTEN only
+            self._listen_task = asyncio.create_task(
+                self._changes.listen(self._connect_listener)
+            )
+
         self._is_initialized = True
-        print("DatabaseGateway initialized")
+        print(
+            f"DatabaseGateway initialized, up to {profile.max_connections} "
+            f"connections{' through PgBouncer' if profile.pgbouncer else ''}"
+            f" per engine, {len(self._config.replica_urls)} replicas"
+        )
+
+    def _create_engine(self, url: str, label: str) -> AsyncEngine:
+        engine = create_async_engine(
+            url,
+            poolclass=TimedQueuePool,
+            **self._config.engine_profile.engine_kwargs(),
+        )
+        self._metrics.instrument_engine(engine, label, self._slow_queries)
+        return engine
+
+    async def _connect_listener(self) -> asyncpg.Connection:
+        if self._config.stream_listen_url:
+            return await asyncpg.connect(self._config.stream_listen_url)
+        return await asyncpg.connect(
+            user=self._config.db_login,
+            password=self._config.db_password,
+            host=self._config.db_host,
+            port=int(self._config.db_port),
+            database=self._config.db_name,
+        )
 
     async def close(self):
         """when app closes"""
+        if self._listen_task:
+            self._listen_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listen_task
+            self._listen_task = None
+        if self._health_task:
+            self._health_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        if self._replicas:
+            for index, engine in enumerate(self._replicas.engines):
+                self._metrics.forget_engine(f"replica-{index}")
+                await engine.dispose()
+            self._replicas = None
         if self._engine:
+            self._metrics.forget_engine("primary")
             await self._engine.dispose()
             self._engine = None
             self._session_factory = None
             self._is_initialized = False
         print("DatabaseGateway closed")
 
+    async def copy_records(
+        self, table: str, columns: Sequence[str], records: list[tuple]
+    ) -> int:
+        """
+        Bulk load rows with asyncpg COPY. The connection is in autocommit,
+        so the COPY commits on its own as one statement
+        """
+        if not self._is_initialized:
+            await self.initialize()
+
+        autocommit = self._engine.execution_options(isolation_level="AUTOCOMMIT")
+        async with autocommit.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                table, records=records, columns=list(columns)
+            )
+        return len(records)
+
     @asynccontextmanager
-    async def session(self):
-        """session context manager"""
+    async def session(
+        self,
+        read_only: bool = False,
+        client: Optional[str] = None,
+        snapshot: bool = False,
+    ):
+        """
+        session context manager, read_only sessions go to a replica
+        unless the client has written within the read-your-writes window.
+        snapshot sessions read from one REPEATABLE READ snapshot
+        """
         if not self._is_initialized:
             await self.initialize()
 
-        async with self._session_factory() as session:
+        async with await self._new_session(read_only, client, snapshot) as session:
             try:
                 yield session
                 await session.commit()
             except Exception:
                 await session.rollback()
+                for callback in session.info.pop("after_rollback", []):
+                    await callback()
                 raise
+
+            # reads on a primary session (e.g. syncs) leave the client unpinned
+            if client and session.info.get("wrote") and self._replicas:
+                self._writes.mark(client)
+
+            # hooks registered by repositories, e.g. cache invalidation
+            for callback in session.info.pop("after_commit", []):
+                await callback()
+
+    async def _new_session(
+        self, read_only: bool, client: Optional[str], snapshot: bool = False
+    ) -> AsyncSession:
+        # options only apply to the first connection() of a session
+        options = READ_SNAPSHOT if snapshot else {}
+        if (
+            read_only
+            and self._replicas
+            and not (client and self._writes.is_pinned(client))
+        ):
+            replica = self._replicas.pick()
+            if replica is not None:
+                session = self._session_factory(bind=replica)
+                try:
+                    # connect right away, so a dead replica falls back to the primary
+                    await session.connection(execution_options=options)
+                    session.info["replica"] = True
+                    return session
+                except (OSError, DBAPIError):
+                    self._replicas.mark_failed(replica)
+                    await session.close()
+        session = self._session_factory()
+        if snapshot:
+            await session.connection(execution_options=options)
+        return session
@@ -0,0 +1,226 @@
+"""
+Idempotency-Key support for POST /tasks/: the first response to a key is
+kept for a while and sent again for every retry with the same key, so a
+retried request never creates a second task
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, NamedTuple, Optional, Protocol
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.orm import IdempotencyKeyORM
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    body: bytes
+    # hash of the request, a key reused for another request is an error
+    fingerprint: str
+
+
+class IIdempotencyStore(Protocol):
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        The stored response of a key, waiting for a request with the same
+        key that is still running. None means the caller owns the key and
+        has to complete or abandon it
+        """
+        ...
+
+    async def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    async def abandon(self, key: str) -> None: ...
+
+
+class MemoryIdempotencyStore:
+    """
+    In-process store, LRU bounded by the number of keys, with TTL.
+    Duplicates of a running request wait for its future instead of
+    creating a task of their own
+    """
+
+    def __init__(
+        self,
+        max_keys: int,
+        ttl: float,
+        wait: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._responses: OrderedDict[str, tuple[float, StoredResponse]] = OrderedDict()
+        self._in_flight: dict[str, tuple[float, asyncio.Future]] = {}
+        self._max_keys = max_keys
+        self._ttl = ttl
+        self._wait = wait
+        self._clock = clock
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        while True:
+            stored = self._get(key)
+            if stored is not None:
+                return stored
+
+            running = self._in_flight.get(key)
+            # an owner that was cancelled mid-commit never abandons its key
+            if running is None or running[0] + self._wait <= self._clock():
+                self._finish(key, None)
+                self._in_flight[key] = (
+                    self._clock(),
+                    asyncio.get_running_loop().create_future(),
+                )
+                return None
+
+            try:
+                # shielded, a waiter timing out must not cancel the others
+                stored = await asyncio.wait_for(asyncio.shield(running[1]), self._wait)
+            except asyncio.TimeoutError:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is in progress",
+                )
+            if stored is not None:
+                return stored
+            # abandoned by its owner, the next round takes the key over
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        self._responses.pop(key, None)
+        self._responses[key] = (self._clock() + self._ttl, response)
+        while len(self._responses) > self._max_keys:
+            self._responses.popitem(last=False)
+        self._finish(key, response)
+
+    async def abandon(self, key: str) -> None:
+        self._finish(key, None)
+
+    def _get(self, key: str) -> Optional[StoredResponse]:
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= self._clock():
+            del self._responses[key]
+            return None
+        self._responses.move_to_end(key)
+        return response
+
+    def _finish(self, key: str, response: Optional[StoredResponse]):
+        running = self._in_flight.pop(key, None)
+        if running is not None and not running[1].done():
+            running[1].set_result(response)
+
+
+class CommitBoundStore:
+    """
+    Per-request view of a process-wide store. The response only becomes
+    visible to duplicates once the session committed, a rollback frees
+    the key so that a waiting duplicate creates the task itself
+    """
+
+    def __init__(self, store: IIdempotencyStore, session: Optional[AsyncSession]):
+        self._store = store
+        self._session = session
+        # keys begun by this request, nobody else's key is ever abandoned
+        self._owned: set[str] = set()
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        stored = await self._store.begin(key, fingerprint)
+        if stored is None:
+            self._owned.add(key)
+            if self._session is not None:
+                self._session.info.setdefault("after_rollback", []).append(
+                    partial(self.abandon, key)
+                )
+        return stored
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        if self._session is None:
+            await self._complete_owned(key, response)
+        else:
+            # the key stays owned until then, a failed commit abandons it
+            self._session.info.setdefault("after_commit", []).append(
+                partial(self._complete_owned, key, response)
+            )
+
+    async def abandon(self, key: str) -> None:
+        if key in self._owned:
+            self._owned.discard(key)
+            await self._store.abandon(key)
+
+    async def _complete_owned(self, key: str, response: StoredResponse):
+        if key in self._owned:
+            self._owned.discard(key)
+            await self._store.complete(key, response)
+
+
+class TableIdempotencyStore:
+    """
+    Keys in the idempotency_keys table, shared by all workers. The key row
+    is written in the transaction of the request itself: a duplicate
+    blocks on its unique index entry until that transaction ends, and a
+    rollback takes the key away together with the task
+    """
+
+    def __init__(self, session: AsyncSession, ttl: float):
+        self._session = session
+        self._ttl = timedelta(seconds=ttl)
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        now = datetime.utcnow()
+        statement = pg_insert(IdempotencyKeyORM).values(
+            key=key, fingerprint=fingerprint, expires_at=now + self._ttl
+        )
+        # one statement either way: a fresh row is returned as stored, an
+        # expired one is taken over as if it did not exist
+        expired = IdempotencyKeyORM.expires_at <= now
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKeyORM.key],
+            set_={
+                column: case((expired, statement.excluded[column]), else_=current)
+                for column, current in (
+                    ("fingerprint", IdempotencyKeyORM.fingerprint),
+                    ("status_code", IdempotencyKeyORM.status_code),
+                    ("body", IdempotencyKeyORM.body),
+                    ("expires_at", IdempotencyKeyORM.expires_at),
+                )
+            },
+        ).returning(
+            IdempotencyKeyORM.status_code,
+            IdempotencyKeyORM.body,
+            IdempotencyKeyORM.fingerprint,
+        )
+        row = (await self._session.execute(statement)).one()
+        # rows of finished requests always have a body, the others are ours
+        if row.body is None:
+            return None
+        return StoredResponse(row.status_code, row.body, row.fingerprint)
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        await self._session.execute(
+            update(IdempotencyKeyORM)
+            .where(IdempotencyKeyORM.key == key)
+            .values(status_code=response.status_code, body=response.body)
+        )
+
+    async def abandon(self, key: str) -> None:
+        # the rollback of the request removes the row
+        pass
+
+    async def purge_expired(self, limit: int) -> int:
+        """Delete up to limit expired keys, returns how many were removed"""
+        expired = (
+            select(IdempotencyKeyORM.key)
+            .where(IdempotencyKeyORM.expires_at <= datetime.utcnow())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(
+            delete(IdempotencyKeyORM).where(IdempotencyKeyORM.key.in_(expired))
+        )
+        return result.rowcount
@@ -1,9 +1,9 @@
 import uuid
-from typing import Protocol, TypeVar, Generic, Optional, Dict
+from datetime import datetime
+from typing import Any, AsyncIterator, Protocol, TypeVar, Generic, Optional, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.dto import TaskDTO
-
+from models.dto import ChangesPageDTO, ClaimResultDTO, Page, TaskDTO, TaskStatsDTO
 
 T = TypeVar("T")
 ID = TypeVar("ID", int, str, uuid.UUID)
@@ -14,7 +14,9 @@ class IRepository(Protocol[T, ID]):
 
     async def get_by_id(self, id: ID) -> Optional[T]: ...
 
-    async def get_all(self) -> list[T]: ...
+    async def get_all(
+        self, limit: int, cursor: Optional[str] = None, filters: Optional[Any] = None
+    ) -> Page[T]: ...
 
     async def create(self, entity: T | Dict) -> T: ...
 
@@ -24,8 +26,55 @@ class IRepository(Protocol[T, ID]):
 
 
 class ITasksRepository(IRepository[TaskDTO, uuid.UUID], Protocol):
-    # could skip this cause no special methods here
-    pass
+
+    async def get_version(self, task_id: uuid.UUID) -> Optional[int]: ...
+
+    async def update(
+        self,
+        task_id: uuid.UUID,
+        update_data: Dict,
+        expected_version: Optional[int] = None,
+    ) -> TaskDTO: ...
+
+    async def get_page_versions(
+        self, limit: int, cursor: Optional[str] = None, filters: Optional[Any] = None
+    ) -> list[tuple[uuid.UUID, datetime]]: ...
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        search_config: str = "russian",
+    ) -> Page[TaskDTO]: ...
+
+    async def get_changes(
+        self,
+        limit: int,
+        since: Optional[str] = None,
+        settle: float = 5.0,
+        retention: Optional[float] = None,
+    ) -> ChangesPageDTO: ...
+
+    async def get_status_counts(self) -> TaskStatsDTO: ...
+
+    async def reconcile_status_counts(self) -> Optional[dict[str, int]]: ...
+
+    def stream_all(
+        self, fetch_size: int, filters: Optional[Any] = None
+    ) -> AsyncIterator[TaskDTO]: ...
+
+    async def create_many(self, tasks_data: list[Dict]) -> list[TaskDTO]: ...
+
+    async def update_many(self, patches: list[Dict]) -> list[TaskDTO]: ...
+
+    async def delete_many(self, task_ids: list[uuid.UUID]) -> list[uuid.UUID]: ...
+
+    async def claim(self, limit: int, worker: str, lease: float) -> ClaimResultDTO: ...
+
+    async def release_expired_leases(self, limit: int) -> list[uuid.UUID]: ...
+
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int: ...
 
 
 class BaseRepository(Generic[T, ID]):
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+# (repository factory, batch size) -> what the batch did, a count of rows
+# for batched jobs; None is passed as the size to unbatched ones
+Batch = Callable[[Any, Optional[int]], Awaitable[Any]]
+
+
+class PeriodicBatchJob:
+    """
+    Maintenance loop living as long as the app. Every interval the batch
+    runs in its own short transaction; with a batch_size it repeats, with
+    a pause in between, until a batch handles fewer rows than that, so a
+    round never holds many row locks or starves requests
+    """
+
+    def __init__(
+        self,
+        gateway,
+        batch: Batch,
+        interval: float,
+        batch_size: Optional[int] = None,
+        pause: float = 0.0,
+        wait_first: bool = False,
+        done: str = "{}",
+        failed: str = "Background job failed",
+        level: int = logging.INFO,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self._gateway = gateway
+        self._batch = batch
+        self._interval = interval
+        self._batch_size = batch_size
+        self._pause = pause
+        self._wait_first = wait_first
+        self._done = done
+        self._failed = failed
+        self._level = level
+        self._logger = logger or logging.getLogger(__name__)
+
+    async def run_once(self) -> Any:
+        """
+        One round: the total of all batches, or the result of the single
+        batch of an unbatched job
+        """
+        if self._batch_size is None:
+            return await self._run_batch()
+        total = 0
+        while True:
+            handled = await self._run_batch()
+            total += handled
+            if handled < self._batch_size:
+                return total
+            await asyncio.sleep(self._pause)
+
+    async def run(self):
+        while True:
+            if self._wait_first:
+                # startup of many instances at once stays cheap
+                await asyncio.sleep(self._interval)
+            try:
+                result = await self.run_once()
+                if result:
+                    self._logger.log(self._level, self._done.format(result))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # the next round retries, a failed batch was rolled back
+                self._logger.warning(f"{self._failed}: {e}")
+            if not self._wait_first:
+                await asyncio.sleep(self._interval)
+
+    async def _run_batch(self) -> Any:
+        async with self._gateway.session() as session:
+            return await self._batch(
+                self._gateway.get_repository_factory(session), self._batch_size
+            )
@@ -0,0 +1,33 @@
+import logging
+from typing import Optional
+
+from repos.jobs import PeriodicBatchJob
+
+
+def lease_reaper(
+    gateway,
+    interval: float,
+    batch_size: int,
+    pause: float,
+    logger: Optional[logging.Logger] = None,
+) -> PeriodicBatchJob:
+    """
+    Returns tasks whose claim lease expired back to created, so work of a
+    worker that died is picked up by the others. Batches skip rows locked
+    by a concurrent claim
+    """
+
+    async def release(factory, limit: int) -> int:
+        return len(await factory.tasks.release_expired_leases(limit))
+
+    return PeriodicBatchJob(
+        gateway,
+        release,
+        interval,
+        batch_size=batch_size,
+        pause=pause,
+        done="Returned {} tasks with expired leases to created",
+        failed="Releasing expired leases failed",
+        level=logging.WARNING,
+        logger=logger,
+    )
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(
+    value: datetime | float,
+    task_id: UUID,
+    sort_by: str = "created_at",
+    order: str = "asc",
+) -> str:
+    """
+    Pack the keyset position of the last row on a page into an opaque token,
+    the sort it was made for is kept inside to reject mixing orders
+    """
+    payload = json.dumps(
+        {
+            "k": sort_by,
+            "o": order,
+            "v": value.isoformat() if isinstance(value, datetime) else value,
+            "i": str(task_id),
+        },
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, sort_by: str = "created_at", order: str = "asc"
+) -> tuple[datetime | float, UUID]:
+    """
+    Unpack a token made by encode_cursor, 400 for anything malformed
+    or made for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if (payload["k"], payload["o"]) != (sort_by, order):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor was issued for another sort order",
+            )
+        value = payload["v"]
+        value = float(value) if sort_by == "rank" else datetime.fromisoformat(value)
+        return value, UUID(payload["i"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
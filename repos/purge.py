@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from repos.jobs import PeriodicBatchJob
+
+
+def tombstone_purger(
+    gateway,
+    retention: float,
+    batch_size: int,
+    interval: float,
+    pause: float,
+    logger: Optional[logging.Logger] = None,
+) -> PeriodicBatchJob:
+    """Hard deletes soft-deleted tasks once they are older than the retention"""
+
+    async def purge(factory, limit: int) -> int:
+        deleted_before = datetime.utcnow() - timedelta(seconds=retention)
+        return await factory.tasks.purge_deleted(deleted_before, limit)
+
+    return PeriodicBatchJob(
+        gateway,
+        purge,
+        interval,
+        batch_size=batch_size,
+        pause=pause,
+        done="Purged {} deleted tasks",
+        failed="Purging deleted tasks failed",
+        logger=logger,
+    )
+
+
+def expired_key_purger(
+    gateway,
+    batch_size: int,
+    interval: float,
+    pause: float,
+    logger: Optional[logging.Logger] = None,
+) -> PeriodicBatchJob:
+    """
+    Deletes expired Idempotency-Key rows of the table backend, in the
+    same small batches as the tombstones
+    """
+
+    async def purge(factory, limit: int) -> int:
+        return await factory.idempotency.purge_expired(limit)
+
+    return PeriodicBatchJob(
+        gateway,
+        purge,
+        interval,
+        batch_size=batch_size,
+        pause=pause,
+        done="Purged {} expired idempotency keys",
+        failed="Purging idempotency keys failed",
+        logger=logger,
+    )
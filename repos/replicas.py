@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Literal, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ReplicaStrategy = Literal["round_robin", "least_busy"]
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    Chooses a replica engine for read-only sessions.
+    Replicas failing a health check are skipped until they pass again,
+    None means there is no healthy replica and the primary has to be used
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        strategy: ReplicaStrategy = "round_robin",
+        check_timeout: float = 2.0,
+    ):
+        self._engines = list(engines)
+        self._healthy = [True] * len(self._engines)
+        self._strategy = strategy
+        self._check_timeout = check_timeout
+        self._counter = itertools.count()
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return self._engines
+
+    def pick(self) -> Optional[AsyncEngine]:
+        healthy = [e for e, ok in zip(self._engines, self._healthy) if ok]
+        if not healthy:
+            return None
+        if self._strategy == "least_busy":
+            return min(healthy, key=lambda engine: engine.pool.checkedout())
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_failed(self, engine: AsyncEngine):
+        index = self._engines.index(engine)
+        if self._healthy[index]:
+            logger.warning(f"Replica {engine.url.host} marked unhealthy")
+        self._healthy[index] = False
+
+    async def check_health(self):
+        """SELECT 1 on every replica, flips their state both ways"""
+        for index, engine in enumerate(self._engines):
+            try:
+                async with asyncio.timeout(self._check_timeout):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+            except Exception as e:
+                if self._healthy[index]:
+                    logger.warning(f"Replica {engine.url.host} is unhealthy: {e}")
+                self._healthy[index] = False
+            else:
+                if not self._healthy[index]:
+                    logger.warning(f"Replica {engine.url.host} is back")
+                self._healthy[index] = True
+
+    async def run_health_checks(self, interval: float):
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+
+class ReadYourWritesTracker:
+    """
+    Remembers clients that wrote recently so that their reads go to the
+    primary until the replicas have most likely caught up
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_clients: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._window = window
+        self._max_clients = max_clients
+        self._clock = clock
+        # the window is the same for everyone, so insertion order is expiry order
+        self._pinned: OrderedDict[str, float] = OrderedDict()
+
+    def mark(self, client: str):
+        now = self._clock()
+        self._pinned[client] = now + self._window
+        self._pinned.move_to_end(client)
+        self._prune(now)
+
+    def is_pinned(self, client: str) -> bool:
+        until = self._pinned.get(client)
+        return until is not None and until > self._clock()
+
+    def _prune(self, now: float):
+        while self._pinned:
+            client, until = next(iter(self._pinned.items()))
+            if until > now and len(self._pinned) <= self._max_clients:
+                break
+            del self._pinned[client]
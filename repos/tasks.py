@@ -1,54 +1,441 @@
 import uuid
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
+from sqlalchemy import (
+    String,
+    Uuid,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.dto import TaskDTO
-from models.orm import TaskORM
+from metrics.instruments import Metrics, timed
+from models.dto import (
+    ChangesPageDTO,
+    ClaimResultDTO,
+    Page,
+    TaskChangeDTO,
+    TaskDTO,
+    TaskStatsDTO,
+)
+from models.orm import TaskORM, TaskStatusCountORM
+from models.requests import TaskListQuery, TaskUpdateRequest
 from repos.interface import BaseRepository, ITasksRepository
+from repos.pagination import decode_cursor, encode_cursor
+
+# columns read into TaskDTO, created_at is only needed for cursors
+TASK_COLUMNS = (
+    TaskORM.id,
+    TaskORM.name,
+    TaskORM.text,
+    TaskORM.status,
+    TaskORM.created_at,
+    TaskORM.updated_at,
+    TaskORM.version,
+)
+
+# soft-deleted rows stay in the table as tombstones until purged,
+# every read and write of live tasks is restricted with this
+LIVE = TaskORM.deleted_at.is_(None)
+
+# one consistent snapshot for reads spanning several round trips, has to
+# be set when the session opens its connection
+READ_SNAPSHOT = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+
+# pg advisory lock key, one counters reconciliation at a time
+RECONCILE_LOCK = 0x7A5C0001
 
 
 class TasksRepository(BaseRepository[TaskDTO, int], ITasksRepository):
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        validate_reads: bool = False,
+        metrics: Optional[Metrics] = None,
+    ):
         super().__init__(session, TaskDTO)
+        self._validate_reads = validate_reads
+        self._metrics = metrics
+
+    def _to_dto(self, row) -> TaskDTO:
+        """
+        Rows come from the table and were validated on write,
+        so the DTO is built without running validators again
+        unless validate_reads is on
+        """
+        if self._validate_reads:
+            return TaskDTO.model_validate(row)
+        # positions follow TASK_COLUMNS, indexing a row is cheaper than
+        # looking columns up by name
+        return TaskDTO.trusted(row[0], row[1], row[2], row[3], row[5], row[6])
+
+    @timed
+    async def get_all(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[TaskListQuery] = None,
+    ) -> Page[TaskDTO]:
+        """
+        Keyset page ordered by (sort_by, id), one row over the limit
+        is fetched to know whether the next page exists
+        """
+        filters = filters or TaskListQuery()
+        result = await self._session.execute(
+            self._page_statement(select(*TASK_COLUMNS), limit, cursor, filters)
+        )
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(
+                getattr(last, filters.sort_by), last.id, filters.sort_by, filters.order
+            )
+        return Page[TaskDTO].model_construct(
+            items=[self._to_dto(row) for row in rows[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    @timed
+    async def get_page_versions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[TaskListQuery] = None,
+    ) -> list[tuple[uuid.UUID, datetime]]:
+        """
+        (id, updated_at) of the same rows get_all would read, including the
+        one over the limit - enough to fingerprint a page without loading it
+        """
+        filters = filters or TaskListQuery()
+        result = await self._session.execute(
+            self._page_statement(
+                select(TaskORM.id, TaskORM.updated_at), limit, cursor, filters
+            )
+        )
+        return [tuple(row) for row in result.all()]
+
+    def _page_statement(
+        self, stmt, limit: int, cursor: Optional[str], filters: TaskListQuery
+    ):
+        sort_column = getattr(TaskORM, filters.sort_by)
+        keyset = tuple_(sort_column, TaskORM.id)
+
+        stmt = stmt.where(*self._filter_clauses(filters)).limit(limit + 1)
+        if filters.order == "desc":
+            stmt = stmt.order_by(sort_column.desc(), TaskORM.id.desc())
+        else:
+            stmt = stmt.order_by(sort_column, TaskORM.id)
+
+        if cursor:
+            value, task_id = decode_cursor(cursor, filters.sort_by, filters.order)
+            position = tuple_(value, task_id)
+            stmt = stmt.where(
+                keyset < position if filters.order == "desc" else keyset > position
+            )
+        return stmt
+
+    @timed
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        search_config: str = "russian",
+    ) -> Page[TaskDTO]:
+        """
+        Full-text search over name and text through the GIN-indexed
+        search_vector, best matches first, keyset-paginated on (rank, id)
+        """
+        ts_query = func.websearch_to_tsquery(cast(search_config, REGCONFIG), query)
+        rank = func.ts_rank_cd(TaskORM.search_vector, ts_query)
+        stmt = (
+            select(*TASK_COLUMNS, rank.label("rank"))
+            .where(TaskORM.search_vector.op("@@")(ts_query), LIVE)
+            .order_by(rank.desc(), TaskORM.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            value, task_id = decode_cursor(cursor, "rank", "desc")
+            stmt = stmt.where(tuple_(rank, TaskORM.id) < tuple_(value, task_id))
+
+        result = await self._session.execute(stmt)
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.rank, last.id, "rank", "desc")
+        return Page[TaskDTO].model_construct(
+            items=[self._to_dto(row) for row in rows[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    async def stream_all(
+        self, fetch_size: int, filters: Optional[TaskListQuery] = None
+    ) -> AsyncIterator[TaskDTO]:
+        """
+        Every matching task from one REPEATABLE READ snapshot, read through
+        a server-side cursor fetch_size rows at a time.
+        The session must be opened with snapshot=True or not be used yet
+        """
+        filters = filters or TaskListQuery()
+        sort_column = getattr(TaskORM, filters.sort_by)
+        order = (
+            (sort_column.desc(), TaskORM.id.desc())
+            if filters.order == "desc"
+            else (sort_column, TaskORM.id)
+        )
+        if not self._session.in_transaction():
+            await self._session.connection(execution_options=READ_SNAPSHOT)
+        result = await self._session.stream(
+            select(*TASK_COLUMNS)
+            .where(*self._filter_clauses(filters))
+            .order_by(*order)
+            .execution_options(yield_per=fetch_size)
+        )
+        async for row in result:
+            yield self._to_dto(row)
+
+    @timed
+    async def get_changes(
+        self,
+        limit: int,
+        since: Optional[str] = None,
+        settle: float = 5.0,
+        retention: Optional[float] = None,
+    ) -> ChangesPageDTO:
+        """
+        Tasks changed after the sync token, deletions included as
+        tombstones, in (updated_at, id) order over ix_tasks_updated_at_id.
+
+        updated_at is taken when a statement is built, so a transaction
+        may commit a change older than what a client has already seen.
+        Only changes at least settle seconds old are read, by the clock
+        of the database taken in the same statement, and no token ever
+        passes that cutoff - younger changes wait for the next sync.
+        settle has to cover the longest a statement may take to commit
+        (the statement timeout)
+        """
+        clock = select(func.timezone("UTC", func.now()).label("now")).subquery("clock")
+        conditions = [TaskORM.updated_at <= clock.c.now - timedelta(seconds=settle)]
+        position = None
+        if since:
+            position = decode_cursor(since, "sync", "asc")
+            conditions.append(
+                tuple_(TaskORM.updated_at, TaskORM.id) > tuple_(*position)
+            )
+        else:
+            # a new client has nothing to delete
+            conditions.append(LIVE)
+        changes = (
+            select(*TASK_COLUMNS, TaskORM.deleted_at)
+            .where(*conditions)
+            .order_by(TaskORM.updated_at, TaskORM.id)
+            .limit(limit + 1)
+            .lateral("changes")
+        )
+        # one row with the clock and no task when nothing changed
+        result = await self._session.execute(
+            select(clock.c.now, changes)
+            .select_from(clock.outerjoin(changes, true()))
+            .order_by(changes.c.updated_at, changes.c.id)
+        )
+        rows = result.all()
+        cutoff = rows[0][0] - timedelta(seconds=settle)
+        if (
+            position is not None
+            and retention is not None
+            and position[0] < rows[0][0] - timedelta(seconds=retention)
+        ):
+            # tombstones this client has not seen may be purged already
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired, sync again without a token",
+            )
+        rows = [row[1:] for row in rows if row[1] is not None]
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if has_more:
+            position = (rows[-1][5], rows[-1][0])
+        else:
+            # everything up to the cutoff was read; the token moves with the
+            # clock even on a quiet table, so it never ages into the retention
+            position = (cutoff, UUID(int=0))
+        return ChangesPageDTO.model_construct(
+            items=[self._to_change(row) for row in rows],
+            next_token=encode_cursor(*position, "sync", "asc"),
+            has_more=has_more,
+        )
+
+    @staticmethod
+    def _to_change(row) -> TaskChangeDTO:
+        # positions follow TASK_COLUMNS, deleted_at comes last
+        if row[7] is not None:
+            return TaskChangeDTO.model_construct(
+                id=row[0], updated_at=row[5], version=row[6], deleted=True
+            )
+        return TaskChangeDTO.model_construct(
+            id=row[0],
+            updated_at=row[5],
+            version=row[6],
+            deleted=False,
+            name=row[1],
+            text=row[2],
+            status=row[3],
+        )
+
+    @timed
+    async def get_status_counts(self) -> TaskStatsDTO:
+        """
+        Live tasks per status from the counters the tasks triggers keep,
+        reads statuses x shards rows whatever the size of the table
+        """
+        result = await self._session.execute(
+            select(
+                TaskStatusCountORM.status, func.sum(TaskStatusCountORM.count)
+            ).group_by(TaskStatusCountORM.status)
+        )
+        counts = {row[0]: int(row[1]) for row in result.all()}
+        return TaskStatsDTO(**counts, total=sum(counts.values()))
+
+    @timed
+    async def reconcile_status_counts(self) -> Optional[dict[str, int]]:
+        """
+        Repair drift of the counters against a real count of the table.
+        Both are read in one statement, so from one snapshot, and the
+        correction is added like any other delta - concurrent writes stay
+        correct and are never blocked. Returns the drift per status,
+        None when another instance is reconciling right now
+        """
+        locked = await self._session.execute(
+            select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK))
+        )
+        if not locked.scalar_one():
+            return None
+
+        counters = TaskStatusCountORM
+        actual = (
+            select(TaskORM.status, func.count().label("n"))
+            .where(LIVE)
+            .group_by(TaskORM.status)
+            .cte("actual")
+        )
+        counted = (
+            select(counters.status, func.sum(counters.count).label("n"))
+            .group_by(counters.status)
+            .cte("counted")
+        )
+        drift = func.coalesce(actual.c.n, 0) - func.coalesce(counted.c.n, 0)
+        result = await self._session.execute(
+            select(func.coalesce(actual.c.status, counted.c.status), drift)
+            .select_from(
+                actual.join(counted, actual.c.status == counted.c.status, full=True)
+            )
+            .where(drift != 0)
+        )
+        corrections = {row[0]: int(row[1]) for row in result.all()}
+        if corrections:
+            stmt = pg_insert(counters).values(
+                [
+                    {"status": task_status, "shard": 0, "count": delta}
+                    for task_status, delta in sorted(corrections.items())
+                ]
+            )
+            await self._session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[counters.status, counters.shard],
+                    set_={"count": counters.count + stmt.excluded.count},
+                )
+            )
+        return corrections
 
-    async def get_all(self) -> list[TaskDTO]:
-        result = await self._session.execute(select(TaskORM))
-        orm_objects = result.scalars().all()
-        return [TaskDTO.model_validate(orm_obj) for orm_obj in orm_objects]
+    @staticmethod
+    def _filter_clauses(filters: TaskListQuery) -> list:
+        clauses = [LIVE]
+        if filters.status is not None:
+            clauses.append(TaskORM.status == filters.status)
+        if filters.created_from is not None:
+            clauses.append(TaskORM.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            clauses.append(TaskORM.created_at < filters.created_to)
+        if filters.updated_from is not None:
+            clauses.append(TaskORM.updated_at >= filters.updated_from)
+        if filters.updated_to is not None:
+            clauses.append(TaskORM.updated_at < filters.updated_to)
+        return clauses
 
+    @timed
     async def get_by_id(self, task_id: uuid.UUID) -> TaskDTO | None:
         result = await self._session.execute(
-            select(TaskORM).where(TaskORM.id == task_id)
+            select(*TASK_COLUMNS).where(TaskORM.id == task_id, LIVE)
         )
-        orm_obj = result.scalar_one_or_none()
-        return TaskDTO.model_validate(orm_obj) if orm_obj else None
+        row = result.one_or_none()
+        return self._to_dto(row) if row is not None else None
 
+    @timed
+    async def get_version(self, task_id: uuid.UUID) -> int | None:
+        """version of the task alone, for conditional requests"""
+        result = await self._session.execute(
+            select(TaskORM.version).where(TaskORM.id == task_id, LIVE)
+        )
+        return result.scalar_one_or_none()
+
+    @timed
     async def create(self, task_data: dict) -> TaskDTO:
         if "id" not in task_data or not task_data["id"]:
             task_data["id"] = uuid.uuid4()
-        orm_obj = TaskORM(**task_data)
-        self._session.add(orm_obj)
-        await self._session.flush()
-        await self._session.refresh(orm_obj)
-        return TaskDTO.model_validate(orm_obj)
+        result = await self._session.execute(
+            insert(TaskORM).values(**task_data).returning(*TASK_COLUMNS)
+        )
+        return self._to_dto(result.one())
 
-    async def update(self, task_id: UUID, update_data: Dict) -> TaskDTO:
+    @timed
+    async def create_many(self, tasks_data: list[Dict]) -> list[TaskDTO]:
         """
-        Partial update of task - only provided fields are updated
+        Insert all tasks with one multi-row INSERT ... RETURNING,
+        results keep the order of tasks_data
         """
-        # Проверяем существование задачи
-        existing_task = await self.get_by_id(task_id)
-        if not existing_task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Task with id {task_id} not found",
-            )
+        rows = [
+            {**task_data, "id": task_data.get("id") or uuid.uuid4()}
+            for task_data in tasks_data
+        ]
+        result = await self._session.execute(
+            insert(TaskORM).values(rows).returning(*TASK_COLUMNS)
+        )
+        # RETURNING order of a multi-row VALUES is not guaranteed
+        created = {created_row[0]: created_row for created_row in result.all()}
+        return [self._to_dto(created[row["id"]]) for row in rows]
 
+    @timed
+    async def update(
+        self,
+        task_id: UUID,
+        update_data: Dict,
+        expected_version: Optional[int] = None,
+    ) -> TaskDTO:
+        """
+        Partial update of task - only provided fields are updated,
+        single UPDATE ... RETURNING, 404 when no row came back.
+        With expected_version it is a compare-and-swap on the version,
+        412 when the task has changed since
+        """
         # Валидация - хотя бы одно поле должно быть передано для обновления
         if not update_data:
             raise HTTPException(
@@ -56,14 +443,11 @@ class TasksRepository(BaseRepository[TaskDTO, int], ITasksRepository):
                 detail="No fields provided for update",
             )
 
-        # Создаем временный DTO для валидации данных
-        # Используем существующие данные + новые данные для обновления
-        validation_data = existing_task.model_dump()
-        validation_data.update(update_data)
-
+        # Все ограничения TaskDTO проверяют поля по отдельности, поэтому
+        # объединенная запись валидна, если валидны переданные поля -
+        # проверяем их в памяти без чтения текущей записи
         try:
-            # Валидируем объединенные данные
-            TaskDTO(**validation_data)
+            TaskUpdateRequest(**update_data)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail=f"Validation error: {e}"
@@ -72,32 +456,209 @@ class TasksRepository(BaseRepository[TaskDTO, int], ITasksRepository):
         # Обновляем запись в базе
         stmt = (
             update(TaskORM)
-            .where(TaskORM.id == task_id)
-            .values(**update_data, updated_at=datetime.utcnow())
-            .returning(TaskORM)
+            .where(TaskORM.id == task_id, LIVE)
+            .values(
+                **update_data,
+                updated_at=datetime.utcnow(),
+                version=TaskORM.version + 1,
+            )
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
         )
+        if expected_version is not None:
+            stmt = stmt.where(TaskORM.version == expected_version)
 
         result = await self._session.execute(stmt)
-        updated_orm = result.scalar_one()
-
-        await self._session.flush()
-        await self._session.refresh(updated_orm)
+        row = result.one_or_none()
+        if row is None:
+            # only a failed swap pays for a second statement
+            if (
+                expected_version is not None
+                and await self.get_version(task_id) is not None
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail=f"Task with id {task_id} was changed concurrently",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with id {task_id} not found",
+            )
 
-        return TaskDTO.model_validate(updated_orm)
+        return self._to_dto(row)
 
+    @timed
     async def delete(self, task_id: uuid.UUID) -> bool:
-        # check existence
-        task = await self.get_by_id(task_id)
-        if not task:
+        """Soft delete, the row is kept as a tombstone until purge_deleted"""
+        now = datetime.utcnow()
+        result = await self._session.execute(
+            update(TaskORM)
+            .where(TaskORM.id == task_id, LIVE)
+            .values(
+                deleted_at=now,
+                updated_at=now,
+                version=TaskORM.version + 1,
+                # a tombstone holds no lease, the reaper must never revive it
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(TaskORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
             # need to do something to move server-like logics
             # like 404 err up the stack to the fastapi app
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Task with id {task_id} not found",
             )
+        return True
+
+    @timed
+    async def update_many(self, patches: list[Dict]) -> list[TaskDTO]:
+        """
+        Apply per-task patches with one UPDATE ... FROM (VALUES ...),
+        fields missing from a patch keep their current value.
+        Tasks that do not exist are simply absent from the result
+        """
+        patch_rows = values(
+            column("id", Uuid),
+            column("name", String),
+            column("text", String),
+            column("status", String),
+            name="patch",
+        ).data(
+            [
+                (patch["id"], patch.get("name"), patch.get("text"), patch.get("status"))
+                for patch in patches
+            ]
+        )
+        stmt = (
+            update(TaskORM)
+            .where(TaskORM.id == patch_rows.c.id, LIVE)
+            .values(
+                name=func.coalesce(patch_rows.c.name, TaskORM.name),
+                text=func.coalesce(patch_rows.c.text, TaskORM.text),
+                status=func.coalesce(patch_rows.c.status, TaskORM.status),
+                updated_at=datetime.utcnow(),
+                version=TaskORM.version + 1,
+            )
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        return [self._to_dto(row) for row in result.all()]
 
+    @timed
+    async def delete_many(self, task_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+        """
+        Soft delete tasks with one UPDATE ... WHERE id = ANY(...),
+        returns IDs that were actually deleted
+        """
+        ids_param = bindparam("task_ids", task_ids, type_=ARRAY(Uuid))
+        now = datetime.utcnow()
+        result = await self._session.execute(
+            update(TaskORM)
+            .where(TaskORM.id == any_(ids_param), LIVE)
+            .values(
+                deleted_at=now,
+                updated_at=now,
+                version=TaskORM.version + 1,
+                # a tombstone holds no lease, the reaper must never revive it
+                claimed_by=None,
+                lease_expires_at=None,
+            )
+            .returning(TaskORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars().all())
+
+    @timed
+    async def claim(self, limit: int, worker: str, lease: float) -> ClaimResultDTO:
+        """
+        Move up to limit of the oldest created tasks to processing for
+        worker, with one UPDATE over a SELECT ... FOR UPDATE SKIP LOCKED.
+        Rows another worker is claiming are skipped rather than waited for,
+        so concurrent claims never queue behind each other's locks
+        """
+        now = datetime.utcnow()
+        lease_expires_at = now + timedelta(seconds=lease)
+        claimable = (
+            select(TaskORM.id)
+            .where(TaskORM.status == "created", LIVE)
+            .order_by(TaskORM.created_at, TaskORM.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(
+            update(TaskORM)
+            .where(TaskORM.id.in_(claimable))
+            .values(
+                status="processing",
+                claimed_by=worker,
+                lease_expires_at=lease_expires_at,
+                updated_at=now,
+                version=TaskORM.version + 1,
+            )
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        # RETURNING of an UPDATE has no order of its own
+        rows = sorted(result.all(), key=lambda row: (row[4], row[0]))
+        return ClaimResultDTO.model_construct(
+            worker=worker,
+            lease_expires_at=lease_expires_at,
+            items=[self._to_dto(row) for row in rows],
+        )
+
+    @timed
+    async def release_expired_leases(self, limit: int) -> list[uuid.UUID]:
+        """
+        Return up to limit tasks whose lease ran out back to created,
+        returns their IDs
+        """
+        expired = (
+            select(TaskORM.id)
+            .where(
+                TaskORM.status == "processing",
+                TaskORM.lease_expires_at < datetime.utcnow(),
+                LIVE,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(
+            update(TaskORM)
+            .where(TaskORM.id.in_(expired))
+            .values(
+                status="created",
+                claimed_by=None,
+                lease_expires_at=None,
+                updated_at=datetime.utcnow(),
+                version=TaskORM.version + 1,
+            )
+            .returning(TaskORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars().all())
+
+    @timed
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        """
+        Hard delete up to limit tombstones older than deleted_before.
+        Rows locked by another purger are skipped instead of waited for,
+        so each call is a short transaction over a bounded set of rows
+        """
+        expired = (
+            select(TaskORM.id)
+            .where(TaskORM.deleted_at < deleted_before)
+            .order_by(TaskORM.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
         result = await self._session.execute(
-            delete(TaskORM).where(TaskORM.id == task_id)
+            delete(TaskORM)
+            .where(TaskORM.id.in_(expired))
+            .execution_options(synchronize_session=False)
         )
-        await self._session.flush()
-        return result.rowcount > 0
+        return result.rowcount
@@ -12,11 +12,14 @@ from tests.mocks.gateway import FakeGateway
 class FakeApp(App):
     def __init__(self, config: Configuration):
         self._logger = configure_logger("test-uvicorn-app")
+        self._config = config
         self._bearer = config.task_mgr_bearer
         self.gateway = FakeGateway(config)
         self._app = self._create_fastapi_app()
         self._setup_routes()
         self._setup_auth_middleware()
+        self._setup_metrics_middleware()
+        self._setup_request_logging()
 
     # @staticmethod
     # def get_repository_factory(gateway: FakeGateway):
@@ -25,5 +28,7 @@ class FakeApp(App):
     #
     #     return Depends(factory_dependency)
 
-    def get_repository_factory(self, gateway: FakeGateway) -> FakeRepositoryFactory:
+    def get_repository_factory(
+        self, gateway: FakeGateway, read_only: bool = False
+    ) -> FakeRepositoryFactory:
         return gateway.get_repository_factory(AsyncMock())
@@ -1,4 +1,5 @@
 from config.cfg import Configuration
+from config.engine import ENGINE_PROFILES
 
 
 class FakeConfiguration(Configuration):
@@ -11,3 +12,44 @@ class FakeConfiguration(Configuration):
         self._task_mgr_bearer = "test"
         self.__port = "8000"
         self.__host = "0.0.0.0"
+        self._page_size_default = 50
+        self._page_size_max = 500
+        self._batch_size_max = 1000
+        self._cache_enabled = False
+        self._cache_max_entries = 100
+        self._cache_max_bytes = 1024 * 1024
+        self._cache_ttl = 30.0
+        self._export_fetch_size = 2
+        self._import_chunk_size = 2
+        self._search_config = "russian"
+        self._log_format = "text"
+        self._log_sample_rates = {}
+        self._log_rate_limit = 10.0
+        self._log_queue_size = 100
+        self._engine_profile = ENGINE_PROFILES["dev"]
+        self._replica_urls = []
+        self._replica_strategy = "round_robin"
+        self._replica_health_interval = 5.0
+        self._read_your_writes_window = 2.0
+        self._slow_query_ms = 500.0
+        self._slow_query_explain = False
+        self._slow_query_top_n = 20
+        self._validate_reads = True
+        self._background_jobs = False
+        self._purge_retention = 7 * 86400.0
+        self._purge_batch_size = 2
+        self._purge_interval = 300.0
+        self._purge_pause = 0.0
+        self._claim_lease = 300.0
+        self._claim_limit_max = 100
+        self._lease_reap_interval = 15.0
+        self._stream_max_clients = 10
+        self._stream_buffer = 3
+        self._stream_keepalive = 15.0
+        self._stream_listen_url = None
+        self._sync_settle = 0.0
+        self._stats_reconcile_interval = 3600.0
+        self._idempotency_backend = "memory"
+        self._idempotency_ttl = 86400.0
+        self._idempotency_max_keys = 3
+        self._idempotency_wait = 1.0
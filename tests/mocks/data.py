@@ -40,3 +40,14 @@ class FakeData:
             "text": "valid_text",
             "status": "non_existent_status",  # Несуществующий статус
         }
+
+    @staticmethod
+    def get_batch_create_request(mode: str = "atomic") -> dict:
+        return {
+            "mode": mode,
+            "items": [
+                {"name": "batch_1", "text": "batch_1", "status": "created"},
+                {"name": "", "text": "batch_2", "status": "created"},
+                {"name": "batch_3", "text": "batch_3", "status": "done"},
+            ],
+        }
@@ -1,11 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from repos.factory import RepositoryFactory
+from repos.idempotency import CommitBoundStore, IIdempotencyStore
 from repos.interface import ITasksRepository
 from tests.mocks.tasks_repo import FakeTasksRepository
 
 
 class FakeRepositoryFactory(RepositoryFactory):
+    # shared like the tasks storage, FastAPI copies the factory per request
+    _idempotency: IIdempotencyStore | None = None
 
     def __init__(self, session: AsyncSession):
         self.__tasks = FakeTasksRepository()
@@ -14,3 +17,10 @@ class FakeRepositoryFactory(RepositoryFactory):
     def tasks(self) -> ITasksRepository:
         # types are struggling here but the easiest way
         return self.__tasks
+
+    @property
+    def idempotency(self) -> IIdempotencyStore | None:
+        # there is no commit, responses are stored right away
+        if self._idempotency is None:
+            return None
+        return CommitBoundStore(self._idempotency, None)
@@ -2,7 +2,10 @@ from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from metrics.instruments import Metrics
+from repos.changes import ChangeFeed
 from repos.gateway import DatabaseGateway
+from repos.idempotency import MemoryIdempotencyStore
 from config.cfg import Configuration
 from tests.mocks.factory import FakeRepositoryFactory
 
@@ -13,6 +16,21 @@ class FakeGateway(DatabaseGateway):
         self._engine = None
         self._session_factory = None
         self._is_initialized = True
+        self._cache = None
+        FakeRepositoryFactory._idempotency = MemoryIdempotencyStore(
+            max_keys=config.idempotency_max_keys,
+            ttl=config.idempotency_ttl,
+            wait=config.idempotency_wait,
+        )
+        self._replicas = None
+        self._slow_queries = None
+        self._metrics = Metrics()
+        # events are published by the tests, there is no LISTEN connection
+        self._changes = ChangeFeed(
+            max_pending=config.stream_buffer,
+            max_subscribers=config.stream_max_clients,
+            metrics=self._metrics,
+        )
 
     async def initialize(self):
         pass
@@ -21,8 +39,15 @@ class FakeGateway(DatabaseGateway):
         pass
 
     @asynccontextmanager
-    async def session(self):
+    async def session(self, read_only=False, client=None, snapshot=False):
         yield None
 
+    async def copy_records(self, table, columns, records) -> int:
+        tasks = self.get_repository_factory(None).tasks
+        for record in records:
+            row = dict(zip(columns, record))
+            await tasks.create({key: row[key] for key in ("name", "text", "status")})
+        return len(records)
+
     def get_repository_factory(self, session: AsyncSession):
         return FakeRepositoryFactory(session)
@@ -0,0 +1,71 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import Insert
+
+from models.orm import TaskORM
+from repos.tasks import TASK_COLUMNS
+
+# deleted_at follows TASK_COLUMNS in the changes feed
+TaskRow = namedtuple(
+    "TaskRow", [column.key for column in TASK_COLUMNS] + ["deleted_at"]
+)
+
+
+class StatementCountingSession:
+    """AsyncSession stand-in that records every executed statement"""
+
+    def __init__(self):
+        self.statements = []
+        self.row = self._make_row(uuid.uuid4())
+
+    @staticmethod
+    def _make_row(task_id: uuid.UUID) -> TaskORM:
+        return TaskORM(
+            id=task_id,
+            name="counted",
+            text="counted",
+            status="created",
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+            version=1,
+        )
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        rows = [self.row]
+        if isinstance(statement, Insert):
+            # echo inserted ids back the way RETURNING would
+            params = statement.compile().params
+            rows = [
+                self._make_row(value)
+                for key, value in params.items()
+                if key == "id" or key.startswith("id_m")
+            ]
+        result = MagicMock()
+        result.scalar_one.return_value = rows[0]
+        result.scalar_one_or_none.return_value = rows[0]
+        result.scalars.return_value.all.return_value = rows
+        # Core selects of TASK_COLUMNS get plain rows
+        task_rows = [
+            TaskRow(
+                *(getattr(row, column.key) for column in TASK_COLUMNS),
+                row.deleted_at,
+            )
+            for row in rows
+        ]
+        result.all.return_value = task_rows
+        result.one.return_value = task_rows[0]
+        result.one_or_none.return_value = task_rows[0]
+        return result
+
+    async def flush(self):
+        raise AssertionError("flush() is an extra round trip")
+
+    async def refresh(self, instance):
+        raise AssertionError("refresh() is an extra round trip")
+
+    def reset(self):
+        self.statements.clear()
@@ -1,11 +1,26 @@
 import uuid
-from typing import List, Optional
-from models.dto import TaskDTO
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from models.dto import (
+    ChangesPageDTO,
+    ClaimResultDTO,
+    Page,
+    TaskChangeDTO,
+    TaskDTO,
+    TaskStatsDTO,
+)
+from models.requests import TaskListQuery
+from repos.pagination import decode_cursor, encode_cursor
 
 
 class FakeTasksRepository:
 
     _shared_storage = {}
+    _timestamps = {}
+    _tombstones = {}
+    _leases = {}
 
     def __init__(self):
         self._initialize_with_data()
@@ -22,28 +37,197 @@ class FakeTasksRepository:
                 task_id = uuid.uuid4()  # Генерируем UUID вместо integer
                 task = TaskDTO(id=task_id, **task_data)
                 self._shared_storage[task_id] = task
+                self._touch(task_id)
 
-    async def get_all(self) -> List[TaskDTO]:
-        return list(self._shared_storage.values())
+    def _touch(self, task_id: uuid.UUID):
+        now = datetime.utcnow()
+        timestamps = self._timestamps.setdefault(task_id, {"created_at": now})
+        timestamps["updated_at"] = now
+        self._shared_storage[task_id] = self._shared_storage[task_id].model_copy(
+            update={"updated_at": now}
+        )
+
+    async def get_all(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[TaskListQuery] = None,
+    ) -> Page[TaskDTO]:
+        filters = filters or TaskListQuery()
+        descending = filters.order == "desc"
+        keys = sorted(
+            (
+                (self._timestamps[k][filters.sort_by], k)
+                for k, task in self._shared_storage.items()
+                if self._matches(k, task, filters)
+            ),
+            reverse=descending,
+        )
+        if cursor:
+            position = decode_cursor(cursor, filters.sort_by, filters.order)
+            keys = [k for k in keys if (k < position if descending else k > position)]
+        next_cursor = None
+        if len(keys) > limit:
+            next_cursor = encode_cursor(
+                *keys[limit - 1], filters.sort_by, filters.order
+            )
+        return Page[TaskDTO](
+            items=[self._shared_storage[k] for _, k in keys[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    def _matches(self, task_id: uuid.UUID, task: TaskDTO, filters: TaskListQuery):
+        timestamps = self._timestamps[task_id]
+        bounds = [
+            (filters.created_from, filters.created_to, timestamps["created_at"]),
+            (filters.updated_from, filters.updated_to, timestamps["updated_at"]),
+        ]
+        if filters.status is not None and task.status != filters.status:
+            return False
+        for lower, upper, value in bounds:
+            if lower is not None and value < lower:
+                return False
+            if upper is not None and value >= upper:
+                return False
+        return True
 
     async def get_by_id(
         self, task_id: uuid.UUID
     ) -> Optional[TaskDTO]:  # Меняем тип на UUID
         return self._shared_storage.get(task_id)
 
-    async def update(self, task_id: uuid.UUID, task_data: dict) -> Optional[TaskDTO]:
+    async def get_version(self, task_id: uuid.UUID) -> Optional[int]:
+        task = self._shared_storage.get(task_id)
+        return task.version if task else None
+
+    async def get_page_versions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[TaskListQuery] = None,
+    ) -> list[tuple[uuid.UUID, datetime]]:
+        page = await self.get_all(limit + 1, cursor, filters)
+        return [(task.id, task.updated_at) for task in page.items]
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        search_config: str = "russian",
+    ) -> Page[TaskDTO]:
+        words = query.lower().split()
+        ranked = sorted(
+            (
+                (
+                    float(
+                        sum(f"{task.name} {task.text}".lower().count(w) for w in words)
+                    ),
+                    k,
+                )
+                for k, task in self._shared_storage.items()
+            ),
+            reverse=True,
+        )
+        ranked = [key for key in ranked if key[0] > 0]
+        if cursor:
+            position = decode_cursor(cursor, "rank", "desc")
+            ranked = [key for key in ranked if key < position]
+        next_cursor = None
+        if len(ranked) > limit:
+            next_cursor = encode_cursor(*ranked[limit - 1], "rank", "desc")
+        return Page[TaskDTO](
+            items=[self._shared_storage[k] for _, k in ranked[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    async def get_changes(
+        self,
+        limit: int,
+        since: Optional[str] = None,
+        settle: float = 5.0,
+        retention: Optional[float] = None,
+    ) -> ChangesPageDTO:
+        now = datetime.utcnow()
+        changes = [
+            TaskChangeDTO(
+                id=k,
+                updated_at=self._timestamps[k]["updated_at"],
+                **task.model_dump(include={"name", "text", "status", "version"}),
+            )
+            for k, task in self._shared_storage.items()
+        ]
+        cutoff = now - timedelta(seconds=settle)
+        position = None
+        if since:
+            position = decode_cursor(since, "sync", "asc")
+            if retention is not None and position[0] < now - timedelta(
+                seconds=retention
+            ):
+                raise HTTPException(status_code=410, detail="Sync token expired")
+            changes += [
+                TaskChangeDTO(id=k, updated_at=deleted_at, version=0, deleted=True)
+                for k, deleted_at in self._tombstones.items()
+            ]
+            changes = [c for c in changes if (c.updated_at, c.id) > position]
+        changes = [c for c in changes if c.updated_at <= cutoff]
+        changes.sort(key=lambda c: (c.updated_at, c.id))
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            position = (changes[-1].updated_at, changes[-1].id)
+        else:
+            position = (cutoff, uuid.UUID(int=0))
+        return ChangesPageDTO(
+            items=changes,
+            next_token=encode_cursor(*position, "sync", "asc"),
+            has_more=has_more,
+        )
+
+    async def get_status_counts(self) -> TaskStatsDTO:
+        counts = {}
+        for task in self._shared_storage.values():
+            counts[task.status] = counts.get(task.status, 0) + 1
+        return TaskStatsDTO(**counts, total=len(self._shared_storage))
+
+    async def reconcile_status_counts(self) -> Optional[dict[str, int]]:
+        return {}
+
+    async def stream_all(
+        self, fetch_size: int, filters: Optional[TaskListQuery] = None
+    ) -> AsyncIterator[TaskDTO]:
+        cursor = None
+        while True:
+            page = await self.get_all(fetch_size, cursor, filters)
+            for task in page.items:
+                yield task
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+    async def update(
+        self,
+        task_id: uuid.UUID,
+        task_data: dict,
+        expected_version: Optional[int] = None,
+    ) -> TaskDTO:
         if task_id not in self._shared_storage:
-            return None
+            raise HTTPException(status_code=404, detail="Task not found")
 
         existing_task = self._shared_storage[task_id]
+        if expected_version is not None and existing_task.version != expected_version:
+            raise HTTPException(status_code=412, detail="Version mismatch")
         updated_task = TaskDTO(
             id=task_id,
             name=task_data.get("name", existing_task.name),
             text=task_data.get("text", existing_task.text),
             status=task_data.get("status", existing_task.status),
+            version=existing_task.version + 1,
         )
         self._shared_storage[task_id] = updated_task
-        return updated_task
+        self._touch(task_id)
+        return self._shared_storage[task_id]
 
     async def create(self, task_data: dict) -> TaskDTO:
         task_id = uuid.uuid4()
@@ -54,18 +238,77 @@ class FakeTasksRepository:
             status=task_data["status"],
         )
         self._shared_storage[task_id] = task
-        return task
+        self._touch(task_id)
+        return self._shared_storage[task_id]
+
+    async def create_many(self, tasks_data: list[dict]) -> list[TaskDTO]:
+        return [await self.create(task_data) for task_data in tasks_data]
+
+    async def update_many(self, patches: list[dict]) -> list[TaskDTO]:
+        return [
+            await self.update(patch["id"], patch)
+            for patch in patches
+            if patch["id"] in self._shared_storage
+        ]
+
+    async def delete_many(self, task_ids: list[uuid.UUID]) -> list[uuid.UUID]:
+        return [task_id for task_id in task_ids if await self.delete(task_id)]
 
     async def delete(self, task_id: uuid.UUID) -> bool:
         if task_id in self._shared_storage:
             del self._shared_storage[task_id]
+            del self._timestamps[task_id]
+            self._leases.pop(task_id, None)
+            self._tombstones[task_id] = datetime.utcnow()
             return True
         return False
 
+    async def claim(self, limit: int, worker: str, lease: float) -> ClaimResultDTO:
+        lease_expires_at = datetime.utcnow() + timedelta(seconds=lease)
+        claimable = sorted(
+            (self._timestamps[k]["created_at"], k)
+            for k, task in self._shared_storage.items()
+            if task.status == "created"
+        )[:limit]
+        items = []
+        for _, task_id in claimable:
+            self._leases[task_id] = lease_expires_at
+            items.append(await self.update(task_id, {"status": "processing"}))
+        return ClaimResultDTO(
+            worker=worker, lease_expires_at=lease_expires_at, items=items
+        )
+
+    async def release_expired_leases(self, limit: int) -> list[uuid.UUID]:
+        now = datetime.utcnow()
+        expired = [
+            task_id
+            for task_id, expires_at in self._leases.items()
+            if expires_at < now
+            and task_id in self._shared_storage
+            and self._shared_storage[task_id].status == "processing"
+        ][:limit]
+        for task_id in expired:
+            del self._leases[task_id]
+            await self.update(task_id, {"status": "created"})
+        return expired
+
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        expired = [
+            task_id
+            for task_id, deleted_at in self._tombstones.items()
+            if deleted_at < deleted_before
+        ][:limit]
+        for task_id in expired:
+            del self._tombstones[task_id]
+        return len(expired)
+
     async def get_any_id_if_exists(self) -> uuid.UUID | None:
-        all_rows = await self.get_all()
+        all_rows = list(self._shared_storage.values())
         return all_rows[0].id if all_rows else None
 
     @classmethod
     def reset_storage(cls):
         cls._shared_storage.clear()
+        cls._timestamps.clear()
+        cls._tombstones.clear()
+        cls._leases.clear()
@@ -1,3 +1,7 @@
+import csv
+import io
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from tests.mocks.appcore import FakeApp
@@ -29,7 +33,71 @@ class TestHighLevelLogicsComplex:
         response = client.get("/tasks/", headers=headers)
         assert response.status_code == 200
         initial_tasks = response.json()
-        assert len(initial_tasks) == 3
+        assert len(initial_tasks["items"]) == 3
+        assert initial_tasks["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_all_paginated(self, client, headers):
+        """Test walking the task list page by page with a cursor"""
+        expected = [
+            t["id"] for t in client.get("/tasks/", headers=headers).json()["items"]
+        ]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 1}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/tasks/", headers=headers, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= 1
+            seen.extend(t["id"] for t in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        assert seen == expected
+
+    @pytest.mark.asyncio
+    async def test_get_all_invalid_cursor(self, client, headers):
+        """Test malformed cursor is rejected"""
+        response = client.get(
+            "/tasks/", headers=headers, params={"cursor": "not-a-cursor"}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_all_filtered(self, client, headers, app):
+        """Test filtering by status and sorting in descending order"""
+        repo = app.get_repository_factory(app.gateway).tasks
+        some_id = await repo.get_any_id_if_exists()
+        await repo.update(some_id, {"status": "done"})
+
+        response = client.get("/tasks/", headers=headers, params={"status": "done"})
+        assert response.status_code == 200
+        done = response.json()["items"]
+        assert [t["id"] for t in done] == [str(some_id)]
+
+        ascending = client.get("/tasks/", headers=headers).json()["items"]
+        descending = client.get(
+            "/tasks/", headers=headers, params={"order": "desc"}
+        ).json()["items"]
+        assert descending == ascending[::-1]
+
+        response = client.get("/tasks/", headers=headers, params={"status": "unknown"})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_cursor_sort_mismatch(self, client, headers):
+        """Test cursor issued for one sort order is rejected for another"""
+        page = client.get("/tasks/", headers=headers, params={"limit": 1}).json()
+        response = client.get(
+            "/tasks/",
+            headers=headers,
+            params={"limit": 1, "cursor": page["next_cursor"], "order": "desc"},
+        )
+        assert response.status_code == 400
 
     @pytest.mark.asyncio
     async def test_get(self, client, headers, app):
@@ -41,6 +109,116 @@ class TestHighLevelLogicsComplex:
         assert response.status_code == 200
         assert response.json()["id"] == str(some_id)
 
+    @pytest.mark.asyncio
+    async def test_conditional_get(self, client, headers, app):
+        """Test ETag / If-None-Match on a single task and on a list page"""
+        some_id = await app.get_repository_factory(
+            app.gateway
+        ).tasks.get_any_id_if_exists()
+
+        response = client.get(f"/tasks/{some_id}", headers=headers)
+        etag = response.headers["ETag"]
+        list_etag = client.get("/tasks/", headers=headers).headers["ETag"]
+
+        response = client.get(
+            f"/tasks/{some_id}", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert not response.content
+
+        response = client.get(
+            "/tasks/", headers={**headers, "If-None-Match": list_etag}
+        )
+        assert response.status_code == 304
+
+        client.put(f"/tasks/{some_id}", headers=headers, json={"name": "etag"})
+
+        response = client.get(
+            f"/tasks/{some_id}", headers={**headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        response = client.get(
+            "/tasks/", headers={**headers, "If-None-Match": list_etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != list_etag
+
+    @pytest.mark.asyncio
+    async def test_export(self, client, headers):
+        """Test NDJSON and CSV export stream every task"""
+        expected = {
+            task["id"]
+            for task in client.get("/tasks/", headers=headers).json()["items"]
+        }
+
+        response = client.get("/tasks/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = response.text.splitlines()
+        assert {json.loads(line)["id"] for line in lines} == expected
+
+        response = client.get(
+            "/tasks/export", headers=headers, params={"format": "csv"}
+        )
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert {row["id"] for row in rows} == expected
+
+    @pytest.mark.asyncio
+    async def test_import(self, client, headers):
+        """Test streamed NDJSON import reports loaded and rejected rows"""
+        total = len(client.get("/tasks/", headers=headers).json()["items"])
+        body = (
+            b'{"name": "imported", "text": "imported"}\n'
+            b'{"name": "", "text": "imported"}\n'
+        )
+
+        response = client.post("/tasks/import", headers=headers, content=body)
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["imported"], report["rejected"]) == (1, 1)
+        assert report["errors"][0]["line"] == 2
+
+        page = client.get("/tasks/", headers=headers).json()["items"]
+        assert len(page) == total + 1
+        client.delete(f"/tasks/{page[-1]['id']}", headers=headers)
+
+    @pytest.mark.asyncio
+    async def test_search(self, client, headers):
+        """Test search ranks matches and paginates them"""
+        created = client.post(
+            "/tasks/batch",
+            headers=headers,
+            json={
+                "items": [
+                    {"name": "Изучить FastAPI", "text": "FastAPI и снова FastAPI"},
+                    {"name": "Настроить базу", "text": "PostgreSQL и FastAPI"},
+                ]
+            },
+        ).json()
+        ids = [item["task"]["id"] for item in created["results"]]
+
+        response = client.get(
+            "/tasks/search", headers=headers, params={"q": "fastapi", "limit": 1}
+        )
+        assert response.status_code == 200
+        first = response.json()
+        assert [task["id"] for task in first["items"]] == ids[:1]
+
+        response = client.get(
+            "/tasks/search",
+            headers=headers,
+            params={"q": "fastapi", "limit": 1, "cursor": first["next_cursor"]},
+        )
+        second = response.json()
+        assert [task["id"] for task in second["items"]] == ids[1:]
+        assert second["next_cursor"] is None
+
+        assert client.get("/tasks/search", headers=headers).status_code == 422
+        client.post("/tasks/batch-delete", headers=headers, json={"ids": ids})
+
     @pytest.mark.asyncio
     async def test_create(self, client, headers):
         fake_data = FakeData.get_valid_create_task_request()
@@ -50,6 +228,91 @@ class TestHighLevelLogicsComplex:
         assert result["text"] == fake_data.text
         assert result["name"] == fake_data.name
         assert result["status"] == fake_data.status
+        assert set(result) == {"id", "name", "text", "status", "version"}
+
+    @pytest.mark.asyncio
+    async def test_create_batch(self, client, headers):
+        """Test batch creation in atomic and best-effort modes"""
+        total = len(client.get("/tasks/", headers=headers).json()["items"])
+
+        response = client.post(
+            "/tasks/batch",
+            headers=headers,
+            json=FakeData.get_batch_create_request("atomic"),
+        )
+        assert response.status_code == 422
+        assert [item["index"] for item in response.json()["detail"]] == [1]
+        assert len(client.get("/tasks/", headers=headers).json()["items"]) == total
+
+        response = client.post(
+            "/tasks/batch",
+            headers=headers,
+            json=FakeData.get_batch_create_request("best_effort"),
+        )
+        assert response.status_code == 207
+        result = response.json()
+        assert (result["created"], result["failed"]) == (2, 1)
+        assert [item["ok"] for item in result["results"]] == [True, False, True]
+        assert result["results"][2]["task"]["status"] == "done"
+        assert len(client.get("/tasks/", headers=headers).json()["items"]) == total + 2
+
+        ids = [item["task"]["id"] for item in result["results"] if item["ok"]]
+        for task_id in ids:
+            client.delete(f"/tasks/{task_id}", headers=headers)
+
+    @pytest.mark.asyncio
+    async def test_create_batch_too_large(self, client, headers, config):
+        """Test batch over the configured maximum is rejected"""
+        item = FakeData.get_valid_create_task_request().model_dump()
+        response = client.post(
+            "/tasks/batch",
+            headers=headers,
+            json={"items": [item] * (config.batch_size_max + 1)},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_batch(self, client, headers):
+        """Test batch update and batch delete report affected and missing IDs"""
+        created = client.post(
+            "/tasks/batch",
+            headers=headers,
+            json={"items": [FakeData.get_valid_create_task_request().model_dump()] * 2},
+        ).json()
+        ids = [item["task"]["id"] for item in created["results"]]
+        missing_id = "00000000-0000-0000-0000-000000000000"
+
+        response = client.patch(
+            "/tasks/batch",
+            headers=headers,
+            json={
+                "items": [
+                    {"id": ids[0], "status": "done"},
+                    {"id": ids[1], "name": "renamed"},
+                    {"id": missing_id, "status": "done"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        result = response.json()
+        assert result["missing"] == [missing_id]
+        updated = {task["id"]: task for task in result["updated"]}
+        assert updated[ids[0]]["status"] == "done"
+        assert updated[ids[1]]["name"] == "renamed"
+        assert updated[ids[1]]["status"] == "created"
+
+        response = client.patch(
+            "/tasks/batch",
+            headers=headers,
+            json={"items": [{"id": ids[0]}, {"id": ids[0], "status": "done"}]},
+        )
+        assert response.status_code == 422
+
+        response = client.post(
+            "/tasks/batch-delete", headers=headers, json={"ids": ids + [missing_id]}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"deleted": ids, "missing": [missing_id]}
 
     @pytest.mark.asyncio
     async def test_update(self, client, headers, app):
@@ -68,6 +331,51 @@ class TestHighLevelLogicsComplex:
         assert result["name"] == fake_data.name != task.name
         assert result["status"] == fake_data.status != task.status
 
+    @pytest.mark.asyncio
+    async def test_conditional_update(self, client, headers, app):
+        """Test If-Match on update, a stale ETag loses with 412"""
+        some_id = await app.get_repository_factory(
+            app.gateway
+        ).tasks.get_any_id_if_exists()
+        etag = client.get(f"/tasks/{some_id}", headers=headers).headers["ETag"]
+
+        response = client.put(
+            f"/tasks/{some_id}",
+            headers={**headers, "If-Match": etag},
+            json={"name": "first"},
+        )
+        assert response.status_code == 200
+        new_etag = response.headers["ETag"]
+        assert new_etag != etag
+        assert (
+            client.get(f"/tasks/{some_id}", headers=headers).headers["ETag"] == new_etag
+        )
+
+        for stale in (etag, f"W/{new_etag}", "garbage"):
+            response = client.put(
+                f"/tasks/{some_id}",
+                headers={**headers, "If-Match": stale},
+                json={"name": "second"},
+            )
+            assert response.status_code == 412
+        assert (
+            client.get(f"/tasks/{some_id}", headers=headers).json()["name"] == "first"
+        )
+
+        response = client.put(
+            f"/tasks/{some_id}",
+            headers={**headers, "If-Match": "*"},
+            json={"name": "any"},
+        )
+        assert response.status_code == 200
+
+        response = client.put(
+            "/tasks/00000000-0000-0000-0000-000000000000",
+            headers={**headers, "If-Match": new_etag},
+            json={"name": "missing"},
+        )
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     async def test_delete(self, client, headers):
         """Test deleting a task"""
@@ -182,3 +490,15 @@ class TestHighLevelLogicsComplex:
         wrong_headers = {"Authorization": "Bearer wrong_token"}
         response = client.get("/tasks/", headers=wrong_headers)
         assert response.status_code == 401
+
+        malformed_headers = {"Authorization": "Bearer"}
+        response = client.get("/tasks/", headers=malformed_headers)
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+    @pytest.mark.asyncio
+    async def test_auth_scheme_and_exempt_paths(self, client, config):
+        """Test scheme is case-insensitive and docs need no token"""
+        headers = {"Authorization": f"bearer {config.task_mgr_bearer}"}
+        assert client.get("/tasks/", headers=headers).status_code == 200
+        assert client.get("/openapi.json").status_code == 200
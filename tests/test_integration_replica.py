@@ -0,0 +1,79 @@
+"""
+Replica routing against real servers. Opt-in, needs the primary from .env
+and the db-replica compose service in TASK_MGR_DB_REPLICA_URLS (README,
+Read replica tests). The replica is a separate database that never gets
+the rows of the primary, so a 404 tells that a read was served by it
+"""
+
+import os
+import subprocess
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import App
+from config.cfg import Configuration
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("TASK_MGR_TEST_REPLICA"),
+    reason="set TASK_MGR_TEST_REPLICA=1 and start the db-replica service",
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # cached reads would hide which server answered
+    monkeypatch.setenv("TASK_MGR_CACHE_ENABLED", "false")
+    monkeypatch.setenv("TASK_MGR_BACKGROUND_JOBS", "false")
+    monkeypatch.setenv("TASK_MGR_DB_REPLICA_HEALTH_INTERVAL", "0.5")
+    monkeypatch.setenv("TASK_MGR_DB_READ_YOUR_WRITES_WINDOW", "60")
+    with TestClient(App(Configuration()).app) as test_client:
+        yield test_client
+
+
+def _headers(client_id: str) -> dict:
+    return {
+        "Authorization": f"Bearer {os.environ['TASK_MGR_BEARER']}",
+        "X-Client-ID": f"{client_id}-{uuid.uuid4()}",
+    }
+
+
+def _replica(command: str):
+    subprocess.run(["docker", "compose", command, "db-replica"], check=True)
+
+
+def _wait_for(client, path, headers, status_code, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while client.get(path, headers=headers).status_code != status_code:
+        assert time.monotonic() < deadline, f"{path} never answered {status_code}"
+        time.sleep(0.5)
+
+
+def test_reads_go_to_the_replica_and_fall_back_to_the_primary(client):
+    writer, reader = _headers("writer"), _headers("reader")
+    created = client.post(
+        "/tasks/", headers=writer, json={"name": "replica", "text": "routing"}
+    )
+    assert created.status_code == 201, created.text
+    path = f"/tasks/{created.json()['id']}"
+
+    try:
+        # the writer reads its own write from the primary, others the replica
+        assert client.get(path, headers=writer).status_code == 200
+        assert client.get(path, headers=reader).status_code == 404
+
+        _replica("stop")
+        try:
+            # the failed connect falls back at once, health checks keep it out
+            assert client.get(path, headers=reader).status_code == 200
+            time.sleep(1)
+            assert client.get(path, headers=reader).status_code == 200
+        finally:
+            _replica("start")
+
+        # back in rotation once a health check passes again
+        _wait_for(client, path, reader, 404)
+    finally:
+        client.delete(path, headers=writer)
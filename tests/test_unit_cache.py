@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+from repos.cache import CachedTasksRepository, LRUCacheBackend
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    cache = LRUCacheBackend(max_entries=2, max_bytes=1000, ttl=10, sizeof=len)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_respects_size_limit_and_ttl():
+    clock = FakeClock()
+    cache = LRUCacheBackend(
+        max_entries=10, max_bytes=5, ttl=10, clock=clock, sizeof=len
+    )
+    await cache.set("a", "123")
+    await cache.set("b", "456")
+    assert await cache.get("a") is None
+    assert cache.stats()["bytes"] == 3
+
+    clock.now = 10
+    assert await cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["expirations"], stats["misses"]) == (0, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_cached_repository_reads_through_and_invalidates():
+    FakeTasksRepository.reset_storage()
+    inner = FakeTasksRepository()
+    cache = LRUCacheBackend(max_entries=10, max_bytes=1024 * 1024, ttl=10)
+    repo = CachedTasksRepository(inner, cache)
+    task_id = await inner.get_any_id_if_exists()
+
+    first = await repo.get_by_id(task_id)
+    assert await repo.get_by_id(task_id) is first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    updated = await repo.update(task_id, {"status": "done"})
+    assert (await repo.get_by_id(task_id)).status == updated.status == "done"
+
+    await repo.delete(task_id)
+    assert await repo.get_by_id(task_id) is None
+    FakeTasksRepository.reset_storage()
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_do_not_fill_the_cache():
+    FakeTasksRepository.reset_storage()
+    inner = FakeTasksRepository()
+    cache = LRUCacheBackend(max_entries=10, max_bytes=1024 * 1024, ttl=10)
+    replica_session = SimpleNamespace(info={"replica": True})
+    task_id = await inner.get_any_id_if_exists()
+
+    await CachedTasksRepository(inner, cache, replica_session).get_by_id(task_id)
+    assert cache.stats()["entries"] == 0
+
+    await CachedTasksRepository(inner, cache, SimpleNamespace(info={})).get_by_id(
+        task_id
+    )
+    assert cache.stats()["entries"] == 1
+    FakeTasksRepository.reset_storage()
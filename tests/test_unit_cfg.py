@@ -1,5 +1,78 @@
+import pytest
+
 from config.cfg import Configuration
+from models.orm import TaskORM, _search_config, search_vector_sql
+
+
+@pytest.fixture(autouse=True)
+def bearer(monkeypatch):
+    monkeypatch.setenv("TASK_MGR_BEARER", "secret")
 
 
 def test_config_loading():
     config = Configuration()  # config does not throw an err on init
+
+
+def test_engine_profile_overrides(monkeypatch):
+    monkeypatch.setenv("TASK_MGR_DB_PROFILE", "benchmark")
+    monkeypatch.setenv("TASK_MGR_DB_POOL_SIZE", "8")
+    profile = Configuration().engine_profile
+    assert (profile.pool_size, profile.max_overflow, profile.echo) == (8, 0, False)
+    assert profile.engine_kwargs()["pool_pre_ping"] is False
+
+
+def test_engine_profile_pgbouncer(monkeypatch):
+    monkeypatch.setenv("TASK_MGR_DB_PGBOUNCER", "true")
+    connect_args = Configuration().engine_profile.engine_kwargs()["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert "server_settings" not in connect_args
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("TASK_MGR_DB_PROFILE", "fast"),
+        ("TASK_MGR_DB_POOL_SIZE", "0"),
+        ("TASK_MGR_DB_POOL_RECYCLE", "-5"),
+    ],
+)
+def test_engine_profile_validation(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError):
+        Configuration()
+
+
+def test_engine_profile_pgbouncer_rejects_statement_cache(monkeypatch):
+    monkeypatch.setenv("TASK_MGR_DB_PGBOUNCER", "true")
+    monkeypatch.setenv("TASK_MGR_DB_STATEMENT_CACHE_SIZE", "100")
+    with pytest.raises(ValueError):
+        Configuration()
+
+
+def test_sync_settle_covers_statement_timeout(monkeypatch):
+    monkeypatch.setenv("TASK_MGR_DB_STATEMENT_TIMEOUT_MS", "45000")
+    assert Configuration().sync_settle == 45.0
+
+    monkeypatch.setenv("TASK_MGR_SYNC_SETTLE", "5")
+    with pytest.raises(ValueError):
+        Configuration()
+
+
+def test_bearer_is_required(monkeypatch):
+    monkeypatch.delenv("TASK_MGR_BEARER")
+    with pytest.raises(ValueError, match="TASK_MGR_BEARER"):
+        Configuration()
+
+
+def test_search_vector_follows_search_config(monkeypatch):
+    computed = TaskORM.__table__.c.search_vector.computed
+    assert computed.sqltext.text == search_vector_sql("russian")
+
+    monkeypatch.setenv("TASK_MGR_SEARCH_CONFIG", "english")
+    assert search_vector_sql(_search_config()).count("'english'") == 2
+    monkeypatch.setenv("TASK_MGR_SEARCH_CONFIG", "x'; drop")
+    with pytest.raises(ValueError):
+        _search_config()
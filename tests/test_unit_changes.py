@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+
+from app.events import stream_changes
+from repos.changes import CHANNEL, ChangeFeed, Subscription
+
+
+def _event(task_id, status="created", event="updated"):
+    return {"event": event, "id": task_id, "status": status}
+
+
+@pytest.mark.asyncio
+async def test_subscription_coalesces_changes_of_one_task():
+    subscription = Subscription(max_pending=2)
+    subscription.push(_event("a"))
+    subscription.push(_event("b"))
+    subscription.push(_event("a", status="done"))
+
+    assert await subscription.get() == [_event("b"), _event("a", status="done")]
+    assert not subscription.overflowed
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    feed = ChangeFeed(max_pending=2)
+    with feed.subscribe() as slow, feed.subscribe() as fast:
+        for task_id in ("a", "b"):
+            feed.publish(_event(task_id))
+        assert len(await fast.get()) == 2
+        feed.publish(_event("c"))
+
+        assert slow.overflowed and await slow.get() == []
+        assert feed.subscribers == 1
+        assert await fast.get() == [_event("c")]
+    assert feed.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_encodes_server_sent_events():
+    feed = ChangeFeed(max_pending=10)
+    stream = stream_changes(feed, keepalive=0.05)
+
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+    assert await stream.__anext__() == b": keepalive\n\n"
+    feed.publish(_event("a", event="created"))
+    feed.publish(_event("b", event="deleted"))
+    chunk = (await stream.__anext__()).decode()
+    await stream.aclose()
+
+    blocks = [block.split("\n") for block in chunk.strip().split("\n\n")]
+    assert [block[0] for block in blocks] == ["event: created", "event: deleted"]
+    assert json.loads(blocks[0][1][len("data: ") :]) == {
+        "id": "a",
+        "status": "created",
+    }
+    assert feed.subscribers == 0
+
+
+class FakeListenConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminate = None
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def is_closed(self):
+        return False
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_listener_publishes_notifications_and_resets_on_loss():
+    feed = ChangeFeed()
+    connections = []
+
+    async def connect():
+        connections.append(FakeListenConnection())
+        return connections[-1]
+
+    with feed.subscribe() as subscription:
+        listener = asyncio.create_task(feed.listen(connect, retry=0))
+        await asyncio.sleep(0)
+        notify = connections[0].listeners[CHANNEL]
+        notify(connections[0], 1, CHANNEL, json.dumps(_event("a")))
+        assert await subscription.get() == [_event("a")]
+
+        connections[0].on_terminate(connections[0])
+        assert (await subscription.get())[0]["event"] == "reset"
+        await asyncio.sleep(0)
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+    assert len(connections) == 2
@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from repos.leases import lease_reaper
+from repos.tasks import TasksRepository
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.session import StatementCountingSession
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+
+@pytest.fixture
+def app():
+    FakeTasksRepository.reset_storage()
+    yield FakeApp(FakeConfiguration())
+    FakeTasksRepository.reset_storage()
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app.app) as test_client:
+        yield test_client
+
+
+def _claim(client, **params):
+    response = client.post(
+        "/tasks/claim", params=params, headers={"Authorization": "Bearer test"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_claims_hand_out_each_task_once(client):
+    first = _claim(client, limit=2, worker="w1")
+    second = _claim(client, limit=2, worker="w2")
+    third = _claim(client, limit=2)
+
+    assert first["worker"] == "w1" and len(first["items"]) == 2
+    assert len(second["items"]) == 1
+    assert third["items"] == [] and third["worker"] == "testclient"
+    claimed = [task["id"] for task in first["items"] + second["items"]]
+    assert len(set(claimed)) == 3
+    assert all(
+        task["status"] == "processing" for task in first["items"] + second["items"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_reaper_returns_expired_leases(app, client):
+    config = app._config
+    config._claim_lease = 0.0
+    claimed = _claim(client, limit=3, worker="dead")
+    reaper = lease_reaper(app.gateway, interval=1, batch_size=2, pause=0)
+
+    assert await reaper.run_once() == 3
+    assert [task["id"] for task in _claim(client, limit=3)["items"]] == [
+        task["id"] for task in claimed["items"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_deleted_tasks_keep_no_lease():
+    session = StatementCountingSession()
+    repo = TasksRepository(session)
+
+    await repo.delete(session.row.id)
+    await repo.delete_many([session.row.id])
+    await repo.release_expired_leases(10)
+
+    *deletes, release = [
+        str(statement.compile(dialect=postgresql.dialect()))
+        for statement in session.statements
+    ]
+    for sql in deletes:
+        assert "claimed_by=%(claimed_by)s" in sql
+        assert "lease_expires_at=%(lease_expires_at)s" in sql
+    # a tombstone that was processing is never moved back to created
+    assert "deleted_at IS NULL" in release
+
+
+@pytest.mark.asyncio
+async def test_reaper_skips_tasks_deleted_while_processing(app, client):
+    app._config._claim_lease = 0.0
+    (task,) = _claim(client, limit=1, worker="dead")["items"]
+    response = client.delete(
+        f"/tasks/{task['id']}", headers={"Authorization": "Bearer test"}
+    )
+    assert response.status_code < 300
+
+    reaper = lease_reaper(app.gateway, interval=1, batch_size=2, pause=0)
+    assert await reaper.run_once() == 0
@@ -0,0 +1,154 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from repos.idempotency import (
+    CommitBoundStore,
+    MemoryIdempotencyStore,
+    StoredResponse,
+    TableIdempotencyStore,
+)
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+RESPONSE = StoredResponse(201, b'{"id": 1}', "fp")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.info = {}
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return MagicMock()
+
+
+@pytest.fixture
+def client():
+    FakeTasksRepository.reset_storage()
+    with TestClient(FakeApp(FakeConfiguration()).app) as test_client:
+        yield test_client
+    FakeTasksRepository.reset_storage()
+
+
+def _create(client, key, name="n"):
+    return client.post(
+        "/tasks/",
+        headers={"Authorization": "Bearer test", "Idempotency-Key": key},
+        json={"name": name, "text": "t"},
+    )
+
+
+def test_retries_replay_the_first_response(client):
+    first = _create(client, "retry")
+    tasks = FakeTasksRepository._shared_storage.copy()
+    second = _create(client, "retry")
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert FakeTasksRepository._shared_storage == tasks
+
+    assert _create(client, "other").json()["id"] != first.json()["id"]
+    assert _create(client, "retry", name="changed").status_code == 422
+    assert _create(client, "k" * 256).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_duplicates_wait_for_the_running_request():
+    store = MemoryIdempotencyStore(max_keys=10, ttl=60, wait=5)
+    assert await store.begin("key", "fp") is None
+
+    waiters = [asyncio.create_task(store.begin("key", "fp")) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert not any(waiter.done() for waiter in waiters)
+
+    await store.complete("key", RESPONSE)
+    assert await asyncio.gather(*waiters) == [RESPONSE] * 3
+
+
+@pytest.mark.asyncio
+async def test_abandoned_key_is_taken_over_by_one_duplicate():
+    store = MemoryIdempotencyStore(max_keys=10, ttl=60, wait=5)
+    await store.begin("key", "fp")
+    waiters = [asyncio.create_task(store.begin("key", "fp")) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    await store.abandon("key")
+    done, pending = await asyncio.wait(waiters, timeout=0.1)
+    # the first waiter owns the key now, the other one waits for it
+    assert [task.result() for task in done] == [None] and len(pending) == 1
+
+    await store.complete("key", RESPONSE)
+    assert await pending.pop() == RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_waiting_is_bounded():
+    store = MemoryIdempotencyStore(max_keys=10, ttl=60, wait=0.01)
+    await store.begin("key", "fp")
+
+    with pytest.raises(HTTPException) as error:
+        await store.begin("key", "fp")
+    assert error.value.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_memory_store_is_bounded_by_keys_and_ttl():
+    clock = FakeClock()
+    store = MemoryIdempotencyStore(max_keys=2, ttl=10, wait=5, clock=clock)
+    for key in ("a", "b", "c"):
+        await store.begin(key, "fp")
+        await store.complete(key, RESPONSE)
+
+    assert await store.begin("a", "fp") is None
+    await store.abandon("a")
+    assert await store.begin("c", "fp") == RESPONSE
+
+    clock.now = 10
+    assert await store.begin("c", "fp") is None
+
+
+@pytest.mark.asyncio
+async def test_response_is_stored_only_after_commit():
+    store = MemoryIdempotencyStore(max_keys=10, ttl=60, wait=5)
+    session = RecordingSession()
+    request = CommitBoundStore(store, session)
+
+    assert await request.begin("key", "fp") is None
+    await request.complete("key", RESPONSE)
+    assert store._get("key") is None
+
+    # a failed commit frees the key, the commit hook then has nothing to do
+    for callback in session.info.pop("after_rollback"):
+        await callback()
+    assert await store.begin("key", "fp") is None
+    for callback in session.info.pop("after_commit"):
+        await callback()
+    assert store._get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_table_store_claims_the_key_in_one_statement():
+    session = RecordingSession()
+    await TableIdempotencyStore(session, ttl=60).begin("key", "fp")
+
+    (statement,) = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (key) DO UPDATE" in sql
+    assert "RETURNING" in sql
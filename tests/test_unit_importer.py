@@ -0,0 +1,92 @@
+import asyncpg
+import pytest
+
+from app.importer import TaskImporter, iter_records
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+class RecordingGateway:
+    def __init__(self):
+        self.chunks = []
+
+    async def copy_records(self, table, columns, records) -> int:
+        self.chunks.append(records)
+        return len(records)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_are_split_across_chunks():
+    data = b'{"name": "a", "text": "b"}\n\nnot json\n{"name": "c", "text": "d"}'
+    records = await _collect(iter_records(_chunks(data), "ndjson"))
+
+    assert [line for line, _ in records] == [1, 3, 4]
+    assert records[0][1] == {"name": "a", "text": "b"}
+    assert isinstance(records[1][1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_csv_quoted_field_may_span_lines():
+    data = b'name,text,status\r\nfirst,"multi\nline, text",done\nsecond,plain,created\n'
+    records = await _collect(iter_records(_chunks(data), "csv"))
+
+    assert records == [
+        (2, {"name": "first", "text": "multi\nline, text", "status": "done"}),
+        (4, {"name": "second", "text": "plain", "status": "created"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_importer_reports_rejected_rows_and_flushes_in_chunks():
+    data = (
+        b'{"name": "a", "text": "a"}\n'
+        b'{"name": " ", "text": "b"}\n'
+        b'{"name": "c", "text": "c", "status": "done"}\n'
+        b'{"name": "d", "text": "d", "id": "00000000-0000-0000-0000-000000000001"}\n'
+    )
+    gateway = RecordingGateway()
+    report = await TaskImporter(gateway, chunk_size=2).run(
+        iter_records(_chunks(data), "ndjson")
+    )
+
+    assert (report.imported, report.rejected) == (3, 1)
+    assert [error.line for error in report.errors] == [2]
+    assert [len(chunk) for chunk in gateway.chunks] == [2, 1]
+    assert str(gateway.chunks[1][0][0]) == "00000000-0000-0000-0000-000000000001"
+
+
+class DuplicateRejectingGateway(RecordingGateway):
+    """COPY fails for a whole chunk holding a name in taken"""
+
+    def __init__(self, taken):
+        super().__init__()
+        self.taken = taken
+
+    async def copy_records(self, table, columns, records) -> int:
+        if any(record[1] in self.taken for record in records):
+            raise asyncpg.UniqueViolationError("duplicate key value")
+        return await super().copy_records(table, columns, records)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_is_split_to_report_the_failing_lines():
+    data = b"".join(
+        b'{"name": "%d", "text": "t"}\n' % number for number in range(1, 11)
+    )
+    gateway = DuplicateRejectingGateway(taken={"3", "8"})
+    report = await TaskImporter(gateway, chunk_size=10).run(
+        iter_records(_chunks(data), "ndjson")
+    )
+
+    assert (report.imported, report.rejected) == (8, 2)
+    assert [error.line for error in report.errors] == [3, 8]
+    assert all("duplicate key" in error.error for error in report.errors)
+    loaded = [record[1] for chunk in gateway.chunks for record in chunk]
+    assert sorted(loaded, key=int) == ["1", "2", "4", "5", "6", "7", "9", "10"]
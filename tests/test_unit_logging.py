@@ -0,0 +1,109 @@
+import io
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.request_log import RequestLogMiddleware
+from logger.structured import (
+    JSONFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+    configure_structured_logger,
+    request_id_var,
+)
+
+
+def make_record(msg="message", level=logging.WARNING, lineno=1, **extra):
+    record = logging.LogRecord("test", level, "file.py", lineno, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_json_formatter_keeps_extra_fields():
+    record = make_record(request_id="abc", latency_ms=1.5)
+    payload = json.loads(JSONFormatter().format(record))
+    assert payload["message"] == "message"
+    assert payload["level"] == "WARNING"
+    assert payload["request_id"] == "abc"
+    assert payload["latency_ms"] == 1.5
+
+
+def test_rate_limit_is_per_call_site_and_reports_suppressed():
+    now = [0.0]
+    limit = RateLimitFilter(per_second=1, burst=2, clock=lambda: now[0])
+
+    passed = [limit.filter(make_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # another line is not affected by the noisy one
+    assert limit.filter(make_record(lineno=2))
+    # info is left to sampling, e.g. one access log line per request
+    assert all(limit.filter(make_record(level=logging.INFO)) for _ in range(5))
+
+    now[0] = 1.0
+    record = make_record()
+    assert limit.filter(record)
+    assert record.suppressed == 3
+
+
+def test_sampling_by_level():
+    sampling = SamplingFilter({logging.INFO: 0.0}, rand=lambda: 0.5)
+    assert not sampling.filter(make_record(level=logging.INFO))
+    assert sampling.filter(make_record(level=logging.WARNING))
+
+
+def test_structured_logger_writes_json_in_background():
+    stream = io.StringIO()
+    logger = configure_structured_logger("test-structured", stream=stream)
+    token = request_id_var.set("req-1")
+    try:
+        logger.info("hello %s", "world", extra={"status": 200})
+    finally:
+        request_id_var.reset(token)
+    logger.handlers[0].listener.stop()
+    # atexit stops it once more
+    logger.handlers[0].listener.stop()
+
+    payload = json.loads(stream.getvalue())
+    assert payload["message"] == "hello world"
+    assert payload["request_id"] == "req-1"
+    assert payload["status"] == 200
+
+
+def test_request_log_middleware():
+    logger = logging.getLogger("test-request-log")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"request_id": request_id_var.get()}
+
+    app.add_middleware(RequestLogMiddleware, logger=logger)
+    client = TestClient(app)
+
+    response = client.get("/ping", headers={"X-Request-ID": "given-id"})
+    assert response.headers["X-Request-ID"] == "given-id"
+    assert response.json() == {"request_id": "given-id"}
+
+    response = client.get("/ping")
+    assert len(response.headers["X-Request-ID"]) == 32
+
+    record = handler.records[0]
+    assert (record.method, record.path, record.status) == ("GET", "/ping", 200)
+    assert record.latency_ms >= 0
+    assert request_id_var.get() is None
@@ -0,0 +1,89 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from metrics.instruments import Metrics, MetricsMiddleware
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+
+# collection cost per request added by MetricsMiddleware
+OVERHEAD_BUDGET_SECONDS = 50e-6
+
+
+def test_metrics_endpoint_without_auth():
+    with TestClient(FakeApp(FakeConfiguration()).app) as client:
+        client.get(
+            "/tasks/00000000-0000-0000-0000-000000000000",
+            headers={"Authorization": "Bearer test"},
+        )
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'taskmgr_http_requests_total{method="GET",route="/tasks/{task_id}",'
+        'status="200"}' in response.text
+    )
+    assert "taskmgr_http_requests_in_flight" in response.text
+
+
+def test_apps_do_not_share_metrics():
+    path = "/tasks/00000000-0000-0000-0000-000000000000"
+    first, second = FakeApp(FakeConfiguration()), FakeApp(FakeConfiguration())
+    with TestClient(first.app) as client:
+        client.get(path, headers={"Authorization": "Bearer test"})
+
+    labels = {"method": "GET", "route": "/tasks/{task_id}", "status": "200"}
+    for app, expected in ((first, 1), (second, None)):
+        registry = app.gateway.metrics.registry
+        assert registry.get_sample_value("taskmgr_http_requests_total", labels) == (
+            expected
+        )
+
+
+def test_engine_events_count_queries():
+    metrics = Metrics()
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(SimpleNamespace(sync_engine=engine), "test")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    def queries(operation):
+        return metrics.registry.get_sample_value(
+            "taskmgr_db_queries_total", {"engine": "test", "operation": operation}
+        )
+
+    assert queries("SELECT") == 1
+    assert queries("OTHER") == 1
+
+
+@pytest.mark.asyncio
+async def test_middleware_overhead_within_budget():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def run(asgi, requests=20000):
+        scope = {"type": "http", "method": "GET", "path": "/bench"}
+        started = time.perf_counter()
+        for _ in range(requests):
+            await asgi(dict(scope), receive, send)
+        return (time.perf_counter() - started) / requests
+
+    instrumented = MetricsMiddleware(app, Metrics())
+    await run(instrumented, 1000)
+    overhead = OVERHEAD_BUDGET_SECONDS
+    for _ in range(3):
+        overhead = min(overhead, await run(instrumented) - await run(app))
+    assert overhead < OVERHEAD_BUDGET_SECONDS
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from repos.jobs import PeriodicBatchJob
+from repos.purge import tombstone_purger
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.gateway import FakeGateway
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+
+@pytest.fixture
+def gateway():
+    FakeTasksRepository.reset_storage()
+    yield FakeGateway(FakeConfiguration())
+    FakeTasksRepository.reset_storage()
+
+
+async def _delete_all(gateway) -> int:
+    tasks = gateway.get_repository_factory(None).tasks
+    page = await tasks.get_all(100)
+    return len(await tasks.delete_many([task.id for task in page.items]))
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_expired_tombstones_in_batches(gateway):
+    deleted = await _delete_all(gateway)
+    purger = tombstone_purger(gateway, retention=0, batch_size=2, interval=1, pause=0)
+
+    assert deleted == 3
+    assert await purger.run_once() == 3
+    assert FakeTasksRepository._tombstones == {}
+    assert await purger.run_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_purge_keeps_tombstones_within_retention(gateway):
+    await _delete_all(gateway)
+    purger = tombstone_purger(
+        gateway, retention=3600, batch_size=2, interval=1, pause=0
+    )
+
+    assert await purger.run_once() == 0
+    assert len(FakeTasksRepository._tombstones) == 3
+
+
+@pytest.mark.asyncio
+async def test_job_survives_failed_rounds(gateway):
+    calls = []
+
+    async def batch(factory, limit):
+        calls.append(limit)
+        if len(calls) == 1:
+            raise RuntimeError("connection lost")
+        return 0
+
+    job = PeriodicBatchJob(gateway, batch, interval=0, batch_size=5)
+    task = asyncio.create_task(job.run())
+    while len(calls) < 3:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert calls[:3] == [5, 5, 5]
@@ -0,0 +1,128 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import column, create_engine, insert, select, table, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from repos.gateway import DatabaseGateway, WriteTrackingSession
+from repos.replicas import ReadYourWritesTracker, ReplicaRouter
+from repos.tasks import READ_SNAPSHOT
+from tests.mocks.cfg import FakeConfiguration
+
+
+class FakeEngine:
+    def __init__(self, name, checked_out=0, alive=True):
+        self.url = SimpleNamespace(host=name)
+        self.pool = SimpleNamespace(checkedout=lambda: checked_out)
+        self.alive = alive
+
+    @asynccontextmanager
+    async def connect(self):
+        if not self.alive:
+            raise OSError("connection refused")
+        yield SimpleNamespace(execute=self._execute)
+
+    async def _execute(self, statement):
+        return None
+
+
+def test_round_robin_skips_failed_replicas():
+    a, b = FakeEngine("a"), FakeEngine("b")
+    router = ReplicaRouter([a, b])
+    assert [router.pick(), router.pick(), router.pick()] == [a, b, a]
+
+    router.mark_failed(a)
+    assert {router.pick(), router.pick()} == {b}
+    router.mark_failed(b)
+    assert router.pick() is None
+
+
+def test_least_busy():
+    busy, idle = FakeEngine("busy", checked_out=5), FakeEngine("idle", checked_out=1)
+    router = ReplicaRouter([busy, idle], strategy="least_busy")
+    assert router.pick() is idle
+
+
+@pytest.mark.asyncio
+async def test_health_check_restores_replica():
+    engine = FakeEngine("a", alive=False)
+    router = ReplicaRouter([engine])
+
+    await router.check_health()
+    assert router.pick() is None
+
+    engine.alive = True
+    await router.check_health()
+    assert router.pick() is engine
+
+
+def test_read_your_writes_window():
+    now = [0.0]
+    tracker = ReadYourWritesTracker(window=2.0, max_clients=2, clock=lambda: now[0])
+
+    tracker.mark("client")
+    assert tracker.is_pinned("client")
+    assert not tracker.is_pinned("other")
+
+    now[0] = 2.5
+    assert not tracker.is_pinned("client")
+
+    for client in ("a", "b", "c"):
+        tracker.mark(client)
+    # expired and overflowing clients are pruned
+    assert not tracker.is_pinned("a")
+    assert tracker.is_pinned("c")
+
+
+@pytest.mark.asyncio
+async def test_gateway_falls_back_to_primary():
+    gateway = DatabaseGateway(FakeConfiguration())
+    # nothing listens on port 1, both engines fail to connect right away
+    gateway._engine = create_async_engine("postgresql+asyncpg://dev@127.0.0.1:1/dev")
+    gateway._session_factory = async_sessionmaker(gateway._engine)
+    gateway._replicas = ReplicaRouter(
+        [create_async_engine("postgresql+asyncpg://dev@127.0.0.1:1/replica")]
+    )
+    gateway._is_initialized = True
+    try:
+        session = await gateway._new_session(read_only=True, client=None)
+        assert session.bind is gateway._engine
+        assert gateway._replicas.pick() is None
+        await session.close()
+    finally:
+        await gateway.close()
+
+
+class OptionsRecordingSession:
+    def __init__(self, bind=None):
+        self.bind = bind
+        self.options = []
+        self.info = {}
+
+    async def connection(self, execution_options=None):
+        self.options.append(execution_options)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("replica", [True, False])
+async def test_snapshot_is_set_when_connecting(replica):
+    gateway = DatabaseGateway(FakeConfiguration())
+    gateway._session_factory = OptionsRecordingSession
+    gateway._replicas = ReplicaRouter([FakeEngine("a")]) if replica else None
+
+    session = await gateway._new_session(read_only=True, client=None, snapshot=True)
+
+    # the first connection() is the only one whose options count
+    assert session.options == [READ_SNAPSHOT]
+
+
+def test_only_sessions_that_wrote_pin_the_client():
+    rows = table("t", column("x"))
+    with WriteTrackingSession(bind=create_engine("sqlite://")) as session:
+        session.execute(text("CREATE TABLE t (x INT)"))
+        session.execute(select(rows.c.x))
+        assert "wrote" not in session.info
+
+        session.execute(insert(rows).values(x=1))
+        assert session.info["wrote"]
@@ -0,0 +1,168 @@
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import Insert, Update
+from sqlalchemy.dialects import postgresql
+
+from models.dto import TaskDTO
+from repos.factory import RepositoryFactory
+from repos.tasks import TasksRepository
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.session import StatementCountingSession
+
+
+class StatementCountingApp(FakeApp):
+    session = StatementCountingSession()
+
+    def get_repository_factory(self, gateway, read_only=False):
+        return Depends(lambda: RepositoryFactory(self.session))
+
+
+@pytest.fixture(scope="module")
+def app():
+    return StatementCountingApp(FakeConfiguration())
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    with TestClient(app.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def session(app):
+    app.session.reset()
+    return app.session
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("get", "/tasks/", None),
+        ("get", "/tasks/{id}", None),
+        ("post", "/tasks/", {"name": "n", "text": "t"}),
+        ("put", "/tasks/{id}", {"status": "done"}),
+        ("delete", "/tasks/{id}", None),
+        ("post", "/tasks/batch", {"items": [{"name": "n", "text": "t"}] * 3}),
+        ("patch", "/tasks/batch", {"items": [{"id": "{id}", "status": "done"}]}),
+        ("post", "/tasks/batch-delete", {"ids": ["{id}"]}),
+        ("post", "/tasks/claim?limit=10", None),
+    ],
+)
+def test_single_statement_per_endpoint(client, session, method, path, body):
+    task_id = str(session.row.id)
+    kwargs = {"headers": {"Authorization": "Bearer test"}}
+    if body is not None:
+        kwargs["json"] = _with_id(body, task_id)
+
+    response = client.request(method.upper(), path.format(id=task_id), **kwargs)
+
+    assert response.status_code < 300, response.text
+    assert len(session.statements) == 1
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("get", "/tasks/", None),
+        ("get", "/tasks/{id}", None),
+        ("put", "/tasks/{id}", {"status": "done"}),
+        ("delete", "/tasks/{id}", None),
+        ("patch", "/tasks/batch", {"items": [{"id": "{id}", "status": "done"}]}),
+        ("post", "/tasks/batch-delete", {"ids": ["{id}"]}),
+        ("post", "/tasks/claim", None),
+    ],
+)
+def test_deleted_tasks_are_never_touched(client, session, method, path, body):
+    task_id = str(session.row.id)
+    kwargs = {"headers": {"Authorization": "Bearer test"}}
+    if body is not None:
+        kwargs["json"] = _with_id(body, task_id)
+
+    client.request(method.upper(), path.format(id=task_id), **kwargs)
+
+    (statement,) = session.statements
+    assert not isinstance(statement, Insert)
+    assert "deleted_at IS NULL" in str(statement.compile(dialect=postgresql.dialect()))
+    if method == "delete" or path.endswith("delete"):
+        # soft delete keeps the row as a tombstone
+        assert isinstance(statement, Update)
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("post", "/tasks/", {"name": "n", "text": "t"}),
+        ("put", "/tasks/{id}", {"status": "done"}),
+        ("post", "/tasks/batch", {"items": [{"name": "n", "text": "t"}] * 3}),
+        ("patch", "/tasks/batch", {"items": [{"id": "{id}", "status": "done"}]}),
+    ],
+)
+def test_writes_return_only_task_columns(client, session, method, path, body):
+    task_id = str(session.row.id)
+    client.request(
+        method.upper(),
+        path.format(id=task_id),
+        headers={"Authorization": "Bearer test"},
+        json=_with_id(body, task_id),
+    )
+
+    (statement,) = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    # the tsvector is the widest column and never part of a response
+    assert "search_vector" not in sql.split("RETURNING")[1]
+
+
+def test_conditional_update_is_a_single_statement(client, session):
+    task_id = str(session.row.id)
+    headers = {"Authorization": "Bearer test", "If-Match": '"v1"'}
+
+    response = client.put(f"/tasks/{task_id}", headers=headers, json={"name": "n"})
+
+    assert response.status_code == 200, response.text
+    (statement,) = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "tasks.version = " in sql
+    assert "version=(tasks.version + " in sql
+
+
+def _with_id(body, task_id):
+    if isinstance(body, dict):
+        return {key: _with_id(value, task_id) for key, value in body.items()}
+    if isinstance(body, list):
+        return [_with_id(value, task_id) for value in body]
+    return task_id if body == "{id}" else body
+
+
+def test_trusted_dto_matches_model_construct(session):
+    row = session.row
+    values = dict(
+        id=row.id,
+        name=row.name,
+        text=row.text,
+        status=row.status,
+        updated_at=row.updated_at,
+        version=row.version,
+    )
+    trusted = TaskDTO.trusted(**values)
+    constructed = TaskDTO.model_construct(**values)
+
+    assert trusted == constructed
+    assert trusted.model_fields_set == constructed.model_fields_set
+    assert trusted.model_dump_json() == constructed.model_dump_json()
+
+
+@pytest.mark.asyncio
+async def test_validate_reads_runs_dto_validators(session):
+    session.row.name = "  padded  "
+    try:
+        fast = await TasksRepository(session).get_by_id(session.row.id)
+        validated = await TasksRepository(session, validate_reads=True).get_by_id(
+            session.row.id
+        )
+    finally:
+        session.row.name = "counted"
+
+    assert fast.name == "  padded  "
+    assert validated.name == "padded"
@@ -0,0 +1,101 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from metrics.instruments import Metrics
+from metrics.slow_queries import SlowQueryLog, fingerprint, redact
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+
+
+class FakeExplainEngine:
+    def __init__(self):
+        self.statements = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield SimpleNamespace(exec_driver_sql=self._exec)
+
+    async def _exec(self, statement, parameters):
+        self.statements.append((statement, parameters))
+        return [("Index Scan using tasks_pkey on tasks",)]
+
+
+def test_fingerprint_removes_literals_and_collapses_lists():
+    assert (
+        fingerprint(
+            "SELECT * FROM tasks\n WHERE id IN ($1, $2, $3) AND name = 'x''y' LIMIT 10"
+        )
+        == "SELECT * FROM tasks WHERE id IN (?+) AND name = ? LIMIT ?"
+    )
+    assert fingerprint(
+        "INSERT INTO tasks (name, text) VALUES ($1, $2), ($3, $4), ($5, $6)"
+    ) == fingerprint("INSERT INTO tasks (name, text) VALUES ($1, $2), ($3, $4)")
+    assert fingerprint("SELECT $1::REGCONFIG") == "SELECT ?::REGCONFIG"
+
+
+def test_redact_keeps_only_types_and_sizes():
+    assert redact(("secret", 42, None, [1, 2])) == [
+        "<str len=6>",
+        "<int>",
+        None,
+        "<list len=2>",
+    ]
+    assert redact([("a",), ("b",)], executemany=True) == "<2 rows>"
+
+
+def test_top_keeps_slowest_fingerprints():
+    log = SlowQueryLog(threshold=0.1, top_n=2, max_fingerprints=2)
+    log.record("SELECT 1", (), 0.2, "/a")
+    log.record("SELECT 2", (), 0.3, "/a")
+    log.record("SELECT a FROM t", (), 0.5, "/b")
+    log.record("SELECT b FROM t", (), 0.4, "/c")
+
+    top = log.top()
+    assert [entry["statement"] for entry in top] == [
+        "SELECT a FROM t",
+        "SELECT b FROM t",
+    ]
+    assert top[0]["last_route"] == "/b"
+
+    # SELECT 1 and SELECT 2 share a fingerprint, it was evicted as the fastest
+    assert all(entry["statement"] != "SELECT ?" for entry in log.top(10))
+
+
+@pytest.mark.asyncio
+async def test_explain_runs_once_per_fingerprint():
+    engine = FakeExplainEngine()
+    log = SlowQueryLog(threshold=0.1, explain=True)
+
+    log.record("SELECT * FROM tasks WHERE id = $1", ["x"], 0.2, "/t", engine)
+    log.record("SELECT * FROM tasks WHERE id = $1", ["y"], 0.3, "/t", engine)
+    log.record("COPY tasks FROM STDIN", None, 0.3, "/t", engine)
+    await asyncio.sleep(0)
+
+    assert engine.statements == [("EXPLAIN SELECT * FROM tasks WHERE id = $1", ("x",))]
+    assert log.top()[0]["plan"].startswith("Index Scan")
+
+
+def test_engine_statements_over_threshold_are_recorded():
+    log = SlowQueryLog(threshold=0.0)
+    engine = create_engine("sqlite://")
+    Metrics().instrument_engine(SimpleNamespace(sync_engine=engine), "slow-test", log)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT :value"), {"value": "secret"})
+
+    entry = log.top()[0]
+    assert entry["statement"] == "SELECT ?"
+    assert entry["last_parameters"] == ["<str len=6>"]
+
+
+def test_admin_endpoint_disabled_without_threshold():
+    with TestClient(FakeApp(FakeConfiguration()).app) as client:
+        response = client.get(
+            "/admin/slow-queries", headers={"Authorization": "Bearer test"}
+        )
+    assert response.json() == {"enabled": False}
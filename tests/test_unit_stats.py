@@ -0,0 +1,61 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Insert
+
+from repos.tasks import TasksRepository
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+
+class ReconcileSession:
+    """Answers the advisory lock and the drift query of reconciliation"""
+
+    def __init__(self, locked: bool, drift: list[tuple[str, int]]):
+        self.locked = locked
+        self.drift = drift
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        result = MagicMock()
+        result.scalar_one.return_value = self.locked
+        result.all.return_value = self.drift
+        return result
+
+
+def test_stats_endpoint_counts_live_tasks():
+    FakeTasksRepository.reset_storage()
+    try:
+        with TestClient(FakeApp(FakeConfiguration()).app) as client:
+            headers = {"Authorization": "Bearer test"}
+            task_id = client.get("/tasks/", headers=headers).json()["items"][0]["id"]
+            client.put(f"/tasks/{task_id}", headers=headers, json={"status": "done"})
+            response = client.get("/tasks/stats", headers=headers)
+    finally:
+        FakeTasksRepository.reset_storage()
+
+    assert response.status_code == 200
+    assert response.json() == {"created": 2, "processing": 0, "done": 1, "total": 3}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_adds_drift_as_a_delta():
+    session = ReconcileSession(locked=True, drift=[("done", -2), ("created", 5)])
+
+    drift = await TasksRepository(session).reconcile_status_counts()
+
+    assert drift == {"done": -2, "created": 5}
+    insert = session.statements[-1]
+    assert isinstance(insert, Insert)
+    assert "count = (task_status_counts.count + excluded.count)" in str(insert)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_skips_while_another_instance_runs():
+    session = ReconcileSession(locked=False, drift=[("done", 1)])
+
+    assert await TasksRepository(session).reconcile_status_counts() is None
+    assert len(session.statements) == 1
@@ -0,0 +1,164 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from repos.pagination import decode_cursor, encode_cursor
+from repos.tasks import TasksRepository
+from tests.mocks.appcore import FakeApp
+from tests.mocks.cfg import FakeConfiguration
+from tests.mocks.session import TaskRow
+from tests.mocks.tasks_repo import FakeTasksRepository
+
+HEADERS = {"Authorization": "Bearer test"}
+
+
+@pytest.fixture
+def client():
+    FakeTasksRepository.reset_storage()
+    with TestClient(FakeApp(FakeConfiguration()).app) as test_client:
+        yield test_client
+    FakeTasksRepository.reset_storage()
+
+
+def _sync(client, **params):
+    response = client.get("/tasks/changes", params=params, headers=HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_delta_sync_returns_upserts_and_tombstones(client):
+    first = _sync(client, limit=2)
+    rest = _sync(client, since=first["next_token"])
+    assert first["has_more"] and not rest["has_more"]
+    ids = [item["id"] for item in first["items"] + rest["items"]]
+    assert len(set(ids)) == 3
+    assert all(not item["deleted"] and item["updated_at"] for item in first["items"])
+
+    client.put(f"/tasks/{ids[0]}", headers=HEADERS, json={"status": "done"})
+    client.delete(f"/tasks/{ids[1]}", headers=HEADERS)
+    changes = _sync(client, since=rest["next_token"])
+
+    assert [(item["id"], item["deleted"]) for item in changes["items"]] == [
+        (ids[0], False),
+        (ids[1], True),
+    ]
+    assert changes["items"][0]["status"] == "done"
+    assert changes["items"][1]["name"] is None
+    assert _sync(client, since=changes["next_token"])["items"] == []
+
+
+def test_expired_or_foreign_token_is_rejected(client):
+    expired = encode_cursor(
+        datetime.utcnow() - timedelta(days=30), uuid.UUID(int=0), "sync", "asc"
+    )
+    response = client.get("/tasks/changes", params={"since": expired}, headers=HEADERS)
+    assert response.status_code == 410
+
+    page_cursor = client.get("/tasks/", params={"limit": 1}, headers=HEADERS).json()
+    response = client.get(
+        "/tasks/changes", params={"since": page_cursor["next_cursor"]}, headers=HEADERS
+    )
+    assert response.status_code == 400
+
+
+class TableSession:
+    """
+    AsyncSession stand-in answering the changes statement from rows in
+    memory, by a database clock the test moves
+    """
+
+    def __init__(self):
+        self.now = datetime(2026, 1, 1)
+        self.rows = []
+
+    def add(self, age: float, deleted: bool = False) -> TaskRow:
+        updated_at = self.now - timedelta(seconds=age)
+        row = TaskRow(
+            uuid.uuid4(),
+            "n",
+            "t",
+            "created",
+            updated_at,
+            updated_at,
+            1,
+            updated_at if deleted else None,
+        )
+        self.rows.append(row)
+        return row
+
+    async def execute(self, statement):
+        params = statement.compile(dialect=postgresql.dialect()).params.values()
+        (settle,) = [value for value in params if isinstance(value, timedelta)]
+        (limit,) = [value for value in params if isinstance(value, int)]
+        position = tuple(
+            value for value in params if isinstance(value, (datetime, uuid.UUID))
+        )
+        rows = [
+            row
+            for row in self.rows
+            if row.updated_at <= self.now - settle
+            and (
+                (row.updated_at, row.id) > position if position else not row.deleted_at
+            )
+        ]
+        rows = sorted(rows, key=lambda row: (row.updated_at, row.id))[:limit]
+        result = MagicMock()
+        result.all.return_value = [(self.now, *row) for row in rows] or [
+            (self.now,) + (None,) * len(TaskRow._fields)
+        ]
+        return result
+
+
+@pytest.mark.asyncio
+async def test_token_is_held_back_by_settle_window():
+    session = TableSession()
+    settled, young = session.add(age=90), session.add(age=30)
+    page = await TasksRepository(session).get_changes(10, settle=60)
+
+    assert [item.id for item in page.items] == [settled.id]
+    token_time, _ = decode_cursor(page.next_token, "sync", "asc")
+    assert token_time == session.now - timedelta(seconds=60) < young.updated_at
+
+
+@pytest.mark.asyncio
+async def test_late_commit_behind_a_full_page_is_not_lost():
+    session = TableSession()
+    repo = TasksRepository(session)
+    early = session.add(age=60)
+    young = [session.add(age=age) for age in (4, 3, 2)]
+    page = await repo.get_changes(2, settle=10)
+    assert [item.id for item in page.items] == [early.id]
+
+    # stamped before the rows already in the table, committed only now
+    late = session.add(age=5)
+    session.now += timedelta(seconds=20)
+    seen = []
+    while True:
+        page = await repo.get_changes(2, since=page.next_token, settle=10)
+        seen += [item.id for item in page.items]
+        token_time, _ = decode_cursor(page.next_token, "sync", "asc")
+        assert token_time <= session.now - timedelta(seconds=10)
+        if not page.has_more:
+            break
+
+    assert seen == [late.id] + [row.id for row in young]
+
+
+@pytest.mark.asyncio
+async def test_token_of_a_quiet_table_does_not_expire():
+    session = TableSession()
+    session.add(age=8 * 86400)
+    repo = TasksRepository(session)
+    retention = 7 * 86400
+
+    page = await repo.get_changes(10, settle=5, retention=retention)
+    again = await repo.get_changes(
+        10, since=page.next_token, settle=5, retention=retention
+    )
+
+    token_time, _ = decode_cursor(again.next_token, "sync", "asc")
+    assert token_time == session.now - timedelta(seconds=5)